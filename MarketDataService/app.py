@@ -1,18 +1,49 @@
+import asyncio
+import functools
 import hashlib
 import json
+import math
 import os
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
 import yfinance as yf
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 
-from cache import create_cache_client
+import bars as bars_codec
+import features as features_engine
+from barstore import BarStore
+from features import POST_END_NS, POST_START_NS, PRE_END_NS, PRE_START_NS, REG_END_NS, REG_START_NS
+from snapshot import FeatureSnapshot, or_default, py_max, py_min, sort_indices
+from throttle import AdaptiveBatchSize, TokenBucket
+from cache import (
+    LocalCache,
+    SingleFlight,
+    acquire_lease,
+    close_async_cache_client,
+    create_async_cache_client,
+    create_cache_client,
+    lease_held,
+    mget as cache_mget,
+    mget_async as cache_mget_async,
+    release_lease,
+    setex_many as cache_setex_many,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     from dotenv import load_dotenv
@@ -21,7 +52,34 @@ try:
 except ImportError:
     pass
 
-app = FastAPI(title="Market Data Service")
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    global async_cache_client
+    if ASYNC_REDIS:
+        async_cache_client = create_async_cache_client()
+    _start_scanner_warmer()
+    _start_bar_store_compactor()
+    try:
+        yield
+    finally:
+        _stop_scanner_warmer()
+        _stop_bar_store_compactor()
+        if async_cache_client is not None:
+            await close_async_cache_client(async_cache_client)
+            async_cache_client = None
+
+
+class _FiniteJSONResponse(JSONResponse):
+    """Stdlib fallback that writes NaN/inf as null like orjson, where JSONResponse would raise."""
+
+    def render(self, content: object) -> bytes:
+        return _dumps_compact(content).encode("utf-8")
+
+
+# orjson encodes responses several times faster than the stdlib encoder (NaN/inf become null either way).
+DEFAULT_RESPONSE_CLASS = ORJSONResponse if orjson is not None else _FiniteJSONResponse
+app = FastAPI(title="Market Data Service", lifespan=_lifespan, default_response_class=DEFAULT_RESPONSE_CLASS)
 
 CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
 CACHE_STALE_TTL_SECONDS = int(os.getenv("CACHE_STALE_TTL_SECONDS", str(max(CACHE_TTL_SECONDS * 12, 86400))))
@@ -51,6 +109,22 @@ try:
 except ValueError:
     SCANNER_RESULTS_LIMIT = SCANNER_UNIVERSE_LIMIT
 SCANNER_RESULTS_LIMIT = max(1, min(SCANNER_RESULTS_LIMIT, 500))
+SCANNER_SUPERSET_FEATURES = (os.getenv("SCANNER_SUPERSET_FEATURES", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+
+try:
+    SCREENER_MAX_WORKERS = int(os.getenv("SCREENER_MAX_WORKERS", "4"))
+except ValueError:
+    SCREENER_MAX_WORKERS = 4
+SCREENER_MAX_WORKERS = max(1, SCREENER_MAX_WORKERS)
+try:
+    SCREENER_TIMEOUT_SECONDS = float(os.getenv("SCREENER_TIMEOUT_SECONDS", "10"))
+except ValueError:
+    SCREENER_TIMEOUT_SECONDS = 10.0
+SCREENER_TIMEOUT_SECONDS = max(0.1, SCREENER_TIMEOUT_SECONDS)
 
 REL_VOL_METHOD = (os.getenv("REL_VOL_METHOD", "recent_k_1m") or "recent_k_1m").strip().lower()
 
@@ -91,36 +165,322 @@ REL_VOL_REUSE_PRIMARY_1M_DOWNLOAD = (os.getenv("REL_VOL_REUSE_PRIMARY_1M_DOWNLOA
     "false",
     "False",
 }
+# The prior-session part of each ticker's rel-vol baseline is cached for the day, so later
+# feature runs only need today's bars.
+REL_VOL_BASELINE_CACHE = (os.getenv("REL_VOL_BASELINE_CACHE", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+try:
+    REL_VOL_BASELINE_TTL_SECONDS = int(os.getenv("REL_VOL_BASELINE_TTL_SECONDS", "86400"))
+except ValueError:
+    REL_VOL_BASELINE_TTL_SECONDS = 86400
+REL_VOL_BASELINE_TTL_SECONDS = max(60, REL_VOL_BASELINE_TTL_SECONDS)
+
+FEATURES_VECTORIZED = (os.getenv("FEATURES_VECTORIZED", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+
+SCANNERS_VECTORIZED = (os.getenv("SCANNERS_VECTORIZED", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+
+try:
+    HISTORY_STREAM_CHUNK_BARS = int(os.getenv("HISTORY_STREAM_CHUNK_BARS", "500"))
+except ValueError:
+    HISTORY_STREAM_CHUNK_BARS = 500
+HISTORY_STREAM_CHUNK_BARS = max(1, HISTORY_STREAM_CHUNK_BARS)
+
+try:
+    HISTORY_BATCH_MAX_TICKERS = int(os.getenv("HISTORY_BATCH_MAX_TICKERS", "50"))
+except ValueError:
+    HISTORY_BATCH_MAX_TICKERS = 50
+HISTORY_BATCH_MAX_TICKERS = max(1, HISTORY_BATCH_MAX_TICKERS)
+try:
+    HISTORY_EMPTY_TTL_SECONDS = int(os.getenv("HISTORY_EMPTY_TTL_SECONDS", "60"))
+except ValueError:
+    HISTORY_EMPTY_TTL_SECONDS = 60
+HISTORY_EMPTY_TTL_SECONDS = max(1, HISTORY_EMPTY_TTL_SECONDS)
+
+try:
+    SCAN_BATCH_MAX_SCANS = int(os.getenv("SCAN_BATCH_MAX_SCANS", "20"))
+except ValueError:
+    SCAN_BATCH_MAX_SCANS = 20
+SCAN_BATCH_MAX_SCANS = max(1, SCAN_BATCH_MAX_SCANS)
+# `/scan/stream` re-reads each subscribed scanner entry this often (one poll per distinct spec).
+try:
+    SCAN_STREAM_POLL_SECONDS = float(os.getenv("SCAN_STREAM_POLL_SECONDS", "5"))
+except ValueError:
+    SCAN_STREAM_POLL_SECONDS = 5.0
+SCAN_STREAM_POLL_SECONDS = max(0.5, SCAN_STREAM_POLL_SECONDS)
+try:
+    SCAN_STREAM_KEEPALIVE_SECONDS = float(os.getenv("SCAN_STREAM_KEEPALIVE_SECONDS", "15"))
+except ValueError:
+    SCAN_STREAM_KEEPALIVE_SECONDS = 15.0
+SCAN_STREAM_KEEPALIVE_SECONDS = max(1.0, SCAN_STREAM_KEEPALIVE_SECONDS)
+
+BARS_CACHE_FORMAT = (os.getenv("BARS_CACHE_FORMAT", "binary") or "binary").strip().lower()
+if BARS_CACHE_FORMAT not in {"binary", "json"}:
+    BARS_CACHE_FORMAT = "binary"
+BARS_CACHE_COMPRESS = (os.getenv("BARS_CACHE_COMPRESS", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+
+BARS_INCREMENTAL = (os.getenv("BARS_INCREMENTAL", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+try:
+    BARS_CACHE_HISTORY_TTL_SECONDS = int(os.getenv("BARS_CACHE_HISTORY_TTL_SECONDS", str(CACHE_STALE_TTL_SECONDS)))
+except ValueError:
+    BARS_CACHE_HISTORY_TTL_SECONDS = CACHE_STALE_TTL_SECONDS
+BARS_CACHE_HISTORY_TTL_SECONDS = max(CACHE_TTL_SECONDS, BARS_CACHE_HISTORY_TTL_SECONDS)
 
 INTRADAY_MAX_DAYS_BY_INTERVAL = {"1m": 7}
 
+# Coarser intervals can be built from 1m bars: "cached" derives them when fresh 1m bars are already
+# cached, "always" downloads 1m bars instead of the requested interval, "off" downloads each interval.
+BARS_RESAMPLE_FROM_1M = (os.getenv("BARS_RESAMPLE_FROM_1M", "cached") or "cached").strip().lower()
+if BARS_RESAMPLE_FROM_1M not in {"off", "cached", "always"}:
+    BARS_RESAMPLE_FROM_1M = "cached"
+
+# Serve a period from a fresh cached frame of a longer period (same ticker and interval) by slicing it.
+BARS_SLICE_LONGER_PERIODS = (os.getenv("BARS_SLICE_LONGER_PERIODS", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+
+# On-disk bar store behind the Redis bar cache; empty disables it.
+BAR_STORE_DIR = (os.getenv("BAR_STORE_DIR") or "").strip()
+try:
+    BAR_STORE_RETENTION_DAYS = int(os.getenv("BAR_STORE_RETENTION_DAYS", "60"))
+except ValueError:
+    BAR_STORE_RETENTION_DAYS = 60
+BAR_STORE_RETENTION_DAYS = max(1, BAR_STORE_RETENTION_DAYS)
+try:
+    BAR_STORE_COMPACT_INTERVAL_SECONDS = int(os.getenv("BAR_STORE_COMPACT_INTERVAL_SECONDS", "3600"))
+except ValueError:
+    BAR_STORE_COMPACT_INTERVAL_SECONDS = 3600
+BAR_STORE_COMPACT_INTERVAL_SECONDS = max(60, BAR_STORE_COMPACT_INTERVAL_SECONDS)
+
+# /quotes takes last prices from fresh bar-store series and cached screener quotes, downloading one
+# session of bars only for the symbols neither has.
+QUOTES_SNAPSHOT_PRICES = (os.getenv("QUOTES_SNAPSHOT_PRICES", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+
+try:
+    DOWNLOAD_RATE_PER_SECOND = float(os.getenv("DOWNLOAD_RATE_PER_SECOND", "2"))
+except ValueError:
+    DOWNLOAD_RATE_PER_SECOND = 2.0
+try:
+    DOWNLOAD_RATE_BURST = int(os.getenv("DOWNLOAD_RATE_BURST", "4"))
+except ValueError:
+    DOWNLOAD_RATE_BURST = 4
+try:
+    DOWNLOAD_BATCH_SIZE = int(os.getenv("DOWNLOAD_BATCH_SIZE", "50"))
+except ValueError:
+    DOWNLOAD_BATCH_SIZE = 50
+DOWNLOAD_BATCH_SIZE = max(1, DOWNLOAD_BATCH_SIZE)
+try:
+    DOWNLOAD_MIN_BATCH_SIZE = int(os.getenv("DOWNLOAD_MIN_BATCH_SIZE", "10"))
+except ValueError:
+    DOWNLOAD_MIN_BATCH_SIZE = 10
+DOWNLOAD_MIN_BATCH_SIZE = max(1, min(DOWNLOAD_MIN_BATCH_SIZE, DOWNLOAD_BATCH_SIZE))
+try:
+    DOWNLOAD_MAX_RETRIES = int(os.getenv("DOWNLOAD_MAX_RETRIES", "2"))
+except ValueError:
+    DOWNLOAD_MAX_RETRIES = 2
+DOWNLOAD_MAX_RETRIES = max(0, DOWNLOAD_MAX_RETRIES)
+try:
+    DOWNLOAD_RETRY_BACKOFF_MS = int(os.getenv("DOWNLOAD_RETRY_BACKOFF_MS", "500"))
+except ValueError:
+    DOWNLOAD_RETRY_BACKOFF_MS = 500
+DOWNLOAD_RETRY_BACKOFF_MS = max(0, DOWNLOAD_RETRY_BACKOFF_MS)
+
+try:
+    CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "512"))
+except ValueError:
+    CACHE_L1_MAX_ENTRIES = 512
+try:
+    CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+except ValueError:
+    CACHE_L1_MAX_BYTES = 64 * 1024 * 1024
+try:
+    CACHE_L1_TTL_SECONDS = int(os.getenv("CACHE_L1_TTL_SECONDS", "15"))
+except ValueError:
+    CACHE_L1_TTL_SECONDS = 15
+CACHE_L1_TTL_SECONDS = max(0, min(CACHE_L1_TTL_SECONDS, CACHE_TTL_SECONDS))
+
+SINGLE_FLIGHT_DISTRIBUTED = (os.getenv("SINGLE_FLIGHT_DISTRIBUTED", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+try:
+    SINGLE_FLIGHT_LEASE_SECONDS = int(os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "120"))
+except ValueError:
+    SINGLE_FLIGHT_LEASE_SECONDS = 120
+SINGLE_FLIGHT_LEASE_SECONDS = max(1, SINGLE_FLIGHT_LEASE_SECONDS)
+try:
+    SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "60"))
+except ValueError:
+    SINGLE_FLIGHT_WAIT_SECONDS = 60.0
+try:
+    SINGLE_FLIGHT_POLL_MS = int(os.getenv("SINGLE_FLIGHT_POLL_MS", "250"))
+except ValueError:
+    SINGLE_FLIGHT_POLL_MS = 250
+SINGLE_FLIGHT_POLL_MS = max(10, SINGLE_FLIGHT_POLL_MS)
+
+SCANNER_WARMER_ENABLED = (os.getenv("SCANNER_WARMER_ENABLED", "0") or "0").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+try:
+    SCANNER_WARMER_INTERVAL_SECONDS = int(
+        os.getenv("SCANNER_WARMER_INTERVAL_SECONDS", str(max(30, CACHE_TTL_SECONDS // 2)))
+    )
+except ValueError:
+    SCANNER_WARMER_INTERVAL_SECONDS = max(30, CACHE_TTL_SECONDS // 2)
+SCANNER_WARMER_INTERVAL_SECONDS = max(5, SCANNER_WARMER_INTERVAL_SECONDS)
+try:
+    SCANNER_WARMER_IDLE_SECONDS = int(os.getenv("SCANNER_WARMER_IDLE_SECONDS", "1800"))
+except ValueError:
+    SCANNER_WARMER_IDLE_SECONDS = 1800
+SCANNER_WARMER_IDLE_SECONDS = max(SCANNER_WARMER_INTERVAL_SECONDS, SCANNER_WARMER_IDLE_SECONDS)
+SCANNER_WARMER_PROFILES = (os.getenv("SCANNER_WARMER_PROFILES") or "").strip()
+
+ASYNC_REDIS = (os.getenv("ASYNC_REDIS", "1") or "1").strip() not in {
+    "0",
+    "false",
+    "False",
+}
+try:
+    REQUEST_EXECUTOR_WORKERS = int(os.getenv("REQUEST_EXECUTOR_WORKERS", "32"))
+except ValueError:
+    REQUEST_EXECUTOR_WORKERS = 32
+REQUEST_EXECUTOR_WORKERS = max(1, REQUEST_EXECUTOR_WORKERS)
+try:
+    REVALIDATE_MAX_WORKERS = int(os.getenv("REVALIDATE_MAX_WORKERS", "4"))
+except ValueError:
+    REVALIDATE_MAX_WORKERS = 4
+REVALIDATE_MAX_WORKERS = max(1, REVALIDATE_MAX_WORKERS)
+
 cache_client = create_cache_client()
+# Opened by the app lifespan (it is bound to the server's event loop); None means cache reads
+# from async endpoints go through the request executor instead.
+async_cache_client = None
+# Blocking work from async endpoints (yfinance, pandas, sync Redis) runs here rather than on
+# Starlette's shared threadpool; revalidation has its own pool so it cannot starve requests.
+_request_executor = ThreadPoolExecutor(max_workers=REQUEST_EXECUTOR_WORKERS, thread_name_prefix="md-request")
+_revalidate_executor = ThreadPoolExecutor(max_workers=REVALIDATE_MAX_WORKERS, thread_name_prefix="md-revalidate")
+local_cache = LocalCache(max_entries=CACHE_L1_MAX_ENTRIES, max_bytes=CACHE_L1_MAX_BYTES)
+bar_store = BarStore(BAR_STORE_DIR) if BAR_STORE_DIR else None
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+async def _run_blocking(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_request_executor, functools.partial(fn, *args))
+
+
+def _decode_cached(key: str, cached: object) -> Optional[dict]:
+    if not cached:
+        return None
+    try:
+        decoded = json.loads(cached)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    # The remaining L2 TTL is unknown here, so keep L1 copies short-lived.
+    local_cache.set(key, decoded, CACHE_L1_TTL_SECONDS, len(cached))
+    return decoded
+
+
 def read_cache(key: str) -> Optional[dict]:
+    local = local_cache.get(key)
+    if local is not None:
+        return local
     try:
         cached = cache_client.get(key)
     except Exception:
         return None
-    if not cached:
-        return None
+    return _decode_cached(key, cached)
+
+
+async def read_cache_async(key: str) -> Optional[dict]:
+    local = local_cache.get(key)
+    if local is not None:
+        return local
+    if async_cache_client is None:
+        return await _run_blocking(read_cache, key)
     try:
-        return json.loads(cached)
-    except json.JSONDecodeError:
+        cached = await async_cache_client.get(key)
+    except Exception:
         return None
+    return _decode_cached(key, cached)
+
+
+async def read_cache_many_async(keys: List[str]) -> List[Optional[dict]]:
+    """`read_cache_async` for many keys: L1 first, then one MGET for the rest."""
+    values = [local_cache.get(key) for key in keys]
+    missing = [i for i, value in enumerate(values) if value is None]
+    if not missing:
+        return values
+    missing_keys = [keys[i] for i in missing]
+    if async_cache_client is None:
+        raws = await _run_blocking(cache_mget, cache_client, missing_keys)
+    else:
+        raws = await cache_mget_async(async_cache_client, missing_keys)
+    for i, raw in zip(missing, raws):
+        values[i] = _decode_cached(keys[i], raw)
+    return values
 
 
 def write_cache(key: str, payload: dict) -> None:
+    encoded = json.dumps(payload)
+    local_cache.set(key, payload, CACHE_TTL_SECONDS, len(encoded))
     try:
-        cache_client.setex(key, CACHE_TTL_SECONDS, json.dumps(payload))
+        cache_client.setex(key, CACHE_TTL_SECONDS, encoded)
     except Exception:
         return
 
 
+def read_cache_many(keys: List[str]) -> List[Optional[dict]]:
+    """`read_cache` for many keys: L1 first, then one MGET for the rest."""
+    values = [local_cache.get(key) for key in keys]
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing:
+        raws = cache_mget(cache_client, [keys[i] for i in missing])
+        for i, raw in zip(missing, raws):
+            values[i] = _decode_cached(keys[i], raw)
+    return values
+
+
+def write_cache_many(payloads_by_key: dict[str, dict], ttl_seconds: Optional[int] = None) -> None:
+    ttl_seconds = CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    entries = []
+    for key, payload in payloads_by_key.items():
+        encoded = json.dumps(payload)
+        local_cache.set(key, payload, min(ttl_seconds, CACHE_TTL_SECONDS), len(encoded))
+        entries.append((key, ttl_seconds, encoded))
+    cache_setex_many(cache_client, entries)
+
+
 def _parse_utc_iso(value: str) -> Optional[datetime]:
     if not value or not isinstance(value, str):
         return None
@@ -148,15 +508,103 @@ def _cache_setex(key: str, ttl_seconds: int, value: str) -> None:
         return
 
 
+def _scan_cache_info(stored_at: datetime, fresh_until: datetime, stale_until: datetime) -> Optional[dict]:
+    now = datetime.now(timezone.utc)
+    if now > stale_until:
+        return None
+
+    is_stale = now > fresh_until
+    if is_stale and not SERVE_STALE_WHILE_REVALIDATE:
+        return None
+
+    will_revalidate = bool(is_stale and SERVE_STALE_WHILE_REVALIDATE)
+    return {
+        "isStale": bool(is_stale),
+        "source": "cache",
+        "fetchedAt": _format_utc_iso(stored_at),
+        "freshUntil": _format_utc_iso(fresh_until),
+        "staleUntil": _format_utc_iso(stale_until),
+        "willRevalidate": bool(will_revalidate),
+        "retryAfterMs": STALE_RETRY_AFTER_MS if will_revalidate else None,
+    }
+
+
+def _remember_scan_cache_entry(
+    key: str, data: dict, stored_at: datetime, fresh_until: datetime, stale_until: datetime, size: int
+) -> None:
+    # L1 copies live until freshUntil only; stale reads go back to the shared cache,
+    # where another worker may already have revalidated the entry.
+    ttl_seconds = (fresh_until - datetime.now(timezone.utc)).total_seconds()
+    local_cache.set(key, (data, stored_at, fresh_until, stale_until), ttl_seconds, size)
+
+
+def _local_scan_cache_entry(key: str) -> tuple[Optional[dict], Optional[dict]]:
+    local = local_cache.get(key)
+    if local is not None:
+        data, stored_at, fresh_until, stale_until = local
+        cache_info = _scan_cache_info(stored_at, fresh_until, stale_until)
+        if cache_info is not None:
+            return data, cache_info
+    return None, None
+
+
 def _read_scan_cache_entry(key: str) -> tuple[Optional[dict], Optional[dict]]:
     """
     Returns (payload, cache_info_for_response) where payload is the scanner response body (without cache info).
     """
+    data, cache_info = _local_scan_cache_entry(key)
+    if data is not None:
+        return data, cache_info
+
     try:
         raw = cache_client.get(key)
     except Exception:
         return None, None
+    return _decode_scan_cache_entry(key, raw)
+
+
+async def _read_scan_cache_entry_async(key: str) -> tuple[Optional[dict], Optional[dict]]:
+    data, cache_info = _local_scan_cache_entry(key)
+    if data is not None:
+        return data, cache_info
+    if async_cache_client is None:
+        return await _run_blocking(_read_scan_cache_entry, key)
+
+    try:
+        raw = await async_cache_client.get(key)
+    except Exception:
+        return None, None
+    return _decode_scan_cache_entry(key, raw)
+
+
+def _read_scan_cache_entries(keys: List[str]) -> List[tuple[Optional[dict], Optional[dict]]]:
+    """Batch form of `_read_scan_cache_entry`: L1 first, then one MGET for the rest."""
+    entries = [_local_scan_cache_entry(key) for key in keys]
+    missing = [i for i, (data, _) in enumerate(entries) if data is None]
+    if missing:
+        raws = cache_mget(cache_client, [keys[i] for i in missing])
+        for i, raw in zip(missing, raws):
+            entries[i] = _decode_scan_cache_entry(keys[i], raw)
+    return entries
+
+
+async def _read_scan_cache_entries_async(keys: List[str]) -> List[tuple[Optional[dict], Optional[dict]]]:
+    """Batch form of `_read_scan_cache_entry_async`: L1 first, then one MGET for the rest."""
+    entries = [_local_scan_cache_entry(key) for key in keys]
+    missing = [i for i, (data, _) in enumerate(entries) if data is None]
+    if not missing:
+        return entries
+    missing_keys = [keys[i] for i in missing]
+    if async_cache_client is None:
+        raws = await _run_blocking(cache_mget, cache_client, missing_keys)
+    else:
+        raws = await cache_mget_async(async_cache_client, missing_keys)
+    for i, raw in zip(missing, raws):
+        entries[i] = _decode_scan_cache_entry(keys[i], raw)
+    return entries
+
 
+def _decode_scan_cache_entry(key: str, raw: object) -> tuple[Optional[dict], Optional[dict]]:
     if not raw:
         return None, None
 
@@ -196,31 +644,23 @@ def _read_scan_cache_entry(key: str) -> tuple[Optional[dict], Optional[dict]]:
     if stored_at is None or fresh_until is None or stale_until is None:
         return None, None
 
-    now = datetime.now(timezone.utc)
-    if now > stale_until:
-        return None, None
-
-    is_stale = now > fresh_until
-    will_revalidate = bool(is_stale and SERVE_STALE_WHILE_REVALIDATE)
-    cache_info = {
-        "isStale": bool(is_stale),
-        "source": "cache",
-        "fetchedAt": _format_utc_iso(stored_at),
-        "freshUntil": _format_utc_iso(fresh_until),
-        "staleUntil": _format_utc_iso(stale_until),
-        "willRevalidate": bool(will_revalidate),
-        "retryAfterMs": STALE_RETRY_AFTER_MS if will_revalidate else None,
-    }
-    if is_stale and not SERVE_STALE_WHILE_REVALIDATE:
+    cache_info = _scan_cache_info(stored_at, fresh_until, stale_until)
+    if cache_info is None:
         return None, None
 
+    if not cache_info["isStale"]:
+        _remember_scan_cache_entry(key, data, stored_at, fresh_until, stale_until, len(raw))
     return data, cache_info
 
 
-def _write_scan_cache_entry(key: str, payload: dict) -> dict:
+def _scan_cache_window() -> tuple[datetime, datetime, datetime]:
     stored_at = datetime.now(timezone.utc).replace(microsecond=0)
     fresh_until = stored_at + timedelta(seconds=CACHE_TTL_SECONDS)
     stale_until = stored_at + timedelta(seconds=CACHE_STALE_TTL_SECONDS)
+    return stored_at, fresh_until, stale_until
+
+
+def _encode_scan_cache_entry(payload: dict, stored_at: datetime, fresh_until: datetime, stale_until: datetime) -> str:
     envelope = {
         "__cache": {
             "v": 1,
@@ -230,7 +670,30 @@ def _write_scan_cache_entry(key: str, payload: dict) -> dict:
         },
         "data": payload,
     }
-    _cache_setex(key, CACHE_STALE_TTL_SECONDS, json.dumps(envelope))
+    return json.dumps(envelope)
+
+
+def _write_scan_cache_entries(payloads_by_key: dict[str, dict]) -> dict:
+    """`_write_scan_cache_entry` for many keys sharing one freshness window, in pipelined round trips."""
+    stored_at, fresh_until, stale_until = _scan_cache_window()
+    entries = []
+    for key, payload in payloads_by_key.items():
+        encoded = _encode_scan_cache_entry(payload, stored_at, fresh_until, stale_until)
+        _remember_scan_cache_entry(key, payload, stored_at, fresh_until, stale_until, len(encoded))
+        entries.append((key, CACHE_STALE_TTL_SECONDS, encoded))
+    cache_setex_many(cache_client, entries)
+    return _fetched_cache_info(stored_at, fresh_until, stale_until)
+
+
+def _write_scan_cache_entry(key: str, payload: dict) -> dict:
+    stored_at, fresh_until, stale_until = _scan_cache_window()
+    encoded = _encode_scan_cache_entry(payload, stored_at, fresh_until, stale_until)
+    _remember_scan_cache_entry(key, payload, stored_at, fresh_until, stale_until, len(encoded))
+    _cache_setex(key, CACHE_STALE_TTL_SECONDS, encoded)
+    return _fetched_cache_info(stored_at, fresh_until, stale_until)
+
+
+def _fetched_cache_info(stored_at: datetime, fresh_until: datetime, stale_until: datetime) -> dict:
     return {
         "isStale": False,
         "source": "yfinance",
@@ -244,6 +707,55 @@ def _write_scan_cache_entry(key: str, payload: dict) -> dict:
 
 _revalidate_lock = threading.Lock()
 _revalidate_inflight: set[str] = set()
+_flights = SingleFlight()
+
+
+def _lease_key(cache_key: str) -> str:
+    return f"md:lease:{cache_key}"
+
+
+def _await_remote_flight(lease_key: str, read_fn):
+    deadline = time.monotonic() + max(SINGLE_FLIGHT_WAIT_SECONDS, 0.0)
+    while True:
+        cached = read_fn()
+        if cached is not None:
+            return cached
+        if time.monotonic() >= deadline or not lease_held(cache_client, lease_key):
+            return read_fn()
+        time.sleep(SINGLE_FLIGHT_POLL_MS / 1000.0)
+
+
+def _single_flight(cache_key: str, read_fn, compute_fn, refresh: bool = False):
+    """
+    Runs `compute_fn` at most once per cache key across concurrent callers in this worker
+    and, via a Redis lease, across workers. `read_fn` returns the cached value or None;
+    callers that lose the race wait for the winner to publish instead of recomputing.
+    With `refresh`, an existing cached value is ignored and the key is recomputed.
+    """
+
+    def _leader():
+        # Another caller may have filled the cache while this one was queued.
+        cached = None if refresh else read_fn()
+        if cached is not None:
+            return cached
+        if not SINGLE_FLIGHT_DISTRIBUTED:
+            return compute_fn()
+
+        lease_key = _lease_key(cache_key)
+        token = acquire_lease(cache_client, lease_key, SINGLE_FLIGHT_LEASE_SECONDS)
+        if token is None:
+            cached = _await_remote_flight(lease_key, read_fn)
+            if cached is not None:
+                return cached
+            # The other worker failed or timed out; compute here rather than fail the request.
+            token = acquire_lease(cache_client, lease_key, SINGLE_FLIGHT_LEASE_SECONDS)
+        try:
+            return compute_fn()
+        finally:
+            if token is not None:
+                release_lease(cache_client, lease_key, token)
+
+    return _flights.do(cache_key, _leader)
 
 
 def _schedule_revalidate(cache_key: str, fn) -> None:
@@ -256,15 +768,24 @@ def _schedule_revalidate(cache_key: str, fn) -> None:
         _revalidate_inflight.add(cache_key)
 
     def _runner():
+        lease_key = _lease_key(cache_key)
+        token = None
         try:
+            if SINGLE_FLIGHT_DISTRIBUTED:
+                token = acquire_lease(cache_client, lease_key, SINGLE_FLIGHT_LEASE_SECONDS)
+                if token is None:
+                    # Another worker is already refreshing this entry.
+                    return
             payload = fn()
             if isinstance(payload, dict):
                 _write_scan_cache_entry(cache_key, payload)
         finally:
+            if token is not None:
+                release_lease(cache_client, lease_key, token)
             with _revalidate_lock:
                 _revalidate_inflight.discard(cache_key)
 
-    threading.Thread(target=_runner, daemon=True).start()
+    _revalidate_executor.submit(_runner)
 
 
 ET_TZ = ZoneInfo("America/New_York")
@@ -294,6 +815,24 @@ class QuoteRow(BaseModel):
     price: Optional[float] = None
 
 
+class HistoryBatchRequest(BaseModel):
+    tickers: List[str] = []
+    interval: str = "5m"
+    period: str = "1d"
+    prepost: bool = False
+    # "rows" or "columnar", as in /history.
+    format: str = "rows"
+
+
+class HistoryBatchResponse(BaseModel):
+    interval: str
+    period: str
+    prepost: bool
+    # One /history payload per ticker that has bars, keyed by the normalized ticker.
+    results: dict[str, HistoryResponse]
+    missing: List[str] = []
+
+
 class QuotesRequest(BaseModel):
     tickers: List[str] = []
     interval: str = "1m"
@@ -363,44 +902,125 @@ def _validate_quotes_request(request: QuotesRequest) -> None:
         raise HTTPException(status_code=400, detail="Unsupported period")
 
 
-def _compute_quotes_payload(request: QuotesRequest) -> dict:
-    tickers = _normalize_tickers(request.tickers)
-    if not tickers:
-        return {"asOf": utc_now_iso(), "results": []}
+def _quote_cache_key(ticker: str, interval: str, period: str, prepost: bool) -> str:
+    return f"md:quotes:last:v2:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
 
-    interval = (request.interval or "1m").strip()
-    period = (request.period or "1d").strip()
-    prepost = bool(request.prepost)
 
-    frames = _download_intraday(tickers, interval=interval, period=period, prepost=prepost)
+def _last_valid_close(df: Optional[pd.DataFrame]) -> Optional[float]:
+    if df is None or getattr(df, "empty", True) or "Close" not in df.columns:
+        return None
+    try:
+        close_series = df["Close"].dropna()
+        if close_series.empty:
+            return None
+        last = close_series.iloc[-1]
+        return None if pd.isna(last) else float(last)
+    except Exception:
+        return None
 
-    results: List[dict] = []
-    for ticker in tickers:
-        df = frames.get(ticker)
-        price: Optional[float] = None
-        if df is not None and not getattr(df, "empty", True) and "Close" in df.columns:
+
+def _snapshot_last_prices(tickers: List[str], interval: str, prepost: bool) -> dict[str, float]:
+    """
+    Last prices available without downloading bars: the newest bar of bar-store series written within
+    CACHE_TTL_SECONDS, then the cached superset screener quotes.
+    """
+    prices: dict[str, float] = {}
+    if bar_store is not None:
+        now = int(time.time())
+        for ticker in tickers:
             try:
-                close_series = df["Close"].dropna()
-                if not close_series.empty:
-                    last = close_series.iloc[-1]
-                    if not pd.isna(last):
-                        price = float(last)
+                last = bar_store.last(ticker, interval, prepost)
             except Exception:
-                price = None
-
-        results.append({"symbol": ticker, "price": price})
+                continue
+            if last is not None and now - int(last.get("storedAt") or 0) < CACHE_TTL_SECONDS:
+                prices[ticker] = last["value"]
+
+    rest = [ticker for ticker in tickers if ticker not in prices]
+    if rest and not prepost:
+        # Screener prices are regular-session quotes, so they only stand in for regular-hours bars.
+        universe = read_cache(_superset_universe_key())
+        if isinstance(universe, list):
+            by_ticker = {item.get("ticker"): item for item in universe if isinstance(item, dict)}
+            for ticker in rest:
+                price = _safe_float((by_ticker.get(ticker) or {}).get("last"))
+                if price is not None:
+                    prices[ticker] = price
+    return prices
+
+
+def _compute_quote_entries(
+    tickers: List[str], interval: str, period: str, prepost: bool
+) -> dict[str, tuple[dict, dict]]:
+    """Prices `tickers` (snapshot sources first, then one grouped download) and caches one quote per symbol."""
+    prices: dict[str, Optional[float]] = {}
+    fetch_period = period
+    if QUOTES_SNAPSHOT_PRICES:
+        prices.update(_snapshot_last_prices(tickers, interval, prepost))
+        # Only the newest bar is read, so one session of bars is enough whatever `period` asked for.
+        fetch_period = "1d"
+    missing = [ticker for ticker in tickers if ticker not in prices]
+    if missing:
+        frames = _download_intraday(missing, interval=interval, period=fetch_period, prepost=prepost)
+        prices.update({ticker: _last_valid_close(frames.get(ticker)) for ticker in missing})
+    rows = {ticker: {"symbol": ticker, "price": prices.get(ticker)} for ticker in tickers}
+    cache_info = _write_scan_cache_entries(
+        {_quote_cache_key(ticker, interval, period, prepost): row for ticker, row in rows.items()}
+    )
+    return {ticker: (row, cache_info) for ticker, row in rows.items()}
 
-    return {"asOf": utc_now_iso(), "results": results}
 
+def _load_quote_entries(
+    tickers: List[str], interval: str, period: str, prepost: bool
+) -> dict[str, tuple[dict, dict]]:
+    """Fetches uncached quotes; concurrent requests missing the same symbols share one download."""
+    keys = [_quote_cache_key(ticker, interval, period, prepost) for ticker in tickers]
 
-def _map_quote_extended(quote: dict) -> Optional[dict]:
-    symbol = quote.get("symbol") or quote.get("ticker")
-    if not symbol:
+    def _read():
+        entries = _read_scan_cache_entries(keys)
+        if all(data and cache_info for data, cache_info in entries):
+            return dict(zip(tickers, entries))
         return None
 
-    last_price = (
-        quote.get("regularMarketPrice")
-        or quote.get("postMarketPrice")
+    return _single_flight(
+        _quotes_cache_key(tickers, interval, period, prepost),
+        _read,
+        lambda: _compute_quote_entries(tickers, interval, period, prepost),
+    )
+
+
+def _schedule_quotes_revalidate(tickers: List[str], interval: str, period: str, prepost: bool) -> None:
+    def _refresh() -> None:
+        # Writes the per-symbol entries itself; returning None keeps the group key out of the cache.
+        _compute_quote_entries(tickers, interval, period, prepost)
+
+    _schedule_revalidate(_quotes_cache_key(tickers, interval, period, prepost), _refresh)
+
+
+def _compose_quotes_payload(tickers: List[str], entries: dict[str, tuple[dict, dict]]) -> dict:
+    """One /quotes response from per-symbol entries; its cache info describes the oldest entry used."""
+    infos = [entries[ticker][1] for ticker in tickers]
+    will_revalidate = any(info.get("willRevalidate") for info in infos)
+    fetched_at = min(info["fetchedAt"] for info in infos)
+    cache_info = {
+        "isStale": any(info.get("isStale") for info in infos),
+        "source": "yfinance" if any(info.get("source") == "yfinance" for info in infos) else "cache",
+        "fetchedAt": fetched_at,
+        "freshUntil": min(info["freshUntil"] for info in infos),
+        "staleUntil": min(info["staleUntil"] for info in infos),
+        "willRevalidate": will_revalidate,
+        "retryAfterMs": STALE_RETRY_AFTER_MS if will_revalidate else None,
+    }
+    return {"asOf": fetched_at, "results": [entries[ticker][0] for ticker in tickers], "cache": cache_info}
+
+
+def _map_quote_extended(quote: dict) -> Optional[dict]:
+    symbol = quote.get("symbol") or quote.get("ticker")
+    if not symbol:
+        return None
+
+    last_price = (
+        quote.get("regularMarketPrice")
+        or quote.get("postMarketPrice")
         or quote.get("preMarketPrice")
         or quote.get("price")
     )
@@ -467,6 +1087,44 @@ def _universe_cache_key(
     )
 
 
+_screener_pool = ThreadPoolExecutor(max_workers=SCREENER_MAX_WORKERS, thread_name_prefix="yf-screen")
+
+
+def _screen(screener: str, count: int) -> dict:
+    payload = yf.screen(
+        screener,
+        count=count,
+        sortField="percentchange",
+        sortAsc=False,
+    )
+    if not isinstance(payload, dict):
+        raise TypeError(f"unexpected payload type {type(payload)}")
+    return payload
+
+
+def _fetch_screener_payloads(screeners: List[str], count: int) -> tuple[List[dict], List[str]]:
+    """
+    Runs the screeners concurrently and returns (payloads in screener order, errors).
+    Screeners still running after SCREENER_TIMEOUT_SECONDS are reported as errors and left to finish
+    in the background.
+    """
+    futures = {screener: _screener_pool.submit(_screen, screener, count) for screener in screeners}
+    wait_futures(futures.values(), timeout=SCREENER_TIMEOUT_SECONDS)
+
+    payloads: List[dict] = []
+    errors: List[str] = []
+    for screener, future in futures.items():
+        if not future.done():
+            future.cancel()
+            errors.append(f"{screener}: timed out after {SCREENER_TIMEOUT_SECONDS:g}s")
+            continue
+        try:
+            payloads.append(future.result())
+        except Exception as exc:
+            errors.append(f"{screener}: {exc}")
+    return payloads, errors
+
+
 def _fetch_scanner_universe(
     *,
     universe_limit: int,
@@ -475,6 +1133,21 @@ def _fetch_scanner_universe(
     min_avg_vol: int,
     min_change_pct: float,
 ) -> List[dict]:
+    return _filter_scanner_universe(
+        _fetch_scanner_superset(universe_limit),
+        universe_limit=universe_limit,
+        min_price=min_price,
+        max_price=max_price,
+        min_avg_vol=min_avg_vol,
+        min_change_pct=min_change_pct,
+    )
+
+
+def _fetch_scanner_superset(universe_limit: int) -> List[dict]:
+    """
+    Screener quotes passing the filters every request shares (US-listed equities above MIN_PRICE_FLOOR,
+    no funds), ranked by change, volume and average volume. `_filter_scanner_universe` narrows it.
+    """
     screeners = [
         "day_gainers",
         "most_actives",
@@ -483,22 +1156,7 @@ def _fetch_scanner_universe(
     ]
 
     screen_count = max(int(universe_limit or 0), 1)
-    payloads: List[dict] = []
-    errors: List[str] = []
-    for screener in screeners:
-        try:
-            payload = yf.screen(
-                screener,
-                count=screen_count,
-                sortField="percentchange",
-                sortAsc=False,
-            )
-            if isinstance(payload, dict):
-                payloads.append(payload)
-            else:
-                errors.append(f"{screener}: unexpected payload type {type(payload)}")
-        except Exception as exc:
-            errors.append(f"{screener}: {exc}")
+    payloads, errors = _fetch_screener_payloads(screeners, screen_count)
 
     if not payloads:
         raise HTTPException(
@@ -520,8 +1178,7 @@ def _fetch_scanner_universe(
             detail="yfinance error: screener payloads returned no quotes",
         )
 
-    min_change_ratio = min_change_pct / 100.0
-    filtered: List[dict] = []
+    superset: List[dict] = []
     for item in combined.values():
         ticker = item["ticker"]
         if not ticker:
@@ -544,7 +1201,39 @@ def _fetch_scanner_universe(
             continue
         if price <= MIN_PRICE_FLOOR:
             continue
-        if price < min_price or price > max_price:
+
+        name = (item.get("shortName") or "").upper()
+        if any(token in name for token in (" ETF", "TRUST", "FUND", "INDEX")):
+            continue
+
+        superset.append(item)
+
+    superset.sort(
+        key=lambda x: (
+            x.get("changePct") or 0.0,
+            x.get("volume") or 0,
+            x.get("avgDailyVol10d") or x.get("avgDailyVol3m") or 0,
+        ),
+        reverse=True,
+    )
+    return superset
+
+
+def _filter_scanner_universe(
+    items: List[dict],
+    *,
+    universe_limit: int,
+    min_price: float,
+    max_price: float,
+    min_avg_vol: int,
+    min_change_pct: float,
+) -> List[dict]:
+    """Applies a request's price, liquidity and change filters to ranked superset items, keeping their order."""
+    min_change_ratio = min_change_pct / 100.0
+    filtered: List[dict] = []
+    for item in items:
+        price = item.get("last")
+        if price is None or price < min_price or price > max_price:
             continue
 
         avg_vol = item.get("avgDailyVol10d") or item.get("avgDailyVol3m")
@@ -558,21 +1247,394 @@ def _fetch_scanner_universe(
         if change_pct is not None and change_pct < min_change_ratio:
             continue
 
-        name = (item.get("shortName") or "").upper()
-        if any(token in name for token in (" ETF", "TRUST", "FUND", "INDEX")):
+        filtered.append(item)
+    return filtered[:universe_limit]
+
+
+def _bars_cache_key(ticker: str, interval: str, period: str, prepost: bool) -> str:
+    return f"md:barsdf:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
+
+
+def _encode_bars_cache(df: pd.DataFrame) -> Optional[str]:
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return None
+    if BARS_CACHE_FORMAT == "binary":
+        encoded = bars_codec.encode_frame(df, compress=BARS_CACHE_COMPRESS)
+        if encoded is not None:
+            return encoded
+    payload = {
+        "columns": list(df.columns),
+        "index": [ts.isoformat() for ts in df.index],
+        "data": df.values.tolist(),
+    }
+    if df.attrs:
+        payload["attrs"] = df.attrs
+    return json.dumps(payload)
+
+
+def _decode_bars_cache(raw: object) -> Optional[pd.DataFrame]:
+    if not raw:
+        return None
+    if bars_codec.is_binary(raw):
+        return bars_codec.decode_frame(raw)
+
+    # Back-compat: older entries are JSON {"columns", "index", "data"} documents.
+    try:
+        payload = raw if isinstance(raw, dict) else json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    columns = payload.get("columns")
+    data = payload.get("data")
+    index = payload.get("index")
+    if not (isinstance(columns, list) and isinstance(data, list) and isinstance(index, list)):
+        return None
+    try:
+        cached = pd.DataFrame(data, columns=columns)
+        cached.index = pd.to_datetime(index)
+    except Exception:
+        return None
+    if isinstance(payload.get("attrs"), dict):
+        cached.attrs.update(payload["attrs"])
+    return cached
+
+
+def _write_bars_cache_many(frames_by_key: dict[str, pd.DataFrame], stored_at: Optional[int] = None) -> None:
+    # With incremental updates the frames outlive their freshness window so the next refresh
+    # only downloads the tail; `storedAt` tells readers when that window ends.
+    ttl_seconds = BARS_CACHE_HISTORY_TTL_SECONDS if BARS_INCREMENTAL else CACHE_TTL_SECONDS
+    if stored_at is None:
+        stored_at = int(time.time())
+    entries = []
+    for cache_key, df in frames_by_key.items():
+        stamped = df.copy(deep=False)
+        stamped.attrs = {"storedAt": stored_at}
+        try:
+            encoded = _encode_bars_cache(stamped)
+        except Exception:
+            encoded = None
+        if encoded is not None:
+            entries.append((cache_key, ttl_seconds, encoded))
+    cache_setex_many(cache_client, entries)
+
+
+# yf.download collects results in module globals (shared._DFS/_ERRORS), so concurrent calls from
+# different requests lose each other's tickers. Calls are serialized; each one fans out over the
+# batch's tickers internally via threads=True.
+_yf_download_lock = threading.Lock()
+# Every bar source (downloads, tails, derived intervals, the bar store and the /history fallback)
+# holds unadjusted OHLC, so frames and cache entries built from any of them agree.
+_BARS_AUTO_ADJUST = False
+_download_limiter = TokenBucket(rate=DOWNLOAD_RATE_PER_SECOND, capacity=DOWNLOAD_RATE_BURST)
+_download_batch_size = AdaptiveBatchSize(
+    initial=DOWNLOAD_BATCH_SIZE, minimum=DOWNLOAD_MIN_BATCH_SIZE, maximum=DOWNLOAD_BATCH_SIZE
+)
+
+
+def _yf_download(**kwargs) -> Optional[pd.DataFrame]:
+    with _yf_download_lock:
+        return yf.download(**kwargs)
+
+
+def _download_batch(batch: List[str], fetch, attempt: int = 0) -> tuple[dict[str, pd.DataFrame], dict[str, str]]:
+    """
+    Downloads one batch through the rate limiter. A failed batch is retried with exponential
+    backoff, split in half each time, so one bad ticker or a transient error only costs that slice.
+    yf.download reports per-ticker failures by leaving them out rather than raising, so tickers
+    missing from the result are retried on their own; ones still empty after the last attempt are
+    left out like tickers without bars. Returns (frames, errors by ticker).
+    """
+    _download_limiter.acquire()
+    try:
+        data = fetch(batch)
+    except Exception as exc:
+        _download_batch_size.record_failure()
+        if attempt >= DOWNLOAD_MAX_RETRIES:
+            return {}, {ticker: str(exc) for ticker in batch}
+        time.sleep(DOWNLOAD_RETRY_BACKOFF_MS / 1000.0 * (2**attempt))
+        mid = (len(batch) + 1) // 2
+        parts = [batch[:mid], batch[mid:]] if len(batch) > 1 else [batch]
+        frames: dict[str, pd.DataFrame] = {}
+        errors: dict[str, str] = {}
+        for part in parts:
+            part_frames, part_errors = _download_batch(part, fetch, attempt + 1)
+            frames.update(part_frames)
+            errors.update(part_errors)
+        return frames, errors
+    _download_batch_size.record_success()
+    frames = _split_download(data, batch)
+    missing = [ticker for ticker in batch if ticker not in frames]
+    if not missing or attempt >= DOWNLOAD_MAX_RETRIES:
+        return frames, {}
+    time.sleep(DOWNLOAD_RETRY_BACKOFF_MS / 1000.0 * (2**attempt))
+    retried, errors = _download_batch(missing, fetch, attempt + 1)
+    frames.update(retried)
+    return frames, errors
+
+
+def _download_batches(tickers: List[str], fetch) -> tuple[dict[str, pd.DataFrame], dict[str, str]]:
+    """
+    Splits `tickers` into adaptively sized batches and downloads them one after another.
+    yf.download is not reentrant, so batches are not dispatched concurrently; each call already
+    fetches its batch's tickers in parallel (threads=True).
+    """
+    frames: dict[str, pd.DataFrame] = {}
+    errors: dict[str, str] = {}
+    for batch in _chunk(tickers, _download_batch_size.current()):
+        batch_frames, batch_errors = _download_batch(batch, fetch)
+        frames.update(batch_frames)
+        errors.update(batch_errors)
+    return frames, errors
+
+
+def _split_download(data: Optional[pd.DataFrame], batch: List[str]) -> dict[str, pd.DataFrame]:
+    if data is None or getattr(data, "empty", False):
+        return {}
+    frames: dict[str, pd.DataFrame] = {}
+    if isinstance(data.columns, pd.MultiIndex):
+        for ticker in batch:
+            if ticker in data.columns.levels[0]:
+                df = data[ticker].dropna(how="all")
+                if not df.empty:
+                    frames[ticker] = df
+    else:
+        df = data.dropna(how="all")
+        if not df.empty:
+            frames[batch[0]] = df
+    return frames
+
+
+def _trim_to_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Keeps the most recent `period` ET session dates, matching what a full yfinance download returns."""
+    days = _period_days(period)
+    if not days or df.empty:
+        return df
+    index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+    dates = index.tz_convert(ET_TZ).normalize()
+    sessions = dates.unique()
+    if len(sessions) <= days:
+        return df
+    return df.loc[dates >= sessions.sort_values()[-days]]
+
+
+def _merge_bar_tail(cached: pd.DataFrame, tail: Optional[pd.DataFrame], period: str) -> pd.DataFrame:
+    if tail is None or tail.empty:
+        return _trim_to_period(cached, period)
+    if cached.index.tz is not None and tail.index.tz is not None:
+        tail = tail.tz_convert(cached.index.tz)
+    combined = pd.concat([cached, tail])
+    # The last stored bar is usually still forming, so the re-downloaded copy wins.
+    combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+    return _trim_to_period(combined, period)
+
+
+_RESAMPLE_MINUTES = {"2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60}
+# ET session starts (pre-market, regular, after-hours) in minutes after midnight.
+_SESSION_STARTS_MINUTES = (4 * 60, 9 * 60 + 30, 16 * 60)
+
+
+def _resample_bars(df: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """
+    Aggregates 1m bars into `minutes` bars (open first, high max, low min, close last, volume sum)
+    labelled by their start. Bins are counted from the start of each ET session, like yfinance's
+    own bars (e.g. 90m: 09:30, 11:00, ..., 15:30), and never straddle a session boundary.
+    """
+    close = df["Close"].to_numpy(dtype=np.float64, na_value=np.nan)
+    df = df[~np.isnan(close)]
+    if df.empty:
+        return df
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    local = df.index.tz_convert(ET_TZ)
+    minute_of_day = np.asarray(local.hour * 60 + local.minute, dtype=np.int64)
+    pre, regular, post = _SESSION_STARTS_MINUTES
+    session_start = np.select([minute_of_day < regular, minute_of_day < post], [pre, regular], post)
+    bin_start = session_start + (minute_of_day - session_start) // minutes * minutes
+    # Offsets are subtracted from the bar time itself, so DST changes cannot shift the labels.
+    offset_ns = ((minute_of_day - bin_start) * 60 + np.asarray(local.second, dtype=np.int64)) * 1_000_000_000
+    labels = np.asarray(df.index.values).astype("datetime64[ns]").view("<i8") - offset_ns
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(labels)] - 1
+
+    data = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if name == "Open":
+            data[name] = values[starts]
+        elif name == "High":
+            data[name] = np.fmax.reduceat(values.astype(np.float64), starts)
+        elif name == "Low":
+            data[name] = np.fmin.reduceat(values.astype(np.float64), starts)
+        elif name == "Volume":
+            summed = np.add.reduceat(np.nan_to_num(values.astype(np.float64)), starts)
+            data[name] = summed.astype(values.dtype) if values.dtype.kind in "iu" else summed
+        else:
+            data[name] = values[ends]
+    index = pd.DatetimeIndex(labels[starts].view("datetime64[ns]")).tz_localize("UTC").tz_convert(df.index.tz)
+    return pd.DataFrame(data, index=index, columns=df.columns)
+
+
+def _resample_from_base(
+    tickers: List[str], *, interval: str, period: str, prepost: bool, refresh: bool
+) -> dict[str, pd.DataFrame]:
+    """
+    Builds `interval` frames from 1m frames (see BARS_RESAMPLE_FROM_1M) and caches them under
+    `interval`, stamped with the oldest source `storedAt` so they expire with their 1m bars.
+    """
+    minutes = _RESAMPLE_MINUTES.get(interval)
+    if minutes is None or not tickers or BARS_RESAMPLE_FROM_1M == "off":
+        return {}
+
+    base: dict[str, pd.DataFrame] = {}
+    if BARS_RESAMPLE_FROM_1M == "always":
+        base = _download_intraday(tickers, interval="1m", period=period, prepost=prepost, refresh=refresh)
+    elif not refresh:
+        now = time.time()
+        cache_keys = [_bars_cache_key(ticker, "1m", period, prepost) for ticker in tickers]
+        for ticker, raw in zip(tickers, cache_mget(cache_client, cache_keys)):
+            cached = _decode_bars_cache(raw)
+            if cached is None or cached.empty or not isinstance(cached.index, pd.DatetimeIndex):
+                continue
+            stored_at = cached.attrs.get("storedAt")
+            if stored_at is not None and now - stored_at < CACHE_TTL_SECONDS:
+                base[ticker] = cached
+
+    frames: dict[str, pd.DataFrame] = {}
+    stored_at = int(time.time())
+    for ticker, df in base.items():
+        if df.index.tz is None:
+            df = df.tz_localize("UTC")
+        resampled = _resample_bars(df, minutes)
+        if resampled.empty:
             continue
+        frames[ticker] = resampled
+        stored_at = min(stored_at, int(df.attrs.get("storedAt") or stored_at))
+    if frames:
+        _write_bars_cache_many(
+            {_bars_cache_key(ticker, interval, period, prepost): df for ticker, df in frames.items()}, stored_at
+        )
+    return frames
 
-        filtered.append(item)
 
-    filtered.sort(
-        key=lambda x: (
-            x.get("changePct") or 0.0,
-            x.get("volume") or 0,
-            x.get("avgDailyVol10d") or x.get("avgDailyVol3m") or 0,
-        ),
-        reverse=True,
-    )
-    return filtered[:universe_limit]
+def _read_bar_store_many(
+    tickers: List[str], *, interval: str, period: str, prepost: bool
+) -> dict[str, pd.DataFrame]:
+    """
+    Stored frames trimmed to `period`, for tickers whose series covers all of its sessions.
+    `attrs["storedAt"]` is when the series was last written.
+    """
+    days = _period_days(period)
+    if bar_store is None or not days:
+        return {}
+    frames: dict[str, pd.DataFrame] = {}
+    for ticker in tickers:
+        try:
+            df = bar_store.read(ticker, interval, prepost)
+        except Exception:
+            continue
+        if df is None or df.empty:
+            continue
+        stored_at = df.attrs.get("storedAt")
+        index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+        if index.tz_convert(ET_TZ).normalize().nunique() < days:
+            continue
+        trimmed = _trim_to_period(df, period)
+        trimmed.attrs = {"storedAt": stored_at}
+        frames[ticker] = trimmed
+    return frames
+
+
+def _append_bar_store_many(frames: dict[str, pd.DataFrame], *, interval: str, prepost: bool) -> None:
+    if bar_store is None:
+        return
+    for ticker, df in frames.items():
+        try:
+            bar_store.append(ticker, interval, prepost, df)
+        except Exception:
+            # The store is a fallback tier; a failed write only costs a later download.
+            continue
+
+
+def _append_intraday_tail(
+    stale: dict[str, pd.DataFrame],
+    *,
+    interval: str,
+    period: str,
+    prepost: bool,
+) -> tuple[dict[str, pd.DataFrame], List[str]]:
+    """
+    Downloads only the bars since each cached frame's last timestamp and merges them in.
+    Returns (merged_frames, failed_tickers); failed tickers fall back to a full download.
+    """
+
+    def _fetch(batch: List[str]):
+        start = min(stale[ticker].index[-1] for ticker in batch)
+        return _yf_download(
+            tickers=" ".join(batch),
+            start=start.to_pydatetime(),
+            interval=interval,
+            prepost=prepost,
+            group_by="ticker",
+            auto_adjust=_BARS_AUTO_ADJUST,
+            threads=True,
+            progress=False,
+        )
+
+    tails, errors = _download_batches(list(stale), _fetch)
+    merged = {
+        ticker: _merge_bar_tail(df, tails.get(ticker), period) for ticker, df in stale.items() if ticker not in errors
+    }
+    return merged, list(errors)
+
+
+# Day periods requested per (interval, prepost) in this process, so their cached frames can be found.
+_bar_periods_seen: dict[tuple[str, bool], set[int]] = {}
+
+
+def _covering_periods(interval: str, period: str, prepost: bool) -> List[str]:
+    """Longer day periods whose cached frames may cover `period`, shortest first."""
+    days = _period_days(period)
+    if not days:
+        return []
+    max_days = _intraday_max_days(interval)
+    candidates = {5, REL_VOL_HISTORY_DAYS, max_days} | _bar_periods_seen.get((interval, prepost), set())
+    return [f"{d}d" for d in sorted(candidates) if days < d <= max_days]
+
+
+def _read_covering_bars_cache(
+    tickers: List[str], *, interval: str, period: str, prepost: bool
+) -> dict[str, pd.DataFrame]:
+    """
+    Fresh cached frames of longer periods, trimmed to `period`, for tickers whose frame has at least
+    `period`'s sessions. Slices are not written back, so each bar is cached once per interval.
+    """
+    days = _period_days(period)
+    periods = _covering_periods(interval, period, prepost)
+    if not tickers or not periods:
+        return {}
+    # One MGET for every candidate; shorter periods come first, so the smallest covering frame wins.
+    candidates = [(ticker, longer) for ticker in tickers for longer in periods]
+    raws = cache_mget(cache_client, [_bars_cache_key(t, interval, longer, prepost) for t, longer in candidates])
+    frames: dict[str, pd.DataFrame] = {}
+    now = time.time()
+    for (ticker, _), raw in zip(candidates, raws):
+        if ticker in frames or not raw:
+            continue
+        cached = _decode_bars_cache(raw)
+        if cached is None or cached.empty or not isinstance(cached.index, pd.DatetimeIndex):
+            continue
+        stored_at = cached.attrs.get("storedAt")
+        if stored_at is None or now - stored_at >= CACHE_TTL_SECONDS:
+            continue
+        index = cached.index if cached.index.tz is not None else cached.index.tz_localize("UTC")
+        if index.tz_convert(ET_TZ).normalize().nunique() < days:
+            continue
+        trimmed = _trim_to_period(cached, period)
+        trimmed.attrs = {"storedAt": stored_at}
+        frames[ticker] = trimmed
+    return frames
 
 
 def _download_intraday(
@@ -581,90 +1643,101 @@ def _download_intraday(
     interval: str,
     period: str,
     prepost: bool,
+    refresh: bool = False,
 ) -> dict[str, pd.DataFrame]:
     if not tickers:
         return {}
+    days = _period_days(period)
+    if days:
+        _bar_periods_seen.setdefault((interval, prepost), set()).add(days)
 
     frames: dict[str, pd.DataFrame] = {}
     missing: List[str] = []
-    for ticker in tickers:
-        cache_key = f"md:barsdf:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
-        cached = None
-        try:
-            raw = cache_client.get(cache_key)
-        except Exception:
-            raw = None
-        if raw:
-            try:
-                payload = raw if isinstance(raw, dict) else json.loads(raw)
-            except json.JSONDecodeError:
-                payload = None
-            if isinstance(payload, dict):
-                columns = payload.get("columns")
-                data = payload.get("data")
-                index = payload.get("index")
-                if isinstance(columns, list) and isinstance(data, list) and isinstance(index, list):
-                    try:
-                        cached = pd.DataFrame(data, columns=columns)
-                        cached.index = pd.to_datetime(index)
-                    except Exception:
-                        cached = None
-        if cached is not None and not getattr(cached, "empty", True):
-            frames[ticker] = cached
-        else:
-            missing.append(ticker)
+    stale: dict[str, pd.DataFrame] = {}
+    if refresh and not BARS_INCREMENTAL:
+        missing = list(tickers)
+    else:
+        now = time.time()
+        cache_keys = [_bars_cache_key(ticker, interval, period, prepost) for ticker in tickers]
+        for ticker, raw in zip(tickers, cache_mget(cache_client, cache_keys)):
+            cached = _decode_bars_cache(raw)
+            if cached is None or getattr(cached, "empty", True):
+                missing.append(ticker)
+                continue
+            # Entries without `storedAt` predate incremental updates and only live for CACHE_TTL_SECONDS.
+            stored_at = cached.attrs.get("storedAt")
+            if not refresh and (stored_at is None or now - stored_at < CACHE_TTL_SECONDS):
+                frames[ticker] = cached
+            elif BARS_INCREMENTAL and isinstance(cached.index, pd.DatetimeIndex) and cached.index.tz is not None:
+                stale[ticker] = cached
+            else:
+                missing.append(ticker)
+
+    if (missing or stale) and BARS_SLICE_LONGER_PERIODS and not refresh:
+        sliced = _read_covering_bars_cache(missing + list(stale), interval=interval, period=period, prepost=prepost)
+        frames.update(sliced)
+        missing = [ticker for ticker in missing if ticker not in sliced]
+        stale = {ticker: df for ticker, df in stale.items() if ticker not in sliced}
+
+    if missing and bar_store is not None:
+        # Bars evicted from Redis (or lost with it) are usually still on disk.
+        now = time.time()
+        stored = _read_bar_store_many(missing, interval=interval, period=period, prepost=prepost)
+        fresh: dict[str, pd.DataFrame] = {}
+        for ticker, df in stored.items():
+            stored_at = df.attrs.get("storedAt")
+            if not refresh and stored_at is not None and now - stored_at < CACHE_TTL_SECONDS:
+                fresh[ticker] = df
+            elif BARS_INCREMENTAL and df.index.tz is not None:
+                stale[ticker] = df
+        missing = [ticker for ticker in missing if ticker not in fresh and ticker not in stale]
+        if fresh:
+            frames.update(fresh)
+            _write_bars_cache_many(
+                {_bars_cache_key(ticker, interval, period, prepost): df for ticker, df in fresh.items()},
+                min(int(df.attrs["storedAt"]) for df in fresh.values()),
+            )
 
-    for batch in _chunk(missing, 50):
-        try:
-            data = yf.download(
+    if (missing or stale) and interval in _RESAMPLE_MINUTES and BARS_RESAMPLE_FROM_1M != "off":
+        derived = _resample_from_base(
+            missing + list(stale), interval=interval, period=period, prepost=prepost, refresh=refresh
+        )
+        frames.update(derived)
+        missing = [ticker for ticker in missing if ticker not in derived]
+        stale = {ticker: df for ticker, df in stale.items() if ticker not in derived}
+
+    if stale:
+        merged, failed = _append_intraday_tail(stale, interval=interval, period=period, prepost=prepost)
+        frames.update(merged)
+        missing.extend(failed)
+        _write_bars_cache_many(
+            {_bars_cache_key(ticker, interval, period, prepost): df for ticker, df in merged.items()}
+        )
+        _append_bar_store_many(merged, interval=interval, prepost=prepost)
+
+    if missing:
+
+        def _fetch(batch: List[str]):
+            return _yf_download(
                 tickers=" ".join(batch),
                 period=period,
                 interval=interval,
                 prepost=prepost,
                 group_by="ticker",
-                auto_adjust=False,
+                auto_adjust=_BARS_AUTO_ADJUST,
                 threads=True,
                 progress=False,
             )
-        except Exception as exc:
-            raise HTTPException(status_code=502, detail=f"yfinance error: {exc}") from exc
-
-        if data is None or getattr(data, "empty", False):
-            continue
 
-        if isinstance(data.columns, pd.MultiIndex):
-            for ticker in batch:
-                if ticker in data.columns.levels[0]:
-                    df = data[ticker].dropna(how="all")
-                    if not df.empty:
-                        frames[ticker] = df
-                        cache_key = f"md:barsdf:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
-                        if isinstance(df.index, pd.DatetimeIndex):
-                            try:
-                                payload = {
-                                    "columns": list(df.columns),
-                                    "index": [ts.isoformat() for ts in df.index],
-                                    "data": df.values.tolist(),
-                                }
-                                cache_client.setex(cache_key, CACHE_TTL_SECONDS, json.dumps(payload))
-                            except Exception:
-                                pass
-        else:
-            ticker = batch[0]
-            df = data.dropna(how="all")
-            if not df.empty:
-                frames[ticker] = df
-                cache_key = f"md:barsdf:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
-                if isinstance(df.index, pd.DatetimeIndex):
-                    try:
-                        payload = {
-                            "columns": list(df.columns),
-                            "index": [ts.isoformat() for ts in df.index],
-                            "data": df.values.tolist(),
-                        }
-                        cache_client.setex(cache_key, CACHE_TTL_SECONDS, json.dumps(payload))
-                    except Exception:
-                        pass
+        downloaded, errors = _download_batches(missing, _fetch)
+        if errors and not frames and not downloaded:
+            # Nothing at all to serve; failed batches are otherwise dropped like tickers without bars.
+            raise HTTPException(status_code=502, detail=f"yfinance error: {next(iter(errors.values()))}")
+        frames.update(downloaded)
+        _write_bars_cache_many(
+            {_bars_cache_key(ticker, interval, period, prepost): df for ticker, df in downloaded.items()}
+        )
+        _append_bar_store_many(downloaded, interval=interval, prepost=prepost)
 
     return frames
 
@@ -813,28 +1886,17 @@ def _compute_rvol_recent_k_1m(
     if not isinstance(df.index, pd.DatetimeIndex):
         return result
 
-    df = _df_to_et(df)
-    if df is None or df.empty:
-        return result
-
-    df_reg = _between_time(df, "09:30", "16:00")
-    if df_reg is None or df_reg.empty:
-        return result
-
-    df_reg = df_reg.sort_index()
-    grouped = {date: day_df for date, day_df in df_reg.groupby(df_reg.index.date) if not day_df.empty}
-    if not grouped:
-        return result
-
-    dates = sorted(grouped.keys())
-    today_date = dates[-1]
-    today_df = grouped.get(today_date)
-    if today_df is None or today_df.empty:
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    sessions = features_engine.session_index(df, ET_TZ)
+    # Regular-session rows of each day that has any, oldest first.
+    regular = [sessions.segment(i, REG_START_NS, REG_END_NS) for i in range(sessions.days)]
+    regular = [(start, end) for start, end in regular if end > start]
+    if not regular:
         return result
 
-    today_df = today_df.sort_index()
-    last_ts = today_df.index[-1]
-
+    today_df = df.iloc[regular[-1][0] : regular[-1][1]]
+    bar_time = sessions.bar_time(regular[-1][1] - 1)
     today_vol_series = today_df["Volume"].fillna(0)
     if today_vol_series.empty:
         return result
@@ -848,26 +1910,22 @@ def _compute_rvol_recent_k_1m(
     today_cum_vol = float(today_vol_series.sum())
 
     baseline_frames: List[pd.DataFrame] = []
-    prior_dates = dates[:-1]
-    if baseline_days > 0 and prior_dates:
-        for date in prior_dates[-baseline_days:]:
-            day_df = grouped.get(date)
-            if day_df is not None and not day_df.empty:
-                baseline_frames.append(day_df.sort_index())
+    prior_days = regular[:-1]
+    if baseline_days > 0 and prior_days:
+        for start, end in prior_days[-baseline_days:]:
+            baseline_frames.append(df.iloc[start:end])
 
     if include_today:
         if exclude_last_k_from_today and len(today_df) > k:
-            baseline_frames.append(today_df.iloc[:-k].sort_index())
+            baseline_frames.append(today_df.iloc[:-k])
         else:
             baseline_frames.append(today_df)
 
     baseline_1m_avg = None
     if baseline_frames:
-        baseline_df = pd.concat(baseline_frames, axis=0)
-        if baseline_df is not None and not baseline_df.empty:
-            baseline_vols = baseline_df["Volume"].fillna(0)
-            if not baseline_vols.empty:
-                baseline_1m_avg = float(baseline_vols.mean())
+        baseline_vols = pd.concat([frame["Volume"] for frame in baseline_frames], axis=0).fillna(0)
+        if not baseline_vols.empty:
+            baseline_1m_avg = float(baseline_vols.mean())
 
     baseline_k_vol = None
     baseline_cum_vol = None
@@ -892,7 +1950,7 @@ def _compute_rvol_recent_k_1m(
             "todayCumVol": int(today_cum_vol),
             "baselineCumVol": baseline_cum_vol,
             "barIndex": bar_index,
-            "barTime": last_ts.strftime("%H:%M"),
+            "barTime": bar_time,
         }
     )
     return result
@@ -1130,14 +2188,40 @@ class HodVwapApproachResponse(BaseModel):
     cache: Optional[CacheInfo] = None
 
 
-def _validate_intraday_request(request: ScannerUniverseRequest) -> tuple[str, str]:
-    interval = (request.interval or "5m").strip()
-    period = (request.period or "1d").strip()
-    if interval not in {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}:
-        raise HTTPException(status_code=400, detail="Unsupported interval")
-    if period not in {"1d", "5d"}:
-        raise HTTPException(status_code=400, detail="Unsupported period")
-    return interval, period
+class ScanBatchSpec(BaseModel):
+    # Route name of a public scanner, e.g. "day-gainers" or "hod-breakouts".
+    scanner: str
+    # Optional client label echoed back, to tell apart several specs for the same scanner.
+    id: Optional[str] = None
+    # Request body the scanner's own endpoint would take.
+    params: dict = {}
+
+
+class ScanBatchRequest(BaseModel):
+    scans: List[ScanBatchSpec]
+
+
+class ScanBatchResult(BaseModel):
+    scanner: str
+    id: Optional[str] = None
+    status: int
+    # The scanner's own response body (including its `cache` info) when status is 200.
+    data: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class ScanBatchResponse(BaseModel):
+    results: List[ScanBatchResult]
+
+
+def _validate_intraday_request(request: ScannerUniverseRequest) -> tuple[str, str]:
+    interval = (request.interval or "5m").strip()
+    period = (request.period or "1d").strip()
+    if interval not in {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}:
+        raise HTTPException(status_code=400, detail="Unsupported interval")
+    if period not in {"1d", "5d"}:
+        raise HTTPException(status_code=400, detail="Unsupported period")
+    return interval, period
 
 
 def _effective_price_bounds(request: ScannerUniverseRequest) -> tuple[float, float]:
@@ -1162,187 +2246,375 @@ def _features_cache_key(request: ScannerUniverseRequest) -> str:
     )
 
 
-def _load_universe_items(request: ScannerUniverseRequest) -> List[dict]:
-    min_price, max_price = _effective_price_bounds(request)
-    universe_key = _universe_cache_key(
-        SCANNER_UNIVERSE_LIMIT, min_price, max_price, request.minAvgVol, request.minChangePct
+def _superset_features_cache_key(request: ScannerUniverseRequest) -> str:
+    interval, period = _validate_intraday_request(request)
+    return (
+        "md:scanner:features:superset:"
+        f"u={SCANNER_UNIVERSE_LIMIT}:"
+        f"int={interval}:per={period}:prepost={int(request.prepost)}:slopeN={request.closeSlopeN}:"
+        f"relM={REL_VOL_METHOD}:relInt={REL_VOL_INTERVAL}:relHistD={REL_VOL_HISTORY_DAYS}:"
+        f"relBaseD={REL_VOL_BASELINE_DAYS}:relK={REL_VOL_K_BARS}:"
+        f"relInclT={int(REL_VOL_BASELINE_INCLUDE_TODAY)}:relExclK={int(REL_VOL_BASELINE_EXCLUDE_LAST_K)}"
     )
-    cached_universe = read_cache(universe_key)
-    if cached_universe and isinstance(cached_universe, list):
-        return cached_universe
 
-    universe_items = _fetch_scanner_universe(
-        universe_limit=SCANNER_UNIVERSE_LIMIT,
-        min_price=min_price,
-        max_price=max_price,
-        min_avg_vol=request.minAvgVol,
-        min_change_pct=float(request.minChangePct or 0.0) / 100.0,
-    )
-    write_cache(universe_key, universe_items)
-    return universe_items
 
+def _features_source_key(request: ScannerUniverseRequest) -> str:
+    """The cache key of the features computation backing `request` (shared by all filters when superset)."""
+    if SCANNER_SUPERSET_FEATURES:
+        return _superset_features_cache_key(request)
+    return _features_cache_key(request)
 
-def _compute_features(request: ScannerUniverseRequest) -> dict:
-    interval, period = _validate_intraday_request(request)
-    universe_items = _load_universe_items(request)
-    tickers = [x["ticker"] for x in universe_items if x.get("ticker")]
-    meta = {x["ticker"]: x for x in universe_items if x.get("ticker")}
 
-    period_for_frames = period
-    if (
-        REL_VOL_METHOD == "recent_k_1m"
-        and REL_VOL_REUSE_PRIMARY_1M_DOWNLOAD
-        and interval == "1m"
-        and REL_VOL_HISTORY_DAYS > 1
-    ):
-        primary_days = _period_days(period_for_frames) or 0
-        if primary_days < REL_VOL_HISTORY_DAYS:
-            period_for_frames = f"{REL_VOL_HISTORY_DAYS}d"
+def _superset_universe_key() -> str:
+    return f"md:universe:scanner:superset:limit={SCANNER_UNIVERSE_LIMIT}"
 
-    frames = _download_intraday(tickers, interval=interval, period=period_for_frames, prepost=bool(request.prepost))
 
-    rel_vol_frames: dict[str, pd.DataFrame] = {}
-    if REL_VOL_METHOD == "recent_k_1m" and tickers and REL_VOL_HISTORY_DAYS > 0 and REL_VOL_BASELINE_DAYS > 0:
-        if (
-            REL_VOL_REUSE_PRIMARY_1M_DOWNLOAD
-            and interval == "1m"
-            and ((_period_days(period_for_frames) or 0) >= REL_VOL_HISTORY_DAYS)
-        ):
-            rel_vol_frames = frames
-        else:
-            try:
-                rel_vol_frames = _download_intraday(
-                    tickers,
-                    interval=REL_VOL_INTERVAL,
-                    period=f"{REL_VOL_HISTORY_DAYS}d",
-                    prepost=False,
-                )
-            except HTTPException:
-                rel_vol_frames = {}
-    features: List[dict] = []
+def _load_superset_universe(refresh: bool = False) -> List[dict]:
+    universe_key = _superset_universe_key()
 
-    for ticker in tickers:
-        df = frames.get(ticker)
-        if df is None or df.empty:
-            continue
+    def _read():
+        cached_universe = read_cache(universe_key)
+        if cached_universe and isinstance(cached_universe, list):
+            return cached_universe
+        return None
 
-        df_today = _df_to_et_latest_session(df)
-        if df_today is None or df_today.empty:
-            continue
+    if not refresh:
+        cached_universe = _read()
+        if cached_universe is not None:
+            return cached_universe
 
-        df_pre = _between_time(df_today, "04:00", "09:29")
-        df_reg = _between_time(df_today, "09:30", "16:00")
-        df_post = _between_time(df_today, "16:00", "20:00")
+    def _compute():
+        universe_items = _fetch_scanner_superset(SCANNER_UNIVERSE_LIMIT)
+        write_cache(universe_key, universe_items)
+        return universe_items
+
+    return _single_flight(universe_key, _read, _compute, refresh=refresh)
 
-        m = meta.get(ticker, {})
-        avg_daily_vol = m.get("avgDailyVol10d") or m.get("avgDailyVol3m")
-        avg_daily_vol_f = _safe_float(avg_daily_vol) or None
-        avg_volume_20d = avg_daily_vol_f
-        market_cap = _safe_float(m.get("marketCap"))
-        float_shares = _safe_float(m.get("floatShares"))
-        exchange = m.get("exchange")  # Get exchange from metadata
 
-        prev_close = _safe_float(m.get("prevClose"))
-        prev_bar_close = None
-        if df_reg is not None and df_reg.shape[0] >= 2:
-            prev_bar_close = _safe_float(df_reg["Close"].iloc[-2])
+def _load_universe_items(request: ScannerUniverseRequest, refresh: bool = False) -> List[dict]:
+    min_price, max_price = _effective_price_bounds(request)
+    universe_key = _universe_cache_key(
+        SCANNER_UNIVERSE_LIMIT, min_price, max_price, request.minAvgVol, request.minChangePct
+    )
+    def _read():
+        cached_universe = read_cache(universe_key)
+        if cached_universe and isinstance(cached_universe, list):
+            return cached_universe
+        return None
 
-        pre_price = _last_close(df_pre)
-        pre_vol = _sum_volume(df_pre)
+    if not refresh:
+        cached_universe = _read()
+        if cached_universe is not None:
+            return cached_universe
 
-        regular_close = _last_close(df_reg)
-        reg_vol = _sum_volume(df_reg)
+    def _compute():
+        universe_items = _fetch_scanner_universe(
+            universe_limit=SCANNER_UNIVERSE_LIMIT,
+            min_price=min_price,
+            max_price=max_price,
+            min_avg_vol=request.minAvgVol,
+            min_change_pct=float(request.minChangePct or 0.0) / 100.0,
+        )
+        write_cache(universe_key, universe_items)
+        return universe_items
 
-        post_price = _last_close(df_post)
-        post_vol = _sum_volume(df_post)
+    return _single_flight(universe_key, _read, _compute, refresh=refresh)
 
-        last_price = regular_close or _last_close(df_today) or _safe_float(m.get("last"))
 
-        rel_vol_fields = _compute_rvol_recent_k_1m(
-            rel_vol_frames.get(ticker),
+def _rel_vol_fields_from_frame(df: Optional[pd.DataFrame]) -> dict:
+    return _compute_rvol_recent_k_1m(
+        df,
+        baseline_days=REL_VOL_BASELINE_DAYS,
+        k_bars=REL_VOL_K_BARS,
+        include_today=REL_VOL_BASELINE_INCLUDE_TODAY,
+        exclude_last_k_from_today=REL_VOL_BASELINE_EXCLUDE_LAST_K,
+    )
+
+
+def _session_stats_from_frame(df: Optional[pd.DataFrame], close_slope_n: int) -> Optional[dict]:
+    """
+    Per-frame reference implementation of `features.session_stats` for a single ticker.
+    """
+    if df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+        return None
+
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    sessions = features_engine.session_index(df, ET_TZ)
+    today_start, today_end = sessions.day(-1)
+    df_today = df.iloc[today_start:today_end]
+    df_pre = df.iloc[slice(*sessions.segment(-1, PRE_START_NS, PRE_END_NS))]
+    df_reg = df.iloc[slice(*sessions.segment(-1, REG_START_NS, REG_END_NS))]
+    df_post = df.iloc[slice(*sessions.segment(-1, POST_START_NS, POST_END_NS))]
+    has_reg = df_reg is not None and not df_reg.empty
+
+    prev_bar_close = None
+    if df_reg is not None and df_reg.shape[0] >= 2:
+        prev_bar_close = _safe_float(df_reg["Close"].iloc[-2])
+
+    hod = _safe_float(df_reg["High"].max()) if has_reg else None
+    lod = _safe_float(df_reg["Low"].min()) if has_reg else None
+    hod_test_count = 0
+    if hod not in (None, 0) and has_reg:
+        hod_test_count = int((((hod - df_reg["Close"]).abs() / hod) <= 0.003).fillna(False).sum())
+
+    last_reg_low = None
+    last_reg_high = None
+    if has_reg:
+        last_bar = df_reg.tail(1)
+        if not last_bar.empty:
+            last_reg_low = _safe_float(last_bar["Low"].iloc[0])
+            last_reg_high = _safe_float(last_bar["High"].iloc[0])
+
+    return {
+        "todayClose": _last_close(df_today),
+        "prePrice": _last_close(df_pre),
+        "preVolume": _sum_volume(df_pre),
+        "regularClose": _last_close(df_reg),
+        "regularVolume": _sum_volume(df_reg),
+        "postPrice": _last_close(df_post),
+        "postVolume": _sum_volume(df_post),
+        "prevBarClose": prev_bar_close,
+        "hod": hod,
+        "lod": lod,
+        "hodTestCount": hod_test_count,
+        "vwap": _vwap(df_reg) if has_reg else None,
+        "closeSlopeN": _close_slope(df_reg, close_slope_n) if has_reg else None,
+        "atr": _atr(df_reg, 14) if has_reg else None,
+        "lastRegLow": last_reg_low,
+        "lastRegHigh": last_reg_high,
+    }
+
+
+def _universe_bar_stats(
+    tickers: List[str],
+    frames: dict[str, pd.DataFrame],
+    rel_vol_frames: dict[str, pd.DataFrame],
+    close_slope_n: int,
+) -> tuple[dict[str, Optional[dict]], dict[str, dict]]:
+    stack = features_engine.stack_frames(frames, tickers, ET_TZ)
+    stats_by_ticker: dict[str, Optional[dict]] = features_engine.session_stats(stack, close_slope_n)
+    for ticker in tickers:
+        if ticker not in stats_by_ticker:
+            stats_by_ticker[ticker] = _session_stats_from_frame(frames.get(ticker), close_slope_n)
+
+    rel_vol_by_ticker: dict[str, dict] = {}
+    if rel_vol_frames:
+        rel_stack = stack if rel_vol_frames is frames else features_engine.stack_frames(rel_vol_frames, tickers, ET_TZ)
+        rel_vol_by_ticker = features_engine.rvol_recent_k_1m(
+            rel_stack,
             baseline_days=REL_VOL_BASELINE_DAYS,
             k_bars=REL_VOL_K_BARS,
             include_today=REL_VOL_BASELINE_INCLUDE_TODAY,
             exclude_last_k_from_today=REL_VOL_BASELINE_EXCLUDE_LAST_K,
         )
-        rel_vol = _safe_float(rel_vol_fields.get("relVol"))
-
-        hod = _safe_float(df_reg["High"].max()) if df_reg is not None and not df_reg.empty else None
-        lod = _safe_float(df_reg["Low"].min()) if df_reg is not None and not df_reg.empty else None
-        distance_to_hod = None
-        hod_test_count = 0
-        if hod not in (None, 0) and last_price is not None:
-            distance_to_hod = (hod - last_price) / hod
-            if df_reg is not None and not df_reg.empty:
-                hod_test_count = int((((hod - df_reg["Close"]).abs() / hod) <= 0.003).fillna(False).sum())
-
-        vwap_val = _vwap(df_reg) if df_reg is not None and not df_reg.empty else None
-        abs_vwap_distance = None
-        if last_price is not None and vwap_val not in (None, 0):
-            abs_vwap_distance = abs((last_price - vwap_val) / vwap_val)
-
-        range_pct = None
-        pos_in_range = None
-        dist_to_hod = None
-        if hod is not None and lod not in (None, 0) and hod > lod and last_price is not None:
-            range_pct = (hod - lod) / lod
-            pos_in_range = (last_price - lod) / (hod - lod)
-            dist_to_hod = (hod - last_price) / hod if hod else None
-
-        close_slope_n = _close_slope(df_reg, request.closeSlopeN) if df_reg is not None and not df_reg.empty else None
-        atr_val = _atr(df_reg, 14) if df_reg is not None and not df_reg.empty else None
-
-        intraday_vol = None
-        last_reg_high = None
-        if df_reg is not None and not df_reg.empty:
-            last_bar = df_reg.tail(1)
-            if not last_bar.empty:
-                low = _safe_float(last_bar["Low"].iloc[0])
-                high = _safe_float(last_bar["High"].iloc[0])
-                if low not in (None, 0) and high is not None:
-                    intraday_vol = (high - low) / low
-                last_reg_high = high
-
-        features.append(
-            {
-                "ticker": ticker,
-                "exchange": exchange,
-                "prevClose": prev_close,
-                "prevBarClose": prev_bar_close,
-                "avgDailyVol": avg_daily_vol_f,
-                "avgVolume20d": avg_volume_20d,
-                "marketCap": market_cap,
-                "floatShares": float_shares,
-                "preMarketPrice": pre_price,
-                "preMarketVolume": pre_vol,
-                "regularClose": regular_close,
-                "todayVolume": reg_vol,
-                "postMarketPrice": post_price,
-                "postMarketVolume": post_vol,
-                "price": last_price,
-                "hod": hod,
-                "lod": lod,
-                "distanceToHod": distance_to_hod,
-                "hodTestCount": hod_test_count,
-                "vwap": vwap_val,
-                "absVwapDistance": abs_vwap_distance,
-                "rangePct": range_pct,
-                "posInRange": pos_in_range,
-                "distToHod": dist_to_hod,
-                "relVol": rel_vol,
-                "relVolTod": rel_vol_fields.get("relVolTod"),
-                "todayCumVol": rel_vol_fields.get("todayCumVol"),
-                "baselineCumVol": rel_vol_fields.get("baselineCumVol"),
-                "todayBarVol": rel_vol_fields.get("todayBarVol"),
-                "baselineBarVol": rel_vol_fields.get("baselineBarVol"),
-                "barIndex": rel_vol_fields.get("barIndex"),
-                "barTime": rel_vol_fields.get("barTime"),
-                "closeSlopeN": close_slope_n,
-                "atr": atr_val,
-                "intradayVol": intraday_vol,
-                "lastRegHigh": last_reg_high,
-            }
+    for ticker in tickers:
+        if ticker not in rel_vol_by_ticker:
+            rel_vol_by_ticker[ticker] = _rel_vol_fields_from_frame(rel_vol_frames.get(ticker))
+    return stats_by_ticker, rel_vol_by_ticker
+
+
+def _feature_row(ticker: str, m: dict, stats: dict, rel_vol_fields: dict) -> dict:
+    avg_daily_vol = m.get("avgDailyVol10d") or m.get("avgDailyVol3m")
+    avg_daily_vol_f = _safe_float(avg_daily_vol) or None
+    avg_volume_20d = avg_daily_vol_f
+    market_cap = _safe_float(m.get("marketCap"))
+    float_shares = _safe_float(m.get("floatShares"))
+    exchange = m.get("exchange")  # Get exchange from metadata
+    prev_close = _safe_float(m.get("prevClose"))
+
+    regular_close = stats["regularClose"]
+    last_price = regular_close or stats["todayClose"] or _safe_float(m.get("last"))
+    rel_vol = _safe_float(rel_vol_fields.get("relVol"))
+
+    hod = stats["hod"]
+    lod = stats["lod"]
+    distance_to_hod = None
+    hod_test_count = 0
+    if hod not in (None, 0) and last_price is not None:
+        distance_to_hod = (hod - last_price) / hod
+        hod_test_count = stats["hodTestCount"]
+
+    vwap_val = stats["vwap"]
+    abs_vwap_distance = None
+    if last_price is not None and vwap_val not in (None, 0):
+        abs_vwap_distance = abs((last_price - vwap_val) / vwap_val)
+
+    range_pct = None
+    pos_in_range = None
+    dist_to_hod = None
+    if hod is not None and lod not in (None, 0) and hod > lod and last_price is not None:
+        range_pct = (hod - lod) / lod
+        pos_in_range = (last_price - lod) / (hod - lod)
+        dist_to_hod = (hod - last_price) / hod if hod else None
+
+    intraday_vol = None
+    low = stats["lastRegLow"]
+    high = stats["lastRegHigh"]
+    if low not in (None, 0) and high is not None:
+        intraday_vol = (high - low) / low
+
+    return {
+        "ticker": ticker,
+        "exchange": exchange,
+        "prevClose": prev_close,
+        "prevBarClose": stats["prevBarClose"],
+        "avgDailyVol": avg_daily_vol_f,
+        "avgVolume20d": avg_volume_20d,
+        "marketCap": market_cap,
+        "floatShares": float_shares,
+        "preMarketPrice": stats["prePrice"],
+        "preMarketVolume": stats["preVolume"],
+        "regularClose": regular_close,
+        "todayVolume": stats["regularVolume"],
+        "postMarketPrice": stats["postPrice"],
+        "postMarketVolume": stats["postVolume"],
+        "price": last_price,
+        "hod": hod,
+        "lod": lod,
+        "distanceToHod": distance_to_hod,
+        "hodTestCount": hod_test_count,
+        "vwap": vwap_val,
+        "absVwapDistance": abs_vwap_distance,
+        "rangePct": range_pct,
+        "posInRange": pos_in_range,
+        "distToHod": dist_to_hod,
+        "relVol": rel_vol,
+        "relVolTod": rel_vol_fields.get("relVolTod"),
+        "todayCumVol": rel_vol_fields.get("todayCumVol"),
+        "baselineCumVol": rel_vol_fields.get("baselineCumVol"),
+        "todayBarVol": rel_vol_fields.get("todayBarVol"),
+        "baselineBarVol": rel_vol_fields.get("baselineBarVol"),
+        "barIndex": rel_vol_fields.get("barIndex"),
+        "barTime": rel_vol_fields.get("barTime"),
+        "closeSlopeN": stats["closeSlopeN"],
+        "atr": stats["atr"],
+        "intradayVol": intraday_vol,
+        "lastRegHigh": high,
+    }
+
+
+def _rel_vol_source(interval: str, period: str) -> tuple[str, int, bool]:
+    """Interval and history days of the bars rel-vol is computed from, and whether they are the primary frames."""
+    if REL_VOL_REUSE_PRIMARY_1M_DOWNLOAD and interval == "1m":
+        return "1m", max(_period_days(period) or 0, REL_VOL_HISTORY_DAYS), True
+    return REL_VOL_INTERVAL, REL_VOL_HISTORY_DAYS, False
+
+
+def _et_day_number(now: datetime) -> int:
+    """ET calendar date as days since the epoch, the `day` of `features.rvol_baselines`."""
+    return (now.astimezone(ET_TZ).date() - datetime(1970, 1, 1).date()).days
+
+
+def _rel_vol_baseline_key(ticker: str, interval: str, history_days: int) -> str:
+    return f"md:relvol:baseline:{ticker}:int={interval}:histD={history_days}:baseD={REL_VOL_BASELINE_DAYS}"
+
+
+def _read_rel_vol_baselines(tickers: List[str], interval: str, history_days: int) -> dict[str, dict]:
+    """Cached baselines built for today's ET session; other days' entries are ignored."""
+    today = _et_day_number(datetime.now(timezone.utc))
+    keys = [_rel_vol_baseline_key(ticker, interval, history_days) for ticker in tickers]
+    return {
+        ticker: baseline
+        for ticker, baseline in zip(tickers, read_cache_many(keys))
+        if isinstance(baseline, dict) and baseline.get("day") == today
+    }
+
+
+def _write_rel_vol_baselines(
+    frames: dict[str, pd.DataFrame], tickers: List[str], interval: str, history_days: int
+) -> None:
+    stack = features_engine.stack_frames(frames, tickers, ET_TZ)
+    today = _et_day_number(datetime.now(timezone.utc))
+    baselines = features_engine.rvol_baselines(stack, REL_VOL_BASELINE_DAYS)
+    # Before today's open the latest session is yesterday's, which today's bars cannot be combined with.
+    write_cache_many(
+        {
+            _rel_vol_baseline_key(ticker, interval, history_days): baseline
+            for ticker, baseline in baselines.items()
+            if baseline["day"] == today
+        },
+        REL_VOL_BASELINE_TTL_SECONDS,
+    )
+
+
+def _download_rel_vol_frames(tickers: List[str], interval: str, period: str, refresh: bool) -> dict[str, pd.DataFrame]:
+    try:
+        return _download_intraday(tickers, interval=interval, period=period, prepost=False, refresh=refresh)
+    except HTTPException:
+        return {}
+
+
+def _compute_features(
+    request: ScannerUniverseRequest, refresh: bool = False, universe_items: Optional[List[dict]] = None
+) -> dict:
+    interval, period = _validate_intraday_request(request)
+    if universe_items is None:
+        universe_items = _load_universe_items(request, refresh=refresh)
+    tickers = [x["ticker"] for x in universe_items if x.get("ticker")]
+    meta = {x["ticker"]: x for x in universe_items if x.get("ticker")}
+
+    rel_vol_enabled = (
+        REL_VOL_METHOD == "recent_k_1m" and bool(tickers) and REL_VOL_HISTORY_DAYS > 0 and REL_VOL_BASELINE_DAYS > 0
+    )
+    rel_interval, history_days, reuse_primary = _rel_vol_source(interval, period)
+    baselines: dict[str, dict] = {}
+    if rel_vol_enabled and REL_VOL_BASELINE_CACHE and not refresh:
+        baselines = _read_rel_vol_baselines(tickers, rel_interval, history_days)
+    history_tickers = [ticker for ticker in tickers if ticker not in baselines]
+
+    period_for_frames = period
+    if REL_VOL_METHOD == "recent_k_1m" and reuse_primary and REL_VOL_HISTORY_DAYS > 1 and history_tickers:
+        primary_days = _period_days(period_for_frames) or 0
+        if primary_days < REL_VOL_HISTORY_DAYS:
+            period_for_frames = f"{REL_VOL_HISTORY_DAYS}d"
+
+    frames = _download_intraday(
+        tickers, interval=interval, period=period_for_frames, prepost=bool(request.prepost), refresh=refresh
+    )
+
+    rel_vol_frames: dict[str, pd.DataFrame] = {}
+    cached_rel_vol: dict[str, dict] = {}
+    if rel_vol_enabled:
+        if baselines:
+            today_tickers = list(baselines)
+            today_frames = (
+                frames if reuse_primary else _download_rel_vol_frames(today_tickers, rel_interval, "1d", refresh)
+            )
+            cached_rel_vol = features_engine.rvol_from_baselines(
+                features_engine.stack_frames(today_frames, today_tickers, ET_TZ),
+                baselines,
+                k_bars=REL_VOL_K_BARS,
+                include_today=REL_VOL_BASELINE_INCLUDE_TODAY,
+                exclude_last_k_from_today=REL_VOL_BASELINE_EXCLUDE_LAST_K,
+            )
+            history_tickers = [ticker for ticker in tickers if ticker not in cached_rel_vol]
+        if history_tickers:
+            if reuse_primary and (_period_days(period_for_frames) or 0) >= REL_VOL_HISTORY_DAYS:
+                rel_vol_frames = frames
+            else:
+                rel_vol_frames = _download_rel_vol_frames(
+                    history_tickers, rel_interval, f"{history_days}d", refresh
+                )
+            if cached_rel_vol:
+                rel_vol_frames = {t: rel_vol_frames[t] for t in history_tickers if t in rel_vol_frames}
+            if REL_VOL_BASELINE_CACHE:
+                _write_rel_vol_baselines(rel_vol_frames, history_tickers, rel_interval, history_days)
+    if FEATURES_VECTORIZED:
+        stats_by_ticker, rel_vol_by_ticker = _universe_bar_stats(
+            tickers, frames, rel_vol_frames, request.closeSlopeN
         )
+    else:
+        stats_by_ticker = {t: _session_stats_from_frame(frames.get(t), request.closeSlopeN) for t in tickers}
+        rel_vol_by_ticker = {t: _rel_vol_fields_from_frame(rel_vol_frames.get(t)) for t in tickers}
+    rel_vol_by_ticker.update(cached_rel_vol)
+
+    features: List[dict] = []
+    for ticker in tickers:
+        stats = stats_by_ticker.get(ticker)
+        if stats is None:
+            continue
+        features.append(_feature_row(ticker, meta.get(ticker, {}), stats, rel_vol_by_ticker.get(ticker) or {}))
 
     return {
         "asOf": request.asOf or utc_now_iso(),
@@ -1352,82 +2624,302 @@ def _compute_features(request: ScannerUniverseRequest) -> dict:
 
 
 @app.get("/health")
-def health() -> dict:
+async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/cache/stats")
+async def cache_stats() -> dict:
+    return {
+        "l1": local_cache.stats(),
+        "warmer": dict(_warmer_status),
+        "barStore": dict(_bar_store_status),
+        "scanStreams": {
+            "feeds": len(_scan_feeds),
+            "subscribers": sum(len(feed.subscribers) for feed in _scan_feeds.values()),
+        },
+    }
+
+
 @app.get("/history", response_model=HistoryResponse)
-def history(
+async def history(
     ticker: str = Query(..., min_length=1),
     interval: str = Query("5m"),
     period: str = Query("1d"),
     prepost: bool = Query(False),
-) -> dict:
+    stream: Optional[str] = None,
+    fmt: Annotated[str, Query(alias="format")] = "rows",
+):
     interval = interval.strip()
     period = period.strip()
     if interval not in {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}:
         raise HTTPException(status_code=400, detail="Unsupported interval")
     if period not in {"1d", "5d"}:
         raise HTTPException(status_code=400, detail="Unsupported period")
+    if stream not in (None, "ndjson", "json"):
+        raise HTTPException(status_code=400, detail="Unsupported stream format")
+    if fmt not in {"rows", "columnar"}:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+
+    tickers = _normalize_tickers([ticker])
+    if not tickers:
+        raise HTTPException(status_code=400, detail="Invalid ticker")
+    ticker = tickers[0]
+
+    cache_key = _history_cache_key(ticker, interval, period, prepost)
+    if fmt == "columnar":
+        if stream is not None:
+            raise HTTPException(status_code=400, detail="Streaming requires format=rows")
+        cache_key += ":columnar"
+        payload = await read_cache_async(cache_key)
+        if not payload:
+            payload = await _run_blocking(
+                _compute_history_columnar_payload, cache_key, ticker, interval, period, prepost
+            )
+        # Built from typed arrays, so it skips the per-bar response model.
+        return DEFAULT_RESPONSE_CLASS(payload)
+
+    payload = await read_cache_async(cache_key)
+    if not payload:
+        payload = await _run_blocking(_compute_history_payload, cache_key, ticker, interval, period, prepost)
+    if stream is None:
+        return payload
+    return _stream_history(payload, stream)
 
-    cache_key = f"md:bars:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
-    cached = read_cache(cache_key)
-    if cached:
-        return cached
 
+def _history_cache_key(ticker: str, interval: str, period: str, prepost: bool) -> str:
+    return f"md:bars:{ticker}:{interval}:{period}:prepost={1 if prepost else 0}"
+
+
+def _dumps_compact(value: object) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
     try:
-        df = yf.Ticker(ticker).history(period=period, interval=interval, prepost=prepost)
+        return json.dumps(value, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        # Same as the regular JSON responses: NaN/inf are written as null.
+        return json.dumps(_nan_to_none(value), separators=(",", ":"))
+
+
+def _nan_to_none(value: object) -> object:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _nan_to_none(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_nan_to_none(v) for v in value]
+    return value
+
+
+def _history_stream_chunks(payload: dict, fmt: str):
+    """
+    Encodes a /history payload HISTORY_STREAM_CHUNK_BARS bars at a time. "ndjson" writes the
+    metadata on the first line and one bar per line; "json" writes the regular document.
+    """
+    meta = {k: v for k, v in payload.items() if k != "bars"}
+    bars = payload.get("bars") or []
+    if fmt == "ndjson":
+        yield _dumps_compact(meta) + "\n"
+        for start in range(0, len(bars), HISTORY_STREAM_CHUNK_BARS):
+            chunk = bars[start : start + HISTORY_STREAM_CHUNK_BARS]
+            yield "".join(_dumps_compact(bar) + "\n" for bar in chunk)
+        return
+
+    yield _dumps_compact(meta)[:-1] + ("," if meta else "") + '"bars":['
+    for start in range(0, len(bars), HISTORY_STREAM_CHUNK_BARS):
+        chunk = bars[start : start + HISTORY_STREAM_CHUNK_BARS]
+        yield ("," if start else "") + _dumps_compact(chunk)[1:-1]
+    yield "]}"
+
+
+def _stream_history(payload: dict, fmt: str) -> StreamingResponse:
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return StreamingResponse(_history_stream_chunks(payload, fmt), media_type=media_type)
+
+
+def _history_columns(df: pd.DataFrame) -> tuple[pd.DatetimeIndex, dict[str, list]]:
+    """Bar columns as lists, read from whole arrays, and their index; rows without a close are dropped."""
+    close = df["Close"].to_numpy(dtype=np.float64, na_value=np.nan)
+    df = df[~np.isnan(close)]
+    columns = {
+        key: df[name].to_numpy(dtype=np.float64, na_value=np.nan).tolist()
+        for key, name in (("o", "Open"), ("h", "High"), ("l", "Low"), ("c", "Close"))
+    }
+    if "Volume" in df.columns:
+        volume = np.nan_to_num(df["Volume"].to_numpy(dtype=np.float64, na_value=np.nan), nan=0.0)
+    else:
+        volume = np.zeros(len(df))
+    columns["v"] = volume.astype(np.int64).tolist()
+    return df.index, columns
+
+
+def _history_bars(df: pd.DataFrame) -> List[dict]:
+    index, columns = _history_columns(df)
+    # UTC ISO-8601 to the second, e.g. "2024-01-02T14:30:00Z".
+    seconds = np.asarray(index.values).astype("datetime64[s]")
+    stamps = np.char.add(np.datetime_as_string(seconds, unit="s"), "Z").tolist()
+    return [
+        {"t": t, "o": o, "h": h, "l": l, "c": c, "v": v}
+        for t, o, h, l, c, v in zip(stamps, columns["o"], columns["h"], columns["l"], columns["c"], columns["v"])
+    ]
+
+
+def _history_columnar(df: pd.DataFrame) -> dict[str, list]:
+    """`format=columnar` bars: epoch-millisecond `t` plus one array per field."""
+    index, columns = _history_columns(df)
+    stamps = np.asarray(index.values).astype("datetime64[ms]").view("<i8")
+    return {"t": stamps.tolist(), **columns}
+
+
+def _empty_history_columnar() -> dict[str, list]:
+    return {key: [] for key in ("t", "o", "h", "l", "c", "v")}
+
+
+def _fetch_history_frame(ticker: str, interval: str, period: str, prepost: bool) -> Optional[pd.DataFrame]:
+    """Bars for /history: derived from cached 1m bars, read from the bar store, or fetched (all unadjusted)."""
+    derived = _resample_from_base([ticker], interval=interval, period=period, prepost=prepost, refresh=False)
+    if ticker in derived:
+        return _df_to_et(derived[ticker])
+    stored = _read_bar_store_many([ticker], interval=interval, period=period, prepost=prepost).get(ticker)
+    if stored is not None and time.time() - int(stored.attrs.get("storedAt") or 0) < CACHE_TTL_SECONDS:
+        return _df_to_et(stored)
+
+    try:
+        df = yf.Ticker(ticker).history(
+            period=period, interval=interval, prepost=prepost, auto_adjust=_BARS_AUTO_ADJUST
+        )
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"yfinance error: {exc}") from exc
 
     if df is None or df.empty:
-        payload = {
-            "ticker": ticker,
-            "interval": interval,
-            "period": period,
-            "prepost": bool(prepost),
-            "timezone": "America/New_York",
-            "bars": [],
-        }
-        write_cache(cache_key, payload)
-        return payload
+        return None
 
     if isinstance(df.index, pd.DatetimeIndex):
         if df.index.tz is None:
             df = df.tz_localize("UTC")
         df = df.tz_convert(ET_TZ)
+    return df
 
-    bars: List[dict] = []
-    for idx, row in df.iterrows():
-        if pd.isna(row.get("Close")):
-            continue
-        dt = idx.to_pydatetime()
-        dt_utc = dt.astimezone(timezone.utc)
-        bars.append(
-            {
-                "t": dt_utc.replace(microsecond=0).isoformat().replace("+00:00", "Z"),
-                "o": float(row["Open"]),
-                "h": float(row["High"]),
-                "l": float(row["Low"]),
-                "c": float(row["Close"]),
-                "v": int(row["Volume"]) if not pd.isna(row.get("Volume")) else 0,
-            }
-        )
 
-    payload = {
+def _history_meta(ticker: str, interval: str, period: str, prepost: bool) -> dict:
+    return {
         "ticker": ticker,
         "interval": interval,
         "period": period,
         "prepost": bool(prepost),
         "timezone": "America/New_York",
-        "bars": bars,
     }
+
+
+def _compute_history_payload(cache_key: str, ticker: str, interval: str, period: str, prepost: bool) -> dict:
+    df = _fetch_history_frame(ticker, interval, period, prepost)
+    payload = _history_meta(ticker, interval, period, prepost)
+    payload["bars"] = _history_bars(df) if df is not None else []
     write_cache(cache_key, payload)
     return payload
 
 
+def _compute_history_columnar_payload(
+    cache_key: str, ticker: str, interval: str, period: str, prepost: bool
+) -> dict:
+    df = _fetch_history_frame(ticker, interval, period, prepost)
+    payload = _history_meta(ticker, interval, period, prepost)
+    payload["format"] = "columnar"
+    payload["bars"] = _history_columnar(df) if df is not None else _empty_history_columnar()
+    write_cache(cache_key, payload)
+    return payload
+
+
+@app.post("/history/batch", response_model=HistoryBatchResponse)
+async def history_batch(request: HistoryBatchRequest):
+    """
+    /history for many tickers: cached payloads come from one bulk read, and the misses share the
+    grouped `yf.download` path (and bar-frame cache) of `_download_intraday`.
+    """
+    interval = (request.interval or "").strip()
+    period = (request.period or "").strip()
+    if interval not in {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}:
+        raise HTTPException(status_code=400, detail="Unsupported interval")
+    if period not in {"1d", "5d"}:
+        raise HTTPException(status_code=400, detail="Unsupported period")
+    if request.format not in {"rows", "columnar"}:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    tickers = _normalize_tickers(request.tickers)
+    if len(tickers) > HISTORY_BATCH_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {HISTORY_BATCH_MAX_TICKERS} tickers per batch")
+
+    prepost = bool(request.prepost)
+    suffix = ":columnar" if request.format == "columnar" else ""
+    keys = [_history_cache_key(ticker, interval, period, prepost) + suffix for ticker in tickers]
+    cached = {ticker: payload for ticker, payload in zip(tickers, await read_cache_many_async(keys)) if payload}
+    # Tickers cached without bars stay missing until their short-lived entry expires.
+    results = {ticker: payload for ticker, payload in cached.items() if _history_payload_has_bars(payload)}
+
+    misses = [ticker for ticker in tickers if ticker not in cached]
+    if misses:
+        try:
+            results.update(
+                await _run_blocking(_compute_history_batch_payloads, misses, interval, period, prepost, request.format)
+            )
+        except HTTPException:
+            if not results:
+                raise
+
+    body = {
+        "interval": interval,
+        "period": period,
+        "prepost": prepost,
+        "results": {ticker: results[ticker] for ticker in tickers if ticker in results},
+        "missing": [ticker for ticker in tickers if ticker not in results],
+    }
+    if request.format == "columnar":
+        return DEFAULT_RESPONSE_CLASS(body)
+    return body
+
+
+def _history_payload_has_bars(payload: dict) -> bool:
+    bars = payload.get("bars")
+    if isinstance(bars, dict):
+        return bool(bars.get("t"))
+    return bool(bars)
+
+
+def _compute_history_batch_payloads(
+    tickers: List[str], interval: str, period: str, prepost: bool, fmt: str
+) -> dict[str, dict]:
+    """Payloads for the tickers that have bars; the rest are cached empty for HISTORY_EMPTY_TTL_SECONDS."""
+    frames = _download_intraday(tickers, interval=interval, period=period, prepost=prepost)
+    suffix = ":columnar" if fmt == "columnar" else ""
+    payloads: dict[str, dict] = {}
+    empty: dict[str, dict] = {}
+    for ticker in tickers:
+        df = _df_to_et(frames.get(ticker))
+        if df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+            df = None
+        payload = _history_meta(ticker, interval, period, prepost)
+        if fmt == "columnar":
+            payload["format"] = "columnar"
+            payload["bars"] = _history_columnar(df) if df is not None else _empty_history_columnar()
+        else:
+            payload["bars"] = _history_bars(df) if df is not None else []
+        if _history_payload_has_bars(payload):
+            payloads[ticker] = payload
+        else:
+            empty[ticker] = payload
+    for entries, ttl_seconds in ((payloads, None), (empty, HISTORY_EMPTY_TTL_SECONDS)):
+        if entries:
+            keys = {ticker: _history_cache_key(ticker, interval, period, prepost) + suffix for ticker in entries}
+            write_cache_many({keys[ticker]: payload for ticker, payload in entries.items()}, ttl_seconds=ttl_seconds)
+    return payloads
+
+
 @app.post("/quotes", response_model=QuotesResponse, response_model_exclude_none=True)
-def quotes(request: QuotesRequest) -> dict:
+async def quotes(request: QuotesRequest) -> dict:
+    """
+    Last prices composed from per-symbol cache entries read in one bulk read, so requests for
+    different ticker sets share entries for the symbols they have in common. Missing symbols are
+    fetched in one grouped download; stale ones are served and refreshed together in the background.
+    """
     _validate_quotes_request(request)
 
     tickers = _normalize_tickers(request.tickers)
@@ -1438,37 +2930,111 @@ def quotes(request: QuotesRequest) -> dict:
     period = (request.period or "1d").strip()
     prepost = bool(request.prepost)
 
-    cache_key = _quotes_cache_key(tickers, interval, period, prepost)
-    cached, cache_info = _read_scan_cache_entry(cache_key)
-    if cached is not None and cache_info is not None:
-        cached["cache"] = cache_info
-        if cache_info.get("willRevalidate"):
-            _schedule_revalidate(
-                cache_key,
-                lambda: _compute_quotes_payload(
-                    QuotesRequest(tickers=tickers, interval=interval, period=period, prepost=prepost)
-                ),
-            )
-        return cached
+    keys = [_quote_cache_key(ticker, interval, period, prepost) for ticker in tickers]
+    entries = {
+        ticker: (data, cache_info)
+        for ticker, (data, cache_info) in zip(tickers, await _read_scan_cache_entries_async(keys))
+        if data and cache_info
+    }
+    missing = [ticker for ticker in tickers if ticker not in entries]
+    if missing:
+        entries.update(await _run_blocking(_load_quote_entries, missing, interval, period, prepost))
 
-    payload = _compute_quotes_payload(
-        QuotesRequest(tickers=tickers, interval=interval, period=period, prepost=prepost)
+    stale = [ticker for ticker in tickers if entries[ticker][1].get("willRevalidate")]
+    if stale:
+        _schedule_quotes_revalidate(stale, interval, period, prepost)
+    return _compose_quotes_payload(tickers, entries)
+
+
+def _compute_superset_features(request: ScannerUniverseRequest, refresh: bool = False) -> dict:
+    """Features for the whole superset universe, carrying its screener items so requests can filter them."""
+    universe_items = _load_superset_universe(refresh=refresh)
+    payload = _compute_features(request, refresh=refresh, universe_items=universe_items)
+    return {**payload, "items": universe_items}
+
+
+def _features_view(request: ScannerUniverseRequest, superset: dict) -> dict:
+    """
+    The request's features payload cut from the superset one: its filters applied to the superset items,
+    and the feature rows of the tickers that pass, in rank order. Memoized in L1 against the superset
+    payload object, so scanners sharing a filter set also share the view (and its columnar snapshot).
+    """
+    memo_key = f"{_features_cache_key(request)}:view"
+    memo = local_cache.get(memo_key)
+    if memo is not None and memo[0] is superset:
+        return memo[1]
+    min_price, max_price = _effective_price_bounds(request)
+    universe_items = _filter_scanner_universe(
+        superset.get("items") or [],
+        universe_limit=SCANNER_UNIVERSE_LIMIT,
+        min_price=min_price,
+        max_price=max_price,
+        min_avg_vol=request.minAvgVol,
+        min_change_pct=float(request.minChangePct or 0.0) / 100.0,
     )
-    cache_info = _write_scan_cache_entry(cache_key, payload)
-    response = dict(payload)
-    response["cache"] = cache_info
-    return response
+    tickers = [x["ticker"] for x in universe_items if x.get("ticker")]
+    wanted = set(tickers)
+    view = {
+        "asOf": superset.get("asOf"),
+        "universe": tickers,
+        "features": [f for f in superset.get("features", []) or [] if f.get("ticker") in wanted],
+    }
+    local_cache.set(memo_key, (superset, view), CACHE_TTL_SECONDS, 512 * len(view["features"]))
+    return view
 
 
-def _get_features_cached(request: ScannerUniverseRequest) -> dict:
-    key = _features_cache_key(request)
-    cached = read_cache(key)
-    if cached and isinstance(cached, dict):
-        return cached
+def _get_features_cached(request: ScannerUniverseRequest, refresh: bool = False) -> dict:
+    key = _features_source_key(request)
+    compute_features = _compute_superset_features if SCANNER_SUPERSET_FEATURES else _compute_features
 
-    payload = _compute_features(request)
-    write_cache(key, payload)
-    return payload
+    def _read():
+        cached = read_cache(key)
+        if cached and isinstance(cached, dict):
+            return cached
+        return None
+
+    def _compute():
+        payload = compute_features(request, refresh=refresh)
+        write_cache(key, payload)
+        return payload
+
+    payload = None if refresh else _read()
+    if payload is None:
+        payload = _single_flight(key, _read, _compute, refresh=refresh)
+    return _features_view(request, payload) if SCANNER_SUPERSET_FEATURES else payload
+
+
+def _get_features_snapshot(request: ScannerUniverseRequest) -> tuple[dict, Optional[FeatureSnapshot]]:
+    """
+    Returns the cached features payload and its columnar snapshot (None when SCANNERS_VECTORIZED is off).
+    L1 hands every scanner the same payload object until it is refreshed, so the snapshot is memoized
+    against that object and its columns are built once per asOf rather than once per scan.
+    """
+    feature_payload = _get_features_cached(request)
+    if not SCANNERS_VECTORIZED:
+        return feature_payload, None
+    memo_key = f"{_features_cache_key(request)}:snapshot"
+    memo = local_cache.get(memo_key)
+    if memo is not None and memo[0] is feature_payload:
+        return feature_payload, memo[1]
+    snap = FeatureSnapshot(feature_payload)
+    local_cache.set(memo_key, (feature_payload, snap), CACHE_TTL_SECONDS, snap.nbytes)
+    return feature_payload, snap
+
+
+def _ranked_rows(snap: FeatureSnapshot, mask: np.ndarray, keys, build_row, sort_key, descending: bool) -> List[dict]:
+    """
+    Turns a scanner's boolean mask and sort keys over `snap` into its top SCANNER_RESULTS_LIMIT rows.
+    Rows are built by the same per-row function as the row-by-row path, but only for the rows returned.
+    """
+    indices = np.flatnonzero(mask)
+    order = sort_indices(indices, keys, descending)
+    if order is None:
+        rows = [row for row in (build_row(snap.rows[i]) for i in indices) if row is not None]
+        rows.sort(key=sort_key, reverse=descending)
+        return rows[:SCANNER_RESULTS_LIMIT]
+    rows = (build_row(snap.rows[i]) for i in order[:SCANNER_RESULTS_LIMIT])
+    return [row for row in rows if row is not None]
 
 
 def _scan_cache_key(name: str, base_request: ScannerUniverseRequest, extra: str) -> str:
@@ -1492,228 +3058,365 @@ def _day_gainers_cache_key(request: DayGainersRequest) -> str:
 
 
 def _serve_scan_cached(cache_key: str, compute_fn) -> dict:
-    cached, cache_info = _read_scan_cache_entry(cache_key)
-    if cached and cache_info:
-        payload = dict(cached)
-        payload["cache"] = cache_info
-        if cache_info.get("willRevalidate"):
-            _schedule_revalidate(cache_key, compute_fn)
-        return payload
+    def _read():
+        cached, cache_info = _read_scan_cache_entry(cache_key)
+        if cached and cache_info:
+            return cached, cache_info
+        return None
 
-    payload = compute_fn()
-    cache_info = _write_scan_cache_entry(cache_key, payload)
+    def _compute():
+        payload = compute_fn()
+        return payload, _write_scan_cache_entry(cache_key, payload)
+
+    entry = _read()
+    if entry is None:
+        entry = _single_flight(cache_key, _read, _compute)
+    return _scan_response(cache_key, entry, compute_fn)
+
+
+async def _serve_scan_cached_async(cache_key: str, compute_fn) -> dict:
+    """
+    Answers cache hits on the event loop (L1, then the async Redis client); misses run the
+    blocking single-flight path in `_serve_scan_cached` on the request executor.
+    """
+    cached, cache_info = await _read_scan_cache_entry_async(cache_key)
+    if not (cached and cache_info):
+        return await _run_blocking(_serve_scan_cached, cache_key, compute_fn)
+    return _scan_response(cache_key, (cached, cache_info), compute_fn)
+
+
+def _scan_response(cache_key: str, entry: tuple[dict, dict], compute_fn) -> dict:
+    payload, cache_info = entry
     response = dict(payload)
     response["cache"] = cache_info
+    if cache_info.get("willRevalidate"):
+        _schedule_revalidate(cache_key, compute_fn)
     return response
 
 
-def _compute_day_gainers_payload(request: DayGainersRequest) -> dict:
+def _day_gainer_row(
+    f: dict, request: DayGainersRequest, min_price: float, max_price: float, min_change_ratio: float
+) -> Optional[dict]:
+    symbol = f.get("ticker")
+    if not symbol:
+        return None
+
+    price = _safe_float(f.get("price"))
+    if price is None or not (min_price <= price <= max_price):
+        return None
+
+    prev_close = _safe_float(f.get("prevClose"))
+    if prev_close in (None, 0):
+        return None
+
+    today_vol = _safe_int(f.get("todayVolume")) or 0
+    if today_vol < max(int(request.minTodayVolume or 0), 0):
+        return None
+
+    change_ratio = (price - prev_close) / prev_close
+    if change_ratio < min_change_ratio:
+        return None
+
+    return {
+        "symbol": symbol,
+        "exchange": f.get("exchange"),
+        "price": price,
+        "prev_close": prev_close,
+        "change_pct": _to_pct_points(change_ratio),
+        "volume": today_vol,
+        "relative_volume": _safe_float(f.get("relVol")),
+        "relative_volume_tod": _safe_float(f.get("relVolTod")),
+        "today_cum_volume": _safe_int(f.get("todayCumVol")),
+        "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
+        "bar_index": _safe_int(f.get("barIndex")),
+        "bar_time": f.get("barTime"),
+        "float_shares": _safe_float(f.get("floatShares")),
+        "market_cap": _safe_float(f.get("marketCap")),
+    }
+
+
+def _day_gainers_sort_key(x: dict) -> tuple:
+    return (
+        x.get("change_pct") or 0.0,
+        x.get("relative_volume") or 0.0,
+        x.get("volume") or 0,
+    )
+
+
+def _day_gainers_results(request: DayGainersRequest, feature_payload: dict) -> List[dict]:
     min_price, max_price = _effective_price_bounds(request)
     min_change_ratio = float(request.minChangePct or 0.0) / 100.0
-    feature_payload = _get_features_cached(request)
     results: List[dict] = []
     for f in feature_payload.get("features", []):
-        symbol = f.get("ticker")
-        if not symbol:
-            continue
-
-        price = _safe_float(f.get("price"))
-        if price is None or not (min_price <= price <= max_price):
-            continue
-
-        prev_close = _safe_float(f.get("prevClose"))
-        if prev_close in (None, 0):
-            continue
+        row = _day_gainer_row(f, request, min_price, max_price, min_change_ratio)
+        if row is not None:
+            results.append(row)
+    results.sort(key=_day_gainers_sort_key, reverse=True)
+    return results[:SCANNER_RESULTS_LIMIT]
 
-        today_vol = _safe_int(f.get("todayVolume")) or 0
-        if today_vol < max(int(request.minTodayVolume or 0), 0):
-            continue
 
+def _day_gainers_results_vectorized(request: DayGainersRequest, snap: FeatureSnapshot) -> List[dict]:
+    min_price, max_price = _effective_price_bounds(request)
+    min_change_ratio = float(request.minChangePct or 0.0) / 100.0
+    price, prev_close = snap.floats("price"), snap.floats("prevClose")
+    today_vol = snap.ints("todayVolume")
+    with np.errstate(all="ignore"):
         change_ratio = (price - prev_close) / prev_close
-        if change_ratio < min_change_ratio:
-            continue
-
-        results.append(
-            {
-                "symbol": symbol,
-                "exchange": f.get("exchange"),
-                "price": price,
-                "prev_close": prev_close,
-                "change_pct": _to_pct_points(change_ratio),
-                "volume": today_vol,
-                "relative_volume": _safe_float(f.get("relVol")),
-                "relative_volume_tod": _safe_float(f.get("relVolTod")),
-                "today_cum_volume": _safe_int(f.get("todayCumVol")),
-                "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
-                "bar_index": _safe_int(f.get("barIndex")),
-                "bar_time": f.get("barTime"),
-                "float_shares": _safe_float(f.get("floatShares")),
-                "market_cap": _safe_float(f.get("marketCap")),
-            }
+        mask = ~snap.nulls("price") & (min_price <= price) & (price <= max_price)
+        mask &= ~snap.nulls("prevClose") & (prev_close != 0)
+        mask &= today_vol >= max(int(request.minTodayVolume or 0), 0)
+        mask &= ~(change_ratio < min_change_ratio)
+        keys = (
+            or_default(_to_pct_points(change_ratio), snap.nulls("prevClose"), 0.0),
+            or_default(snap.floats("relVol"), snap.nulls("relVol"), 0.0),
+            today_vol,
         )
-
-    results.sort(
-        key=lambda x: (
-            x.get("change_pct") or 0.0,
-            x.get("relative_volume") or 0.0,
-            x.get("volume") or 0,
-        ),
-        reverse=True,
+    return _ranked_rows(
+        snap,
+        mask,
+        keys,
+        lambda f: _day_gainer_row(f, request, min_price, max_price, min_change_ratio),
+        _day_gainers_sort_key,
+        descending=True,
     )
+
+
+def _compute_day_gainers_payload(request: DayGainersRequest) -> dict:
+    feature_payload, snap = _get_features_snapshot(request)
+    if snap is not None:
+        results = _day_gainers_results_vectorized(request, snap)
+    else:
+        results = _day_gainers_results(request, feature_payload)
     return {
         "scanner": "day_gainers",
         "asOf": feature_payload.get("asOf") or utc_now_iso(),
         "sorted_by": "change_pct desc, relative_volume desc, volume desc",
-        "results": results[:SCANNER_RESULTS_LIMIT],
+        "results": results,
     }
 
 
 @app.post("/scan/day-gainers", response_model=DayGainersResponse)
-def scan_day_gainers(request: DayGainersRequest) -> dict:
+async def scan_day_gainers(request: DayGainersRequest) -> dict:
     cache_key = _day_gainers_cache_key(request)
     request_snapshot = request.model_dump()
 
     def _compute():
         return _compute_day_gainers_payload(DayGainersRequest(**request_snapshot))
 
-    return _serve_scan_cached(cache_key, _compute)
+    return await _serve_scan_cached_async(cache_key, _compute)
 
 
-@app.post("/scan/hod-vwap-momentum", response_model=HodVwapMomentumResponse, include_in_schema=False)
-def scan_hod_vwap_momentum(request: HodVwapMomentumRequest) -> dict:
-    cache_key = _scan_cache_key(
-        "hod_vwap_momentum",
-        request,
-        f"minVol={request.minTodayVolume}:minRelVol={request.minRelVol}:"
-        f"maxDistToHod={request.maxDistToHod}:reqHod={int(request.requireHodBreak)}:"
-        f"reqVwap={int(request.requireVwapBreak)}:resLimit={SCANNER_RESULTS_LIMIT}",
+_BREAK_PRIORITY = {"hod+vwap": 3, "hod": 2, "vwap": 1, None: 0}
+
+
+def _momentum_row(f: dict, request: HodVwapMomentumRequest, min_price: float, max_price: float) -> Optional[dict]:
+    symbol = f.get("ticker")
+    if not symbol:
+        return None
+    price = _safe_float(f.get("price"))
+    day_high = _safe_float(f.get("hod"))
+    day_low = _safe_float(f.get("lod"))
+    range_pct = _safe_float(f.get("rangePct"))
+    rel_vol = _safe_float(f.get("relVol"))
+    avg_volume_20d = _safe_float(f.get("avgVolume20d"))
+    prev_close = _safe_float(f.get("prevClose"))
+    today_vol = _safe_int(f.get("todayVolume")) or 0
+
+    if price is None or day_high is None or day_low is None or range_pct is None:
+        return None
+    if price < min_price or price > max_price:
+        return None
+    if today_vol < request.minTodayVolume:
+        return None
+    if rel_vol is not None and rel_vol < request.minRelVol:
+        return None
+    if prev_close in (None, 0):
+        return None
+
+    price_change_ratio = (price - prev_close) / prev_close
+
+    vwap_val = _safe_float(f.get("vwap"))
+    last_reg_high = _safe_float(f.get("lastRegHigh"))
+
+    dist_to_hod_ratio = None
+    if day_high not in (None, 0) and price is not None:
+        dist_to_hod_ratio = (day_high - price) / day_high
+
+    max_dist_to_hod_ratio = float(request.maxDistToHod or 0.0) / 100.0
+    hod_break_now = False
+    if dist_to_hod_ratio is not None and last_reg_high is not None:
+        hod_break_now = (
+            last_reg_high >= (day_high * 0.999999)
+            and dist_to_hod_ratio <= max_dist_to_hod_ratio
+        )
+
+    vwap_break_now = False
+    vwap_distance_ratio = None
+    if vwap_val not in (None, 0) and price is not None:
+        vwap_distance_ratio = (price - vwap_val) / vwap_val
+        vwap_break_now = price >= vwap_val
+
+    close_slope_n = _safe_float(f.get("closeSlopeN"))
+    if close_slope_n is None or close_slope_n <= 0:
+        return None
+
+    if request.requireHodBreak and not hod_break_now:
+        return None
+    if request.requireVwapBreak and not vwap_break_now:
+        return None
+    if not request.requireHodBreak and not request.requireVwapBreak:
+        if not (hod_break_now or vwap_break_now):
+            return None
+
+    break_type = None
+    if request.requireHodBreak and not request.requireVwapBreak:
+        break_type = "hod"
+    elif request.requireVwapBreak and not request.requireHodBreak:
+        break_type = "vwap"
+    else:
+        if hod_break_now and vwap_break_now:
+            break_type = "hod+vwap"
+        elif hod_break_now:
+            break_type = "hod"
+        elif vwap_break_now:
+            break_type = "vwap"
+
+    return {
+        "symbol": symbol,
+        "exchange": f.get("exchange"),
+        "price": price,
+        "day_high": day_high,
+        "day_low": day_low,
+        "last_bar_high": last_reg_high,
+        "range_pct": _to_pct_points(range_pct),
+        "relative_volume": rel_vol,
+        "relative_volume_tod": _safe_float(f.get("relVolTod")),
+        "today_cum_volume": _safe_int(f.get("todayCumVol")),
+        "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
+        "bar_index": _safe_int(f.get("barIndex")),
+        "bar_time": f.get("barTime"),
+        "price_change_pct": _to_pct_points(price_change_ratio),
+        "avg_volume_20d": avg_volume_20d,
+        "vwap": vwap_val,
+        "vwap_distance": _to_pct_points(vwap_distance_ratio),
+        "distance_to_hod": _to_pct_points(dist_to_hod_ratio),
+        "break_type": break_type,
+    }
+
+
+def _momentum_sort_key(x: dict) -> tuple:
+    return (
+        _BREAK_PRIORITY.get(x.get("break_type"), 0),
+        x.get("price_change_pct") or 0.0,
+        x.get("relative_volume") or 0.0,
     )
-    cached = read_cache(cache_key)
-    if cached:
-        return cached
 
-    feature_payload = _get_features_cached(request)
+
+def _momentum_results(request: HodVwapMomentumRequest, feature_payload: dict) -> List[dict]:
     min_price, max_price = _effective_price_bounds(request)
     results: List[dict] = []
     for f in feature_payload.get("features", []):
-        symbol = f.get("ticker")
-        if not symbol:
-            continue
-        price = _safe_float(f.get("price"))
-        day_high = _safe_float(f.get("hod"))
-        day_low = _safe_float(f.get("lod"))
-        range_pct = _safe_float(f.get("rangePct"))
-        rel_vol = _safe_float(f.get("relVol"))
-        avg_volume_20d = _safe_float(f.get("avgVolume20d"))
-        prev_close = _safe_float(f.get("prevClose"))
-        today_vol = _safe_int(f.get("todayVolume")) or 0
-
-        if price is None or day_high is None or day_low is None or range_pct is None:
-            continue
-        if price < min_price or price > max_price:
-            continue
-        if today_vol < request.minTodayVolume:
-            continue
-        if rel_vol is not None and rel_vol < request.minRelVol:
-            continue
-        if prev_close in (None, 0):
-            continue
-
-        price_change_ratio = (price - prev_close) / prev_close
+        row = _momentum_row(f, request, min_price, max_price)
+        if row is not None:
+            results.append(row)
+    results.sort(key=_momentum_sort_key, reverse=True)
+    return results[:SCANNER_RESULTS_LIMIT]
 
-        vwap_val = _safe_float(f.get("vwap"))
-        prev_bar_close = _safe_float(f.get("prevBarClose"))
-        last_reg_high = _safe_float(f.get("lastRegHigh"))
 
-        dist_to_hod_ratio = None
-        if day_high not in (None, 0) and price is not None:
-            dist_to_hod_ratio = (day_high - price) / day_high
+def _momentum_results_vectorized(request: HodVwapMomentumRequest, snap: FeatureSnapshot) -> List[dict]:
+    min_price, max_price = _effective_price_bounds(request)
+    price, day_high = snap.floats("price"), snap.floats("hod")
+    prev_close, rel_vol = snap.floats("prevClose"), snap.floats("relVol")
+    vwap_val, last_reg_high = snap.floats("vwap"), snap.floats("lastRegHigh")
+    close_slope_n = snap.floats("closeSlopeN")
+    with np.errstate(all="ignore"):
+        mask = ~(snap.nulls("price") | snap.nulls("hod") | snap.nulls("lod") | snap.nulls("rangePct"))
+        mask &= ~((price < min_price) | (price > max_price))
+        mask &= ~(snap.ints("todayVolume") < request.minTodayVolume)
+        mask &= ~(rel_vol < request.minRelVol)
+        mask &= ~snap.nulls("prevClose") & (prev_close != 0)
+        price_change_ratio = (price - prev_close) / prev_close
 
         max_dist_to_hod_ratio = float(request.maxDistToHod or 0.0) / 100.0
-        hod_break_now = False
-        if dist_to_hod_ratio is not None and last_reg_high is not None:
-            hod_break_now = (
-                last_reg_high >= (day_high * 0.999999)
-                and dist_to_hod_ratio <= max_dist_to_hod_ratio
-            )
-
-        vwap_break_now = False
-        vwap_distance_ratio = None
-        if vwap_val not in (None, 0) and price is not None:
-            vwap_distance_ratio = (price - vwap_val) / vwap_val
-            vwap_break_now = price >= vwap_val
-
-        close_slope_n = _safe_float(f.get("closeSlopeN"))
-        if close_slope_n is None or close_slope_n <= 0:
-            continue
-
-        if request.requireHodBreak and not hod_break_now:
-            continue
-        if request.requireVwapBreak and not vwap_break_now:
-            continue
-        if not request.requireHodBreak and not request.requireVwapBreak:
-            if not (hod_break_now or vwap_break_now):
-                continue
+        dist_to_hod_ratio = (day_high - price) / day_high
+        hod_break_now = (
+            (day_high != 0)
+            & ~snap.nulls("lastRegHigh")
+            & (last_reg_high >= (day_high * 0.999999))
+            & (dist_to_hod_ratio <= max_dist_to_hod_ratio)
+        )
+        vwap_break_now = ~snap.nulls("vwap") & (vwap_val != 0) & (price >= vwap_val)
+        mask &= ~snap.nulls("closeSlopeN") & ~(close_slope_n <= 0)
 
-        break_type = None
+        if request.requireHodBreak:
+            mask &= hod_break_now
+        if request.requireVwapBreak:
+            mask &= vwap_break_now
         if request.requireHodBreak and not request.requireVwapBreak:
-            break_type = "hod"
+            priority = np.full(len(snap), _BREAK_PRIORITY["hod"])
         elif request.requireVwapBreak and not request.requireHodBreak:
-            break_type = "vwap"
+            priority = np.full(len(snap), _BREAK_PRIORITY["vwap"])
         else:
-            if hod_break_now and vwap_break_now:
-                break_type = "hod+vwap"
-            elif hod_break_now:
-                break_type = "hod"
-            elif vwap_break_now:
-                break_type = "vwap"
-
-        results.append(
-            {
-                "symbol": symbol,
-                "exchange": f.get("exchange"),
-                "price": price,
-                "day_high": day_high,
-                "day_low": day_low,
-                "last_bar_high": last_reg_high,
-                "range_pct": _to_pct_points(range_pct),
-                "relative_volume": rel_vol,
-                "relative_volume_tod": _safe_float(f.get("relVolTod")),
-                "today_cum_volume": _safe_int(f.get("todayCumVol")),
-                "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
-                "bar_index": _safe_int(f.get("barIndex")),
-                "bar_time": f.get("barTime"),
-                "price_change_pct": _to_pct_points(price_change_ratio),
-                "avg_volume_20d": avg_volume_20d,
-                "vwap": vwap_val,
-                "vwap_distance": _to_pct_points(vwap_distance_ratio),
-                "distance_to_hod": _to_pct_points(dist_to_hod_ratio),
-                "break_type": break_type,
-            }
+            if not request.requireHodBreak:
+                mask &= hod_break_now | vwap_break_now
+            priority = np.select(
+                [hod_break_now & vwap_break_now, hod_break_now, vwap_break_now],
+                [_BREAK_PRIORITY["hod+vwap"], _BREAK_PRIORITY["hod"], _BREAK_PRIORITY["vwap"]],
+                default=_BREAK_PRIORITY[None],
+            )
+        keys = (
+            priority,
+            or_default(_to_pct_points(price_change_ratio), snap.nulls("prevClose"), 0.0),
+            or_default(rel_vol, snap.nulls("relVol"), 0.0),
         )
-
-    break_priority = {"hod+vwap": 3, "hod": 2, "vwap": 1, None: 0}
-    results.sort(
-        key=lambda x: (
-            break_priority.get(x.get("break_type"), 0),
-            x.get("price_change_pct") or 0.0,
-            x.get("relative_volume") or 0.0,
-        ),
-        reverse=True,
+    return _ranked_rows(
+        snap,
+        mask,
+        keys,
+        lambda f: _momentum_row(f, request, min_price, max_price),
+        _momentum_sort_key,
+        descending=True,
+    )
+
+
+@app.post("/scan/hod-vwap-momentum", response_model=HodVwapMomentumResponse, include_in_schema=False)
+def scan_hod_vwap_momentum(request: HodVwapMomentumRequest, refresh: bool = False) -> dict:
+    cache_key = _scan_cache_key(
+        "hod_vwap_momentum",
+        request,
+        f"minVol={request.minTodayVolume}:minRelVol={request.minRelVol}:"
+        f"maxDistToHod={request.maxDistToHod}:reqHod={int(request.requireHodBreak)}:"
+        f"reqVwap={int(request.requireVwapBreak)}:resLimit={SCANNER_RESULTS_LIMIT}",
     )
+    cached = None if refresh else read_cache(cache_key)
+    if cached:
+        return cached
+
+    feature_payload, snap = _get_features_snapshot(request)
+    if snap is not None:
+        results = _momentum_results_vectorized(request, snap)
+    else:
+        results = _momentum_results(request, feature_payload)
     payload = {
         "scanner": "hod_vwap_momentum",
         "asOf": feature_payload.get("asOf") or utc_now_iso(),
         "sorted_by": "break_type desc, price_change_pct desc, relative_volume desc",
-        "results": results[:SCANNER_RESULTS_LIMIT],
+        "results": results,
     }
     write_cache(cache_key, payload)
     return payload
 
 
-def _compute_hod_breakouts_payload(request: HodBreakoutsRequest) -> dict:
+def _detached_scan_payload(payload: dict) -> dict:
+    # Cached payloads are shared through the in-process cache; copy before editing rows.
+    detached = dict(payload)
+    detached["results"] = [dict(row) if isinstance(row, dict) else row for row in payload.get("results", []) or []]
+    return detached
+
+
+def _compute_hod_breakouts_payload(request: HodBreakoutsRequest, refresh: bool = False) -> dict:
     momentum_request = HodVwapMomentumRequest(**request.model_dump(), requireHodBreak=True, requireVwapBreak=False)
-    payload = scan_hod_vwap_momentum(momentum_request)
+    payload = _detached_scan_payload(scan_hod_vwap_momentum(momentum_request, refresh=refresh))
     payload["scanner"] = "hod_breakouts"
     for row in payload.get("results", []) or []:
         if isinstance(row, dict):
@@ -1735,30 +3438,34 @@ def _compute_hod_breakouts_payload(request: HodBreakoutsRequest) -> dict:
     return payload
 
 
-@app.post("/scan/hod-breakouts", response_model=HodVwapMomentumResponse, response_model_exclude_none=True)
-def scan_hod_breakouts(request: HodBreakoutsRequest) -> dict:
-    cache_key = _scan_cache_key(
+def _hod_breakouts_cache_key(request: HodBreakoutsRequest) -> str:
+    return _scan_cache_key(
         "hod_breakouts",
         request,
         f"minVol={request.minTodayVolume}:minRelVol={request.minRelVol}:"
         f"maxDistToHod={request.maxDistToHod}:resLimit={SCANNER_RESULTS_LIMIT}",
     )
+
+
+@app.post("/scan/hod-breakouts", response_model=HodVwapMomentumResponse, response_model_exclude_none=True)
+async def scan_hod_breakouts(request: HodBreakoutsRequest) -> dict:
+    cache_key = _hod_breakouts_cache_key(request)
     request_snapshot = request.model_dump()
 
     def _compute():
         return _compute_hod_breakouts_payload(HodBreakoutsRequest(**request_snapshot))
 
-    return _serve_scan_cached(cache_key, _compute)
+    return await _serve_scan_cached_async(cache_key, _compute)
 
 
-def _compute_vwap_breakouts_payload(request: VwapBreakoutsRequest) -> dict:
+def _compute_vwap_breakouts_payload(request: VwapBreakoutsRequest, refresh: bool = False) -> dict:
     momentum_request = HodVwapMomentumRequest(
         **request.model_dump(),
         maxDistToHod=0.0,
         requireHodBreak=False,
         requireVwapBreak=True,
     )
-    payload = scan_hod_vwap_momentum(momentum_request)
+    payload = _detached_scan_payload(scan_hod_vwap_momentum(momentum_request, refresh=refresh))
     payload["scanner"] = "vwap_breakouts"
     for row in payload.get("results", []) or []:
         if isinstance(row, dict):
@@ -1782,219 +3489,327 @@ def _compute_vwap_breakouts_payload(request: VwapBreakoutsRequest) -> dict:
     return payload
 
 
-@app.post("/scan/vwap-breakouts", response_model=HodVwapMomentumResponse, response_model_exclude_none=True)
-def scan_vwap_breakouts(request: VwapBreakoutsRequest) -> dict:
-    cache_key = _scan_cache_key(
+def _vwap_breakouts_cache_key(request: VwapBreakoutsRequest) -> str:
+    return _scan_cache_key(
         "vwap_breakouts",
         request,
         f"minVol={request.minTodayVolume}:minRelVol={request.minRelVol}:resLimit={SCANNER_RESULTS_LIMIT}",
     )
+
+
+@app.post("/scan/vwap-breakouts", response_model=HodVwapMomentumResponse, response_model_exclude_none=True)
+async def scan_vwap_breakouts(request: VwapBreakoutsRequest) -> dict:
+    cache_key = _vwap_breakouts_cache_key(request)
     request_snapshot = request.model_dump()
 
     def _compute():
         return _compute_vwap_breakouts_payload(VwapBreakoutsRequest(**request_snapshot))
 
-    return _serve_scan_cached(cache_key, _compute)
+    return await _serve_scan_cached_async(cache_key, _compute)
 
 
-def _compute_volume_spikes_payload(request: VolumeSpikesRequest) -> dict:
-    feature_payload = _get_features_cached(request)
+def _volume_spike_row(
+    f: dict, request: VolumeSpikesRequest, min_price: float, max_price: float, min_change_ratio: float
+) -> Optional[dict]:
+    symbol = f.get("ticker")
+    if not symbol:
+        return None
+
+    price = _safe_float(f.get("price"))
+    prev_close = _safe_float(f.get("prevClose"))
+    rel_vol = _safe_float(f.get("relVol"))
+    avg_volume_20d = _safe_float(f.get("avgVolume20d"))
+    range_pct = _safe_float(f.get("rangePct"))
+    today_vol = _safe_int(f.get("todayVolume")) or 0
+
+    if price is None or prev_close in (None, 0):
+        return None
+    if price < min_price or price > max_price:
+        return None
+    if today_vol < request.minTodayVolume:
+        return None
+    if rel_vol is None or rel_vol < request.minRelVol:
+        return None
+
+    price_change_ratio = (price - prev_close) / prev_close
+    if price_change_ratio < min_change_ratio:
+        return None
+
+    return {
+        "symbol": symbol,
+        "exchange": f.get("exchange"),
+        "price": price,
+        "range_pct": _to_pct_points(range_pct),
+        "relative_volume": rel_vol,
+        "relative_volume_tod": _safe_float(f.get("relVolTod")),
+        "today_cum_volume": _safe_int(f.get("todayCumVol")),
+        "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
+        "bar_index": _safe_int(f.get("barIndex")),
+        "bar_time": f.get("barTime"),
+        "price_change_pct": _to_pct_points(price_change_ratio),
+        "avg_volume_20d": avg_volume_20d,
+    }
+
+
+def _volume_spikes_sort_key(x: dict) -> tuple:
+    return (
+        x.get("relative_volume") or 0.0,
+        x.get("price_change_pct") or 0.0,
+    )
+
+
+def _volume_spikes_results(request: VolumeSpikesRequest, feature_payload: dict) -> List[dict]:
     min_price, max_price = _effective_price_bounds(request)
     min_change_ratio = float(request.minChangePct or 0.0) / 100.0
     results: List[dict] = []
-
     for f in feature_payload.get("features", []):
-        symbol = f.get("ticker")
-        if not symbol:
-            continue
+        row = _volume_spike_row(f, request, min_price, max_price, min_change_ratio)
+        if row is not None:
+            results.append(row)
+    results.sort(key=_volume_spikes_sort_key, reverse=True)
+    return results[:SCANNER_RESULTS_LIMIT]
 
-        price = _safe_float(f.get("price"))
-        prev_close = _safe_float(f.get("prevClose"))
-        rel_vol = _safe_float(f.get("relVol"))
-        avg_volume_20d = _safe_float(f.get("avgVolume20d"))
-        range_pct = _safe_float(f.get("rangePct"))
-        today_vol = _safe_int(f.get("todayVolume")) or 0
 
-        if price is None or prev_close in (None, 0):
-            continue
-        if price < min_price or price > max_price:
-            continue
-        if today_vol < request.minTodayVolume:
-            continue
-        if rel_vol is None or rel_vol < request.minRelVol:
-            continue
-
-        price_change_ratio = (price - prev_close) / prev_close
-        if price_change_ratio < min_change_ratio:
-            continue
-
-        results.append(
-            {
-                "symbol": symbol,
-                "exchange": f.get("exchange"),
-                "price": price,
-                "range_pct": _to_pct_points(range_pct),
-                "relative_volume": rel_vol,
-                "relative_volume_tod": _safe_float(f.get("relVolTod")),
-                "today_cum_volume": _safe_int(f.get("todayCumVol")),
-                "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
-                "bar_index": _safe_int(f.get("barIndex")),
-                "bar_time": f.get("barTime"),
-                "price_change_pct": _to_pct_points(price_change_ratio),
-                "avg_volume_20d": avg_volume_20d,
-            }
+def _volume_spikes_results_vectorized(request: VolumeSpikesRequest, snap: FeatureSnapshot) -> List[dict]:
+    min_price, max_price = _effective_price_bounds(request)
+    min_change_ratio = float(request.minChangePct or 0.0) / 100.0
+    price, prev_close = snap.floats("price"), snap.floats("prevClose")
+    rel_vol = snap.floats("relVol")
+    with np.errstate(all="ignore"):
+        change_ratio = (price - prev_close) / prev_close
+        mask = ~snap.nulls("price") & ~snap.nulls("prevClose") & (prev_close != 0)
+        mask &= ~((price < min_price) | (price > max_price))
+        mask &= ~(snap.ints("todayVolume") < request.minTodayVolume)
+        mask &= ~snap.nulls("relVol") & ~(rel_vol < request.minRelVol)
+        mask &= ~(change_ratio < min_change_ratio)
+        keys = (
+            or_default(rel_vol, snap.nulls("relVol"), 0.0),
+            or_default(_to_pct_points(change_ratio), snap.nulls("prevClose"), 0.0),
         )
-
-    results.sort(
-        key=lambda x: (
-            x.get("relative_volume") or 0.0,
-            x.get("price_change_pct") or 0.0,
-        ),
-        reverse=True,
+    return _ranked_rows(
+        snap,
+        mask,
+        keys,
+        lambda f: _volume_spike_row(f, request, min_price, max_price, min_change_ratio),
+        _volume_spikes_sort_key,
+        descending=True,
     )
+
+
+def _compute_volume_spikes_payload(request: VolumeSpikesRequest) -> dict:
+    feature_payload, snap = _get_features_snapshot(request)
+    if snap is not None:
+        results = _volume_spikes_results_vectorized(request, snap)
+    else:
+        results = _volume_spikes_results(request, feature_payload)
     return {
         "scanner": "volume_spikes",
         "asOf": feature_payload.get("asOf") or utc_now_iso(),
         "sorted_by": "relative_volume desc, price_change_pct desc",
-        "results": results[:SCANNER_RESULTS_LIMIT],
+        "results": results,
     }
 
 
-@app.post("/scan/volume-spikes", response_model=HodVwapMomentumResponse, response_model_exclude_none=True)
-def scan_volume_spikes(request: VolumeSpikesRequest) -> dict:
-    cache_key = _scan_cache_key(
+def _volume_spikes_cache_key(request: VolumeSpikesRequest) -> str:
+    return _scan_cache_key(
         "volume_spikes",
         request,
         f"minVol={request.minTodayVolume}:minRelVol={request.minRelVol}:resLimit={SCANNER_RESULTS_LIMIT}",
     )
+
+
+@app.post("/scan/volume-spikes", response_model=HodVwapMomentumResponse, response_model_exclude_none=True)
+async def scan_volume_spikes(request: VolumeSpikesRequest) -> dict:
+    cache_key = _volume_spikes_cache_key(request)
     request_snapshot = request.model_dump()
 
     def _compute():
         return _compute_volume_spikes_payload(VolumeSpikesRequest(**request_snapshot))
 
-    return _serve_scan_cached(cache_key, _compute)
+    return await _serve_scan_cached_async(cache_key, _compute)
 
 
-@app.post("/scan/hod-vwap-approach", response_model=HodVwapApproachResponse, include_in_schema=False)
-def scan_hod_vwap_approach(request: HodVwapApproachRequest) -> dict:
-    cache_key = _scan_cache_key(
-        "hod_vwap_approach",
-        request,
-        f"minP={request.minSetupPrice}:maxP={request.maxSetupPrice}:minVol={request.minTodayVolume}:"
-        f"minRange={request.minRangePct}:pos={request.minPosInRange}-{request.maxPosInRange}:"
-        f"maxVwap={request.maxAbsVwapDistance}:maxHod={request.maxDistToHod}:minRelVol={request.minRelVol}:"
-        f"adaptive={int(request.adaptiveThresholds)}:resLimit={SCANNER_RESULTS_LIMIT}",
+def _approach_thresholds(request: HodVwapApproachRequest) -> tuple[float, float, Optional[float], Optional[float]]:
+    hod_thresh = float(request.maxDistToHod or 0.0) / 100.0
+    vwap_thresh = float(request.maxAbsVwapDistance or 0.0) / 100.0
+    hod_cap = None
+    vwap_cap = None
+    if float(request.maxDistToHod or 0.0) > 0.0:
+        hod_cap = max(float(request.maxDistToHod or 0.0), HOD_APPROACH_ADAPTIVE_CAP_PCT) / 100.0
+    if float(request.maxAbsVwapDistance or 0.0) > 0.0:
+        vwap_cap = max(float(request.maxAbsVwapDistance or 0.0), VWAP_APPROACH_ADAPTIVE_CAP_PCT) / 100.0
+    return hod_thresh, vwap_thresh, hod_cap, vwap_cap
+
+
+def _approach_row(f: dict, request: HodVwapApproachRequest) -> Optional[dict]:
+    symbol = f.get("ticker")
+    if not symbol:
+        return None
+    price = _safe_float(f.get("price"))
+    hod = _safe_float(f.get("hod"))
+    lod = _safe_float(f.get("lod"))
+    range_pct = _safe_float(f.get("rangePct"))
+    pos_in_range = _safe_float(f.get("posInRange"))
+    dist_to_hod = _safe_float(f.get("distToHod"))
+    vwap_val = _safe_float(f.get("vwap"))
+    abs_vwap_distance = _safe_float(f.get("absVwapDistance"))
+    today_vol = _safe_int(f.get("todayVolume")) or 0
+    rel_vol = _safe_float(f.get("relVol"))
+    close_slope_n = _safe_float(f.get("closeSlopeN"))
+    atr_val = _safe_float(f.get("atr"))
+
+    if price is None or hod is None or lod is None or range_pct is None or pos_in_range is None:
+        return None
+    if not (request.minSetupPrice <= price <= request.maxSetupPrice):
+        return None
+    if today_vol < request.minTodayVolume:
+        return None
+    if (range_pct * 100.0) < request.minRangePct:
+        return None
+    if not (request.minPosInRange <= pos_in_range <= request.maxPosInRange):
+        return None
+    if rel_vol is not None and rel_vol < request.minRelVol:
+        return None
+    if close_slope_n is None or close_slope_n < 0:
+        return None
+
+    hod_enabled = float(request.maxDistToHod or 0.0) > 0.0
+    vwap_enabled = float(request.maxAbsVwapDistance or 0.0) > 0.0
+    hod_thresh, vwap_thresh, hod_cap, vwap_cap = _approach_thresholds(request)
+
+    if request.adaptiveThresholds and atr_val not in (None, 0) and price > 0:
+        atr_ratio = atr_val / price
+        if hod_enabled and hod_cap is not None:
+            hod_thresh = max(hod_thresh, min(atr_ratio, hod_cap))
+        if vwap_enabled and vwap_cap is not None:
+            vwap_thresh = max(vwap_thresh, min(atr_ratio, vwap_cap))
+
+    near_hod = (
+        hod_enabled
+        and dist_to_hod is not None
+        and dist_to_hod <= hod_thresh
+        and price < hod
     )
-    cached = read_cache(cache_key)
-    if cached:
-        return cached
+    near_vwap = vwap_enabled and abs_vwap_distance is not None and abs_vwap_distance <= vwap_thresh
+    if not (near_hod or near_vwap):
+        return None
+
+    vwap_distance = None
+    if price is not None and vwap_val not in (None, 0):
+        vwap_distance = (price - vwap_val) / vwap_val
+
+    return {
+        "symbol": symbol,
+        "exchange": f.get("exchange"),
+        "price": price,
+        "hod": hod,
+        "distance_to_hod": _to_pct_points(dist_to_hod),
+        "vwap": vwap_val,
+        "vwap_distance": _to_pct_points(vwap_distance),
+        "range_pct": _to_pct_points(range_pct),
+        "relative_volume": rel_vol,
+        "relative_volume_tod": _safe_float(f.get("relVolTod")),
+        "today_cum_volume": _safe_int(f.get("todayCumVol")),
+        "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
+        "bar_index": _safe_int(f.get("barIndex")),
+        "bar_time": f.get("barTime"),
+    }
 
-    feature_payload = _get_features_cached(request)
-    results: List[dict] = []
-    for f in feature_payload.get("features", []):
-        symbol = f.get("ticker")
-        if not symbol:
-            continue
-        price = _safe_float(f.get("price"))
-        hod = _safe_float(f.get("hod"))
-        lod = _safe_float(f.get("lod"))
-        range_pct = _safe_float(f.get("rangePct"))
-        pos_in_range = _safe_float(f.get("posInRange"))
-        dist_to_hod = _safe_float(f.get("distToHod"))
-        vwap_val = _safe_float(f.get("vwap"))
-        abs_vwap_distance = _safe_float(f.get("absVwapDistance"))
-        today_vol = _safe_int(f.get("todayVolume")) or 0
-        rel_vol = _safe_float(f.get("relVol"))
-        close_slope_n = _safe_float(f.get("closeSlopeN"))
-        atr_val = _safe_float(f.get("atr"))
-
-        if price is None or hod is None or lod is None or range_pct is None or pos_in_range is None:
-            continue
-        if not (request.minSetupPrice <= price <= request.maxSetupPrice):
-            continue
-        if today_vol < request.minTodayVolume:
-            continue
-        if (range_pct * 100.0) < request.minRangePct:
-            continue
-        if not (request.minPosInRange <= pos_in_range <= request.maxPosInRange):
-            continue
-        if rel_vol is not None and rel_vol < request.minRelVol:
-            continue
-        if close_slope_n is None or close_slope_n < 0:
-            continue
 
-        hod_enabled = float(request.maxDistToHod or 0.0) > 0.0
-        vwap_enabled = float(request.maxAbsVwapDistance or 0.0) > 0.0
+def _approach_sort_key(x: dict) -> tuple:
+    return (
+        x.get("distance_to_hod") or 1.0,
+        abs(x.get("vwap_distance") or 0.0),
+        -(x.get("relative_volume") or 0.0),
+    )
 
-        hod_thresh = float(request.maxDistToHod or 0.0) / 100.0
-        vwap_thresh = float(request.maxAbsVwapDistance or 0.0) / 100.0
-        hod_cap = None
-        vwap_cap = None
-        if hod_enabled:
-            hod_cap = max(float(request.maxDistToHod or 0.0), HOD_APPROACH_ADAPTIVE_CAP_PCT) / 100.0
-        if vwap_enabled:
-            vwap_cap = max(float(request.maxAbsVwapDistance or 0.0), VWAP_APPROACH_ADAPTIVE_CAP_PCT) / 100.0
 
-        if request.adaptiveThresholds and atr_val not in (None, 0) and price > 0:
+def _approach_results(request: HodVwapApproachRequest, feature_payload: dict) -> List[dict]:
+    results: List[dict] = []
+    for f in feature_payload.get("features", []):
+        row = _approach_row(f, request)
+        if row is not None:
+            results.append(row)
+    results.sort(key=_approach_sort_key)
+    return results[:SCANNER_RESULTS_LIMIT]
+
+
+def _approach_results_vectorized(request: HodVwapApproachRequest, snap: FeatureSnapshot) -> List[dict]:
+    price, hod = snap.floats("price"), snap.floats("hod")
+    range_pct, pos_in_range = snap.floats("rangePct"), snap.floats("posInRange")
+    dist_to_hod, abs_vwap_distance = snap.floats("distToHod"), snap.floats("absVwapDistance")
+    vwap_val, rel_vol = snap.floats("vwap"), snap.floats("relVol")
+    close_slope_n, atr_val = snap.floats("closeSlopeN"), snap.floats("atr")
+    hod_enabled = float(request.maxDistToHod or 0.0) > 0.0
+    vwap_enabled = float(request.maxAbsVwapDistance or 0.0) > 0.0
+    hod_thresh, vwap_thresh, hod_cap, vwap_cap = _approach_thresholds(request)
+    with np.errstate(all="ignore"):
+        mask = ~(
+            snap.nulls("price") | snap.nulls("hod") | snap.nulls("lod") | snap.nulls("rangePct") | snap.nulls("posInRange")
+        )
+        mask &= (request.minSetupPrice <= price) & (price <= request.maxSetupPrice)
+        mask &= ~(snap.ints("todayVolume") < request.minTodayVolume)
+        mask &= ~((range_pct * 100.0) < request.minRangePct)
+        mask &= (request.minPosInRange <= pos_in_range) & (pos_in_range <= request.maxPosInRange)
+        mask &= ~(rel_vol < request.minRelVol)
+        mask &= ~snap.nulls("closeSlopeN") & ~(close_slope_n < 0)
+
+        hod_thresholds = np.full(len(snap), hod_thresh)
+        vwap_thresholds = np.full(len(snap), vwap_thresh)
+        if request.adaptiveThresholds:
+            adaptive = ~snap.nulls("atr") & (atr_val != 0) & (price > 0)
             atr_ratio = atr_val / price
             if hod_enabled and hod_cap is not None:
-                hod_thresh = max(hod_thresh, min(atr_ratio, hod_cap))
+                hod_thresholds = np.where(adaptive, py_max(hod_thresh, py_min(atr_ratio, hod_cap)), hod_thresh)
             if vwap_enabled and vwap_cap is not None:
-                vwap_thresh = max(vwap_thresh, min(atr_ratio, vwap_cap))
-
-        near_hod = (
-            hod_enabled
-            and dist_to_hod is not None
-            and dist_to_hod <= hod_thresh
-            and price < hod
+                vwap_thresholds = np.where(adaptive, py_max(vwap_thresh, py_min(atr_ratio, vwap_cap)), vwap_thresh)
+
+        near_hod = hod_enabled & ~snap.nulls("distToHod") & (dist_to_hod <= hod_thresholds) & (price < hod)
+        near_vwap = vwap_enabled & ~snap.nulls("absVwapDistance") & (abs_vwap_distance <= vwap_thresholds)
+        mask &= near_hod | near_vwap
+
+        vwap_missing = snap.nulls("vwap") | (vwap_val == 0)
+        vwap_distance = np.where(vwap_missing, 0.0, _to_pct_points((price - vwap_val) / vwap_val))
+        keys = (
+            or_default(_to_pct_points(dist_to_hod), snap.nulls("distToHod"), 1.0),
+            np.abs(vwap_distance),
+            -or_default(rel_vol, snap.nulls("relVol"), 0.0),
         )
-        near_vwap = vwap_enabled and abs_vwap_distance is not None and abs_vwap_distance <= vwap_thresh
-        if not (near_hod or near_vwap):
-            continue
+    return _ranked_rows(snap, mask, keys, lambda f: _approach_row(f, request), _approach_sort_key, descending=False)
 
-        vwap_distance = None
-        if price is not None and vwap_val not in (None, 0):
-            vwap_distance = (price - vwap_val) / vwap_val
-
-        results.append(
-            {
-                "symbol": symbol,
-                "exchange": f.get("exchange"),
-                "price": price,
-                "hod": hod,
-                "distance_to_hod": _to_pct_points(dist_to_hod),
-                "vwap": vwap_val,
-                "vwap_distance": _to_pct_points(vwap_distance),
-                "range_pct": _to_pct_points(range_pct),
-                "relative_volume": rel_vol,
-                "relative_volume_tod": _safe_float(f.get("relVolTod")),
-                "today_cum_volume": _safe_int(f.get("todayCumVol")),
-                "baseline_cum_volume": _safe_float(f.get("baselineCumVol")),
-                "bar_index": _safe_int(f.get("barIndex")),
-                "bar_time": f.get("barTime"),
-            }
-        )
 
-    results.sort(
-        key=lambda x: (
-            x.get("distance_to_hod") or 1.0,
-            abs(x.get("vwap_distance") or 0.0),
-            -(x.get("relative_volume") or 0.0),
-        )
+@app.post("/scan/hod-vwap-approach", response_model=HodVwapApproachResponse, include_in_schema=False)
+def scan_hod_vwap_approach(request: HodVwapApproachRequest, refresh: bool = False) -> dict:
+    cache_key = _scan_cache_key(
+        "hod_vwap_approach",
+        request,
+        f"minP={request.minSetupPrice}:maxP={request.maxSetupPrice}:minVol={request.minTodayVolume}:"
+        f"minRange={request.minRangePct}:pos={request.minPosInRange}-{request.maxPosInRange}:"
+        f"maxVwap={request.maxAbsVwapDistance}:maxHod={request.maxDistToHod}:minRelVol={request.minRelVol}:"
+        f"adaptive={int(request.adaptiveThresholds)}:resLimit={SCANNER_RESULTS_LIMIT}",
     )
+    cached = None if refresh else read_cache(cache_key)
+    if cached:
+        return cached
+
+    feature_payload, snap = _get_features_snapshot(request)
+    if snap is not None:
+        results = _approach_results_vectorized(request, snap)
+    else:
+        results = _approach_results(request, feature_payload)
     payload = {
         "scanner": "hod_vwap_approach",
         "asOf": feature_payload.get("asOf") or utc_now_iso(),
         "sorted_by": "distance_to_hod asc, abs(vwap_distance) asc, relative_volume desc",
-        "results": results[:SCANNER_RESULTS_LIMIT],
+        "results": results,
     }
     write_cache(cache_key, payload)
     return payload
 
 
-def _compute_hod_approach_payload(request: HodApproachRequest) -> dict:
+def _compute_hod_approach_payload(request: HodApproachRequest, refresh: bool = False) -> dict:
     combined_request = HodVwapApproachRequest(**request.model_dump(), maxAbsVwapDistance=0.0)
-    payload = scan_hod_vwap_approach(combined_request)
+    payload = _detached_scan_payload(scan_hod_vwap_approach(combined_request, refresh=refresh))
     payload["scanner"] = "hod_approach"
     for row in payload.get("results", []) or []:
         if isinstance(row, dict):
@@ -2016,9 +3831,8 @@ def _compute_hod_approach_payload(request: HodApproachRequest) -> dict:
     return payload
 
 
-@app.post("/scan/hod-approach", response_model=HodVwapApproachResponse, response_model_exclude_none=True)
-def scan_hod_approach(request: HodApproachRequest) -> dict:
-    cache_key = _scan_cache_key(
+def _hod_approach_cache_key(request: HodApproachRequest) -> str:
+    return _scan_cache_key(
         "hod_approach",
         request,
         f"minP={request.minSetupPrice}:maxP={request.maxSetupPrice}:minVol={request.minTodayVolume}:"
@@ -2026,20 +3840,25 @@ def scan_hod_approach(request: HodApproachRequest) -> dict:
         f"maxHod={request.maxDistToHod}:minRelVol={request.minRelVol}:adaptive={int(request.adaptiveThresholds)}:"
         f"resLimit={SCANNER_RESULTS_LIMIT}",
     )
+
+
+@app.post("/scan/hod-approach", response_model=HodVwapApproachResponse, response_model_exclude_none=True)
+async def scan_hod_approach(request: HodApproachRequest) -> dict:
+    cache_key = _hod_approach_cache_key(request)
     request_snapshot = request.model_dump()
 
     def _compute():
         return _compute_hod_approach_payload(HodApproachRequest(**request_snapshot))
 
-    return _serve_scan_cached(cache_key, _compute)
+    return await _serve_scan_cached_async(cache_key, _compute)
 
 
-def _compute_vwap_approach_payload(request: VwapApproachRequest) -> dict:
+def _compute_vwap_approach_payload(request: VwapApproachRequest, refresh: bool = False) -> dict:
     combined_request = HodVwapApproachRequest(
         **request.model_dump(),
         maxDistToHod=0.0,
     )
-    payload = scan_hod_vwap_approach(combined_request)
+    payload = _detached_scan_payload(scan_hod_vwap_approach(combined_request, refresh=refresh))
     payload["scanner"] = "vwap_approach"
     for row in payload.get("results", []) or []:
         if isinstance(row, dict):
@@ -2061,9 +3880,8 @@ def _compute_vwap_approach_payload(request: VwapApproachRequest) -> dict:
     return payload
 
 
-@app.post("/scan/vwap-approach", response_model=HodVwapApproachResponse, response_model_exclude_none=True)
-def scan_vwap_approach(request: VwapApproachRequest) -> dict:
-    cache_key = _scan_cache_key(
+def _vwap_approach_cache_key(request: VwapApproachRequest) -> str:
+    return _scan_cache_key(
         "vwap_approach",
         request,
         f"minP={request.minSetupPrice}:maxP={request.maxSetupPrice}:minVol={request.minTodayVolume}:"
@@ -2071,9 +3889,484 @@ def scan_vwap_approach(request: VwapApproachRequest) -> dict:
         f"maxVwap={request.maxAbsVwapDistance}:minRelVol={request.minRelVol}:adaptive={int(request.adaptiveThresholds)}:"
         f"resLimit={SCANNER_RESULTS_LIMIT}",
     )
+
+
+@app.post("/scan/vwap-approach", response_model=HodVwapApproachResponse, response_model_exclude_none=True)
+async def scan_vwap_approach(request: VwapApproachRequest) -> dict:
+    cache_key = _vwap_approach_cache_key(request)
     request_snapshot = request.model_dump()
 
     def _compute():
         return _compute_vwap_approach_payload(VwapApproachRequest(**request_snapshot))
 
-    return _serve_scan_cached(cache_key, _compute)
+    return await _serve_scan_cached_async(cache_key, _compute)
+
+
+# Public scanners by route name: (request model, cache key, compute).
+_SCANNERS = {
+    "day-gainers": (DayGainersRequest, _day_gainers_cache_key, _compute_day_gainers_payload),
+    "hod-breakouts": (HodBreakoutsRequest, _hod_breakouts_cache_key, _compute_hod_breakouts_payload),
+    "vwap-breakouts": (VwapBreakoutsRequest, _vwap_breakouts_cache_key, _compute_vwap_breakouts_payload),
+    "volume-spikes": (VolumeSpikesRequest, _volume_spikes_cache_key, _compute_volume_spikes_payload),
+    "hod-approach": (HodApproachRequest, _hod_approach_cache_key, _compute_hod_approach_payload),
+    "vwap-approach": (VwapApproachRequest, _vwap_approach_cache_key, _compute_vwap_approach_payload),
+}
+# Scanners filtered from a shared hod/vwap result entry (`scan_hod_vwap_*`); their compute takes `refresh`.
+_COMBINED_SCANNERS = frozenset({"hod-breakouts", "vwap-breakouts", "hod-approach", "vwap-approach"})
+# Response model and `response_model_exclude_none` of each scanner's own endpoint.
+_SCANNER_RESPONSE_MODELS = {
+    "day-gainers": (DayGainersResponse, False),
+    "hod-breakouts": (HodVwapMomentumResponse, True),
+    "vwap-breakouts": (HodVwapMomentumResponse, True),
+    "volume-spikes": (HodVwapMomentumResponse, True),
+    "hod-approach": (HodVwapApproachResponse, True),
+    "vwap-approach": (HodVwapApproachResponse, True),
+}
+
+
+def _scan_batch_compute(model, compute_fn, request_snapshot: dict):
+    return lambda: compute_fn(model(**request_snapshot))
+
+
+def _scan_batch_result(spec: ScanBatchSpec, outcome: object) -> dict:
+    result = {"scanner": spec.scanner, "id": spec.id, "status": 200, "data": None, "error": None}
+    if isinstance(outcome, HTTPException):
+        result.update(status=outcome.status_code, error=str(outcome.detail))
+    elif isinstance(outcome, Exception):
+        result.update(status=500, error=str(outcome) or type(outcome).__name__)
+    else:
+        model, exclude_none = _SCANNER_RESPONSE_MODELS[spec.scanner]
+        result["data"] = model.model_validate(outcome).model_dump(mode="json", exclude_none=exclude_none)
+    return result
+
+
+def _serve_scan_batch_group(items: List[tuple[str, object]]) -> List[object]:
+    """
+    Serves batch entries that missed the cache and share one features key, in order on one thread:
+    the first loads the features payload and snapshot, the rest reuse them from L1.
+    Returns each entry's response, or the exception it raised.
+    """
+    outcomes: List[object] = []
+    for cache_key, compute_fn in items:
+        try:
+            outcomes.append(_serve_scan_cached(cache_key, compute_fn))
+        except Exception as exc:
+            outcomes.append(exc)
+    return outcomes
+
+
+@app.post("/scan/batch", response_model=ScanBatchResponse)
+async def scan_batch(request: ScanBatchRequest) -> dict:
+    """
+    Runs several scanners in one call. Cache entries are read with one MGET; misses that share a
+    features key are computed together, so the features snapshot is loaded once for all of them.
+    Each result carries its own status and cache info; one failing scan does not fail the batch.
+    """
+    if len(request.scans) > SCAN_BATCH_MAX_SCANS:
+        raise HTTPException(status_code=400, detail=f"At most {SCAN_BATCH_MAX_SCANS} scans per batch")
+
+    results: List[Optional[dict]] = [None] * len(request.scans)
+    planned: List[tuple[int, str, str, object]] = []
+    for index, spec in enumerate(request.scans):
+        target = _SCANNERS.get(spec.scanner)
+        if target is None:
+            results[index] = _scan_batch_result(spec, HTTPException(status_code=400, detail="Unknown scanner"))
+            continue
+        model, cache_key_fn, compute_fn = target
+        try:
+            scan_request = model(**spec.params)
+            cache_key = cache_key_fn(scan_request)
+        except HTTPException as exc:
+            results[index] = _scan_batch_result(spec, exc)
+            continue
+        except ValueError as exc:
+            results[index] = _scan_batch_result(spec, HTTPException(status_code=422, detail=str(exc)))
+            continue
+        compute = _scan_batch_compute(model, compute_fn, scan_request.model_dump())
+        planned.append((index, cache_key, _features_source_key(scan_request), compute))
+
+    groups: dict[str, List[tuple[int, str, object]]] = {}
+    entries = await _read_scan_cache_entries_async([cache_key for _, cache_key, _, _ in planned])
+    for (index, cache_key, features_key, compute), (cached, cache_info) in zip(planned, entries):
+        if cached and cache_info:
+            response = _scan_response(cache_key, (cached, cache_info), compute)
+            results[index] = _scan_batch_result(request.scans[index], response)
+        else:
+            groups.setdefault(features_key, []).append((index, cache_key, compute))
+
+    async def _serve_group(items: List[tuple[int, str, object]]) -> None:
+        outcomes = await _run_blocking(_serve_scan_batch_group, [(key, compute) for _, key, compute in items])
+        for (index, _, _), outcome in zip(items, outcomes):
+            results[index] = _scan_batch_result(request.scans[index], outcome)
+
+    await asyncio.gather(*(_serve_group(items) for items in groups.values()))
+    return {"results": results}
+
+
+_SCAN_STREAM_QUEUE_SIZE = 16
+
+
+class _ScanFeed:
+    """
+    One poller per scanner cache key, shared by every subscriber with that spec. Subscribers get
+    the latest result set as a `snapshot` event, then a `diff` event whenever it changes.
+    """
+
+    def __init__(self, scanner: str, cache_key: str, compute_fn):
+        self.scanner = scanner
+        self.cache_key = cache_key
+        self.compute_fn = compute_fn
+        self.subscribers: set[asyncio.Queue] = set()
+        self.latest: Optional[dict] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+_scan_feeds: dict[str, _ScanFeed] = {}
+
+
+def _sse_event(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {_dumps_compact(data)}\n\n"
+
+
+def _scan_results_diff(previous: dict, current: dict) -> Optional[dict]:
+    """Row-level changes keyed by symbol, plus the new order; None when nothing changed."""
+    previous_rows = {row.get("symbol"): row for row in previous.get("results") or []}
+    rows = current.get("results") or []
+    order = [row.get("symbol") for row in rows]
+    upserts = [row for row in rows if previous_rows.get(row.get("symbol")) != row]
+    current_symbols = set(order)
+    removed = [symbol for symbol in previous_rows if symbol not in current_symbols]
+    if not upserts and not removed and order == list(previous_rows) and current.get("asOf") == previous.get("asOf"):
+        return None
+    return {
+        "scanner": current.get("scanner"),
+        "asOf": current.get("asOf"),
+        "upserts": upserts,
+        "removed": removed,
+        "order": order,
+    }
+
+
+def _publish_scan_feed(feed: _ScanFeed, message: str) -> None:
+    for queue in list(feed.subscribers):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A subscriber this far behind cannot apply the missed diffs; start it over.
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(_sse_event("snapshot", feed.latest))
+
+
+async def _run_scan_feed(feed: _ScanFeed) -> None:
+    model, exclude_none = _SCANNER_RESPONSE_MODELS[feed.scanner]
+    last_error = None
+    while feed.subscribers:
+        try:
+            # Same path as the scanner endpoint: cache hit, stale-while-revalidate or single-flight compute.
+            payload = await _serve_scan_cached_async(feed.cache_key, feed.compute_fn)
+            data = model.model_validate(payload).model_dump(mode="json", exclude_none=exclude_none)
+            data.pop("cache", None)
+            last_error = None
+            if feed.latest is None:
+                feed.latest = data
+                _publish_scan_feed(feed, _sse_event("snapshot", data))
+            else:
+                diff = _scan_results_diff(feed.latest, data)
+                if diff is not None:
+                    feed.latest = data
+                    _publish_scan_feed(feed, _sse_event("diff", diff))
+        except Exception as exc:
+            error = str(getattr(exc, "detail", None) or exc)
+            if error != last_error:
+                last_error = error
+                _publish_scan_feed(feed, _sse_event("error", {"scanner": feed.scanner, "error": error}))
+        await asyncio.sleep(SCAN_STREAM_POLL_SECONDS)
+
+
+def _subscribe_scan_feed(scanner: str, scan_request: ScannerUniverseRequest) -> tuple[_ScanFeed, asyncio.Queue]:
+    model, cache_key_fn, compute_fn = _SCANNERS[scanner]
+    cache_key = cache_key_fn(scan_request)
+    feed = _scan_feeds.get(cache_key)
+    if feed is None:
+        feed = _ScanFeed(scanner, cache_key, _scan_batch_compute(model, compute_fn, scan_request.model_dump()))
+        _scan_feeds[cache_key] = feed
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_SCAN_STREAM_QUEUE_SIZE)
+    if feed.latest is not None:
+        queue.put_nowait(_sse_event("snapshot", feed.latest))
+    feed.subscribers.add(queue)
+    if feed.task is None or feed.task.done():
+        feed.task = asyncio.create_task(_run_scan_feed(feed))
+    return feed, queue
+
+
+def _unsubscribe_scan_feed(feed: _ScanFeed, queue: asyncio.Queue) -> None:
+    feed.subscribers.discard(queue)
+    if feed.subscribers:
+        return
+    if _scan_feeds.get(feed.cache_key) is feed:
+        del _scan_feeds[feed.cache_key]
+    if feed.task is not None:
+        feed.task.cancel()
+
+
+async def _scan_stream_events(feed: _ScanFeed, queue: asyncio.Queue):
+    try:
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), timeout=SCAN_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # SSE comment line: keeps proxies from closing an idle stream.
+                yield ": keep-alive\n\n"
+    finally:
+        _unsubscribe_scan_feed(feed, queue)
+
+
+@app.get("/scan/stream")
+async def scan_stream(scanner: str = Query(..., min_length=1), params: Optional[str] = None) -> StreamingResponse:
+    """
+    Server-sent events for one scanner spec (`params` is the scanner's JSON request body): a
+    `snapshot` event with the current results, then a `diff` event (upserted rows, removed
+    symbols and the new order) each time they change. Identical specs share one poller.
+    """
+    target = _SCANNERS.get(scanner)
+    if target is None:
+        raise HTTPException(status_code=400, detail="Unknown scanner")
+    try:
+        spec = json.loads(params) if params else {}
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail="params must be a JSON object") from exc
+    if not isinstance(spec, dict):
+        raise HTTPException(status_code=400, detail="params must be a JSON object")
+    try:
+        scan_request = target[0](**spec)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    feed, queue = _subscribe_scan_feed(scanner, scan_request)
+    return StreamingResponse(
+        _scan_stream_events(feed, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Scanner cache warmer: keeps the default dashboard scanners fresh during extended hours so
+# foreground requests are served from cache instead of waiting on yfinance.
+# Mirrors the client's scanner defaults (day gainers show every gainer, not just >= 3%).
+_DEFAULT_WARMER_PROFILES = [
+    {"scanner": "day-gainers", "minChangePct": 0.0},
+    {"scanner": "hod-breakouts"},
+    {"scanner": "vwap-breakouts"},
+    {"scanner": "volume-spikes"},
+    {"scanner": "hod-approach"},
+    {"scanner": "vwap-approach"},
+]
+_WARMER_LEASE_KEY = "md:lease:scanner-warmer"
+_WARMER_MARGIN_SECONDS = 30
+
+_warmer_stop = threading.Event()
+_warmer_thread: Optional[threading.Thread] = None
+_warmer_status: dict = {
+    "enabled": SCANNER_WARMER_ENABLED,
+    "session": None,
+    "runs": 0,
+    "lastRunAt": None,
+    "lastDurationMs": None,
+    "lastResult": None,
+    "nextRunInSeconds": None,
+}
+
+
+def _market_session(now: datetime) -> Optional[str]:
+    """
+    Returns "pre", "regular" or "post" while US equities trade (weekdays 04:00-20:00 ET), else None.
+    Exchange holidays are not modelled; the warmer simply refreshes unchanged data on those days.
+    """
+    local = now.astimezone(ET_TZ)
+    if local.weekday() >= 5:
+        return None
+    minutes = local.hour * 60 + local.minute
+    if 4 * 60 <= minutes < 9 * 60 + 30:
+        return "pre"
+    if 9 * 60 + 30 <= minutes < 16 * 60:
+        return "regular"
+    if 16 * 60 <= minutes < 20 * 60:
+        return "post"
+    return None
+
+
+def _seconds_until_next_session(now: datetime) -> float:
+    local = now.astimezone(ET_TZ)
+    for days in range(8):
+        day = local.date() + timedelta(days=days)
+        opens_at = datetime(day.year, day.month, day.day, 4, 0, tzinfo=ET_TZ)
+        if opens_at > local and opens_at.weekday() < 5:
+            return (opens_at - local).total_seconds()
+    return float(SCANNER_WARMER_IDLE_SECONDS)
+
+
+def _warmer_delay_seconds(now: datetime) -> float:
+    if _market_session(now) is not None:
+        return float(SCANNER_WARMER_INTERVAL_SECONDS)
+    # Back off overnight and on weekends, but wake up for the pre-market open.
+    return max(1.0, min(float(SCANNER_WARMER_IDLE_SECONDS), _seconds_until_next_session(now)))
+
+
+def _warmer_profiles() -> List[tuple[str, ScannerUniverseRequest]]:
+    specs = _DEFAULT_WARMER_PROFILES
+    if SCANNER_WARMER_PROFILES:
+        try:
+            parsed = json.loads(SCANNER_WARMER_PROFILES)
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, list):
+            specs = parsed
+
+    profiles: List[tuple[str, ScannerUniverseRequest]] = []
+    for spec in specs:
+        if not isinstance(spec, dict):
+            continue
+        params = dict(spec)
+        name = params.pop("scanner", None)
+        target = _SCANNERS.get(name)
+        if target is None:
+            continue
+        try:
+            profiles.append((name, target[0](**params)))
+        except ValueError:
+            continue
+    return profiles
+
+
+def _warm_scanners_once(horizon_seconds: float) -> dict:
+    """
+    Refreshes each warmer profile whose scanner entry would go stale within `horizon_seconds`.
+    Universe, bars and features are re-fetched once per features key, then the entry is rewritten.
+    """
+    horizon = datetime.now(timezone.utc) + timedelta(seconds=horizon_seconds)
+    refreshed_features: set[str] = set()
+    warmed: List[str] = []
+    skipped: List[str] = []
+    errors: List[str] = []
+    for name, request in _warmer_profiles():
+        _, cache_key_fn, compute_fn = _SCANNERS[name]
+        try:
+            cache_key = cache_key_fn(request)
+            _, cache_info = _read_scan_cache_entry(cache_key)
+            fresh_until = _parse_utc_iso((cache_info or {}).get("freshUntil") or "")
+            if cache_info and not cache_info.get("isStale") and fresh_until and fresh_until > horizon:
+                skipped.append(name)
+                continue
+
+            features_key = _features_source_key(request)
+            if features_key not in refreshed_features:
+                _get_features_cached(request, refresh=True)
+                refreshed_features.add(features_key)
+            # The shared hod/vwap entries would otherwise keep serving results from the previous features.
+            payload = compute_fn(request, refresh=True) if name in _COMBINED_SCANNERS else compute_fn(request)
+            _write_scan_cache_entry(cache_key, payload)
+            warmed.append(name)
+        except Exception as exc:
+            errors.append(f"{name}: {getattr(exc, 'detail', None) or exc}")
+    return {"warmed": warmed, "skipped": skipped, "errors": errors}
+
+
+def _run_warmer_tick() -> Optional[dict]:
+    token = None
+    if SINGLE_FLIGHT_DISTRIBUTED:
+        # Held for the whole interval (not released) so only one worker warms per tick.
+        token = acquire_lease(cache_client, _WARMER_LEASE_KEY, max(SCANNER_WARMER_INTERVAL_SECONDS - 1, 1))
+        if token is None:
+            return None
+
+    started = time.monotonic()
+    result = _warm_scanners_once(SCANNER_WARMER_INTERVAL_SECONDS + _WARMER_MARGIN_SECONDS)
+    _warmer_status.update(
+        {
+            "runs": _warmer_status["runs"] + 1,
+            "lastRunAt": utc_now_iso(),
+            "lastDurationMs": int((time.monotonic() - started) * 1000),
+            "lastResult": result,
+        }
+    )
+    return result
+
+
+def _scanner_warmer_loop() -> None:
+    while not _warmer_stop.is_set():
+        session = _market_session(datetime.now(timezone.utc))
+        _warmer_status["session"] = session
+        if session is not None:
+            try:
+                _run_warmer_tick()
+            except Exception as exc:
+                _warmer_status["lastResult"] = {"warmed": [], "skipped": [], "errors": [str(exc)]}
+        delay = _warmer_delay_seconds(datetime.now(timezone.utc))
+        _warmer_status["nextRunInSeconds"] = int(delay)
+        _warmer_stop.wait(delay)
+
+
+def _start_scanner_warmer() -> None:
+    global _warmer_thread
+    if not SCANNER_WARMER_ENABLED or (_warmer_thread is not None and _warmer_thread.is_alive()):
+        return
+    _warmer_stop.clear()
+    _warmer_thread = threading.Thread(target=_scanner_warmer_loop, name="scanner-warmer", daemon=True)
+    _warmer_thread.start()
+
+
+def _stop_scanner_warmer() -> None:
+    _warmer_stop.set()
+    if _warmer_thread is not None:
+        _warmer_thread.join(timeout=5)
+
+
+_bar_store_stop = threading.Event()
+_bar_store_thread: Optional[threading.Thread] = None
+_bar_store_status: dict = {
+    "enabled": bar_store is not None,
+    "dir": BAR_STORE_DIR or None,
+    "retentionDays": BAR_STORE_RETENTION_DAYS,
+    "compactions": 0,
+    "lastCompactedAt": None,
+    "lastResult": None,
+}
+
+
+def _run_bar_store_compaction() -> Optional[dict]:
+    if bar_store is None:
+        return None
+    result = bar_store.compact_all(BAR_STORE_RETENTION_DAYS)
+    _bar_store_status.update(
+        {
+            "compactions": _bar_store_status["compactions"] + 1,
+            "lastCompactedAt": utc_now_iso(),
+            "lastResult": result,
+        }
+    )
+    return result
+
+
+def _bar_store_compactor_loop() -> None:
+    # Every worker may run this; the per-series file lock keeps concurrent compactions safe.
+    while not _bar_store_stop.wait(BAR_STORE_COMPACT_INTERVAL_SECONDS):
+        try:
+            _run_bar_store_compaction()
+        except Exception as exc:
+            _bar_store_status["lastResult"] = {"compacted": 0, "errors": [str(exc)]}
+
+
+def _start_bar_store_compactor() -> None:
+    global _bar_store_thread
+    if bar_store is None or (_bar_store_thread is not None and _bar_store_thread.is_alive()):
+        return
+    _bar_store_stop.clear()
+    _bar_store_thread = threading.Thread(target=_bar_store_compactor_loop, name="bar-store-compactor", daemon=True)
+    _bar_store_thread.start()
+
+
+def _stop_bar_store_compactor() -> None:
+    _bar_store_stop.set()
+    if _bar_store_thread is not None:
+        _bar_store_thread.join(timeout=5)
@@ -0,0 +1,137 @@
+import base64
+import json
+import struct
+import zlib
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Cached bar frames are stored as text because both the redis-py client
+# (decode_responses=True) and the Upstash REST client only round-trip strings.
+BINARY_PREFIX = "mdbars:"
+FORMAT_VERSION = 2
+_VERSION_NO_ATTRS = 1  # v2 adds a JSON `df.attrs` block after the timezone
+
+_HEADER = struct.Struct("<BBIH")  # version, flags, rows, columns
+_LENGTH = struct.Struct("<H")
+_FLAG_COMPRESSED = 1
+_DTYPE_CODES = {"f": np.dtype("<f8"), "i": np.dtype("<i8")}
+
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return _LENGTH.pack(len(raw)) + raw
+
+
+def _unpack_str(buf: memoryview, pos: int) -> tuple[str, int]:
+    (length,) = _LENGTH.unpack_from(buf, pos)
+    pos += _LENGTH.size
+    return bytes(buf[pos : pos + length]).decode("utf-8"), pos + length
+
+
+def encode_frame(df: pd.DataFrame, compress: bool = True) -> Optional[str]:
+    """
+    Packs a DatetimeIndex frame of numeric columns into the versioned binary cache format:
+    delta-encoded epoch-nanosecond UTC timestamps plus one little-endian float64/int64
+    array per column. JSON-serializable `df.attrs` (e.g. cache metadata) are kept.
+    Returns None when the frame cannot be represented (callers fall back to JSON).
+    """
+    if df is None or not isinstance(df.index, pd.DatetimeIndex):
+        return None
+
+    names: List[str] = []
+    codes: List[str] = []
+    arrays: List[np.ndarray] = []
+    for name in df.columns:
+        if not isinstance(name, str):
+            return None
+        series = df[name]
+        if pd.api.types.is_integer_dtype(series.dtype) and not series.isna().any():
+            codes.append("i")
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            codes.append("f")
+        else:
+            return None
+        names.append(name)
+        if codes[-1] == "i":
+            arrays.append(series.to_numpy(dtype=_DTYPE_CODES["i"]))
+        else:
+            arrays.append(series.to_numpy(dtype=_DTYPE_CODES["f"], na_value=np.nan))
+
+    tz = str(df.index.tz) if df.index.tz is not None else ""
+    stamps = np.asarray(df.index.values).astype("datetime64[ns]").view("<i8")
+
+    body = bytearray(_pack_str(tz))
+    version = _VERSION_NO_ATTRS
+    if df.attrs:
+        try:
+            body += _pack_str(json.dumps(df.attrs, separators=(",", ":")))
+        except (TypeError, ValueError, struct.error):
+            return None
+        version = FORMAT_VERSION
+    for name, code in zip(names, codes):
+        body += _pack_str(name) + code.encode("ascii")
+    body += np.diff(stamps, prepend=np.int64(0)).tobytes()
+    for array in arrays:
+        body += array.tobytes()
+
+    flags = 0
+    payload = bytes(body)
+    if compress:
+        flags |= _FLAG_COMPRESSED
+        payload = zlib.compress(payload, 1)
+    header = _HEADER.pack(version, flags, len(df), len(names))
+    return BINARY_PREFIX + base64.b64encode(header + payload).decode("ascii")
+
+
+def is_binary(raw: Union[str, bytes, None]) -> bool:
+    if isinstance(raw, bytes):
+        return raw.startswith(BINARY_PREFIX.encode("ascii"))
+    return isinstance(raw, str) and raw.startswith(BINARY_PREFIX)
+
+
+def decode_frame(raw: Union[str, bytes]) -> Optional[pd.DataFrame]:
+    if not is_binary(raw):
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("ascii")
+    try:
+        blob = base64.b64decode(raw[len(BINARY_PREFIX) :], validate=True)
+        version, flags, rows, cols = _HEADER.unpack_from(blob, 0)
+        if version not in (_VERSION_NO_ATTRS, FORMAT_VERSION):
+            return None
+        body = blob[_HEADER.size :]
+        if flags & _FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+        buf = memoryview(body)
+
+        tz, pos = _unpack_str(buf, 0)
+        attrs = {}
+        if version >= 2:
+            raw_attrs, pos = _unpack_str(buf, pos)
+            attrs = json.loads(raw_attrs)
+        names: List[str] = []
+        codes: List[str] = []
+        for _ in range(cols):
+            name, pos = _unpack_str(buf, pos)
+            names.append(name)
+            codes.append(bytes(buf[pos : pos + 1]).decode("ascii"))
+            pos += 1
+
+        stamps = np.cumsum(np.frombuffer(body, dtype="<i8", count=rows, offset=pos))
+        pos += rows * 8
+        data = {}
+        for name, code in zip(names, codes):
+            data[name] = np.frombuffer(body, dtype=_DTYPE_CODES[code], count=rows, offset=pos)
+            pos += rows * 8
+
+        index = pd.DatetimeIndex(stamps.view("datetime64[ns]"))
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+    except Exception:
+        return None
+    df = pd.DataFrame(data, index=index, columns=names)
+    if isinstance(attrs, dict):
+        df.attrs.update(attrs)
+    return df
@@ -0,0 +1,305 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+META_FILE = "meta.json"
+META_VERSION = 1
+_DTYPES = {"f": np.dtype("<f8"), "i": np.dtype("<i8")}
+_TS_DTYPE = np.dtype("<i8")
+_UNSAFE = re.compile(r"[^A-Za-z0-9._=^-]")
+
+
+def _safe_name(value: str) -> str:
+    name = _UNSAFE.sub("_", value) or "_"
+    return "_" + name if name.startswith(".") else name
+
+
+def _column_code(series: pd.Series) -> Optional[str]:
+    if pd.api.types.is_bool_dtype(series.dtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+        return None
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.isna().any():
+        return "i"
+    return "f"
+
+
+def _utc_stamps(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return np.asarray(index.tz_convert("UTC").tz_localize(None).values).astype("datetime64[ns]").view(_TS_DTYPE)
+
+
+class BarStore:
+    """
+    Append-only on-disk bar store: one directory per (interval, prepost, ticker) holding a timestamp
+    file and one raw little-endian array per column, plus `meta.json` with the row count. Appends write
+    the new rows and then the metadata, so a torn append is never visible; reads memory-map the arrays.
+
+    The last stored bar is usually still forming, so appends rewrite it by appending a newer copy and
+    reads keep the last copy of each timestamp. `compact` rewrites a series without those duplicates
+    (and without rows older than a cutoff) into a new file generation, swapped in by replacing `meta.json`.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _series_dir(self, ticker: str, interval: str, prepost: bool) -> str:
+        return os.path.join(self.root, _safe_name(interval), f"prepost={1 if prepost else 0}", _safe_name(ticker))
+
+    @contextmanager
+    def _locked(self, path: str):
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+        with lock:
+            os.makedirs(path, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            # Serializes writers across worker processes sharing the directory.
+            with open(os.path.join(path, ".lock"), "a+") as handle:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _load_meta(self, path: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(meta, dict) or meta.get("v") != META_VERSION:
+            return None
+        return meta
+
+    def _save_meta(self, path: str, meta: dict) -> None:
+        tmp = os.path.join(path, f".{META_FILE}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle, separators=(",", ":"))
+        os.replace(tmp, os.path.join(path, META_FILE))
+
+    @staticmethod
+    def _file(path: str, gen: int, column: Optional[int], code: str = "i") -> str:
+        name = "ts" if column is None else f"c{column}"
+        return os.path.join(path, f"{gen}.{name}.{code}8")
+
+    def _map(self, file_path: str, dtype: np.dtype, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        # A plain ndarray view still backed by the mapping, so pandas never sees the memmap subclass.
+        return np.asarray(np.memmap(file_path, dtype=dtype, mode="r", shape=(rows,)))
+
+    def _read_series(self, path: str, meta: dict) -> pd.DataFrame:
+        rows, gen = int(meta["rows"]), int(meta["gen"])
+        stamps = self._map(self._file(path, gen, None), _TS_DTYPE, rows)
+        data = {
+            name: self._map(self._file(path, gen, i, code), _DTYPES[code], rows)
+            for i, (name, code) in enumerate(meta["columns"])
+        }
+        index = pd.DatetimeIndex(np.asarray(stamps).view("datetime64[ns]")).tz_localize("UTC")
+        if meta.get("tz"):
+            index = index.tz_convert(meta["tz"])
+        df = pd.DataFrame(data, index=index, columns=[name for name, _ in meta["columns"]], copy=False)
+        if rows > 1 and not bool(np.all(np.diff(stamps) > 0)):
+            df = df[~df.index.duplicated(keep="last")].sort_index()
+        df.attrs["storedAt"] = meta.get("storedAt")
+        return df
+
+    def read(self, ticker: str, interval: str, prepost: bool) -> Optional[pd.DataFrame]:
+        """The stored series (memory-mapped when it has no rewritten bars), or None. `attrs["storedAt"]` is set."""
+        path = self._series_dir(ticker, interval, prepost)
+        for _ in range(2):
+            meta = self._load_meta(path)
+            if meta is None:
+                return None
+            try:
+                return self._read_series(path, meta)
+            except (OSError, ValueError, KeyError):
+                # A compaction swapped generations between reading meta and mapping the files.
+                continue
+        return None
+
+    def last(self, ticker: str, interval: str, prepost: bool, column: str = "Close") -> Optional[dict]:
+        """
+        The newest non-NaN value of one column as {"ts" (epoch ns), "value", "storedAt"}, or None.
+        Only the end of the mapped files is touched, so this stays cheap for long series.
+        """
+        path = self._series_dir(ticker, interval, prepost)
+        for _ in range(2):
+            meta = self._load_meta(path)
+            if meta is None:
+                return None
+            names = [name for name, _ in meta["columns"]]
+            if column not in names:
+                return None
+            i = names.index(column)
+            rows, gen, code = int(meta["rows"]), int(meta["gen"]), meta["columns"][i][1]
+            try:
+                stamps = self._map(self._file(path, gen, None), _TS_DTYPE, rows)
+                values = self._map(self._file(path, gen, i, code), _DTYPES[code], rows)
+            except (OSError, ValueError):
+                continue
+            # Appends only add bars at or after the last one, so the last row is the newest copy.
+            for row in range(rows - 1, -1, -1):
+                value = float(values[row])
+                if not np.isnan(value):
+                    return {"ts": int(stamps[row]), "value": value, "storedAt": meta.get("storedAt")}
+            return None
+        return None
+
+    def _write_generation(self, path: str, gen: int, df: pd.DataFrame, stored_at: Optional[int]) -> dict:
+        columns = [[str(name), _column_code(df[name])] for name in df.columns]
+        columns = [[name, code] for name, code in columns if code is not None]
+        for i, (name, code) in enumerate(columns):
+            values = df[name].to_numpy(dtype=_DTYPES[code], na_value=np.nan if code == "f" else None)
+            values.tofile(self._file(path, gen, i, code))
+        stamps = _utc_stamps(df.index)
+        stamps.tofile(self._file(path, gen, None))
+        return {
+            "v": META_VERSION,
+            "gen": gen,
+            "rows": len(df),
+            "columns": columns,
+            "tz": str(df.index.tz) if df.index.tz is not None else "",
+            "storedAt": stored_at,
+            "firstTs": int(stamps[0]) if len(stamps) else None,
+            "lastTs": int(stamps[-1]) if len(stamps) else None,
+        }
+
+    def _remove_other_generations(self, path: str, gen: int) -> None:
+        for name in os.listdir(path):
+            head = name.split(".", 1)[0]
+            if head.isdigit() and int(head) != gen:
+                try:
+                    os.remove(os.path.join(path, name))
+                except OSError:
+                    continue
+
+    def _rewrite(self, path: str, meta: Optional[dict], df: pd.DataFrame, stored_at: Optional[int]) -> None:
+        gen = int(meta["gen"]) + 1 if meta else 0
+        new_meta = self._write_generation(path, gen, df, stored_at)
+        self._save_meta(path, new_meta)
+        self._remove_other_generations(path, gen)
+
+    @staticmethod
+    def _write_at(file_path: str, offset: int, values: np.ndarray) -> None:
+        # Writes at the committed row count, not the file end, and drops anything past the new data,
+        # so bytes left by an append that died before its meta update cannot shift the columns.
+        with open(file_path, "r+b") as handle:
+            handle.seek(offset)
+            handle.write(values.tobytes())
+            handle.truncate()
+
+    @staticmethod
+    def _appendable(df: pd.DataFrame, meta: dict) -> bool:
+        if [str(name) for name in df.columns] != [name for name, _ in meta["columns"]]:
+            return False
+        # Int bars can go into float files, not the other way round.
+        return all(code == "f" or _column_code(df[name]) == "i" for name, code in meta["columns"])
+
+    def append(
+        self, ticker: str, interval: str, prepost: bool, df: pd.DataFrame, stored_at: Optional[int] = None
+    ) -> int:
+        """
+        Appends the rows of `df` at or after the last stored bar and stamps the series `storedAt`.
+        Returns the number of rows written. A frame whose columns differ from the stored ones, or
+        that starts before the series, rewrites the series with both merged.
+        """
+        if df is None or not isinstance(df.index, pd.DatetimeIndex):
+            return 0
+        stored_at = int(time.time()) if stored_at is None else int(stored_at)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        path = self._series_dir(ticker, interval, prepost)
+        with self._locked(path):
+            meta = self._load_meta(path)
+            if meta is None:
+                if df.empty:
+                    return 0
+                self._rewrite(path, None, df, stored_at)
+                return len(df)
+
+            stamps = _utc_stamps(df.index)
+            if len(stamps) and (not self._appendable(df, meta) or stamps[0] < int(meta.get("firstTs") or 0)):
+                # New columns, a float column landing in an int file, or bars older than the series.
+                existing = self._read_series(path, meta)
+                if existing.index.tz is not None and df.index.tz is not None:
+                    df = df.tz_convert(existing.index.tz)
+                combined = pd.concat([existing, df])
+                combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+                self._rewrite(path, meta, combined, stored_at)
+                return len(df)
+
+            last_ts = meta.get("lastTs")
+            if last_ts is not None:
+                keep = stamps >= int(last_ts)
+                df, stamps = df[keep], stamps[keep]
+            if df.empty:
+                meta["storedAt"] = stored_at
+                self._save_meta(path, meta)
+                return 0
+
+            gen, rows = int(meta["gen"]), int(meta["rows"])
+            self._write_at(self._file(path, gen, None), rows * _TS_DTYPE.itemsize, stamps.astype(_TS_DTYPE))
+            for i, (name, code) in enumerate(meta["columns"]):
+                values = df[name].to_numpy(dtype=_DTYPES[code], na_value=np.nan if code == "f" else None)
+                self._write_at(self._file(path, gen, i, code), rows * _DTYPES[code].itemsize, values)
+            meta["rows"] = int(meta["rows"]) + len(df)
+            meta["lastTs"] = int(stamps[-1])
+            meta["storedAt"] = stored_at
+            self._save_meta(path, meta)
+            return len(df)
+
+    def compact(self, ticker: str, interval: str, prepost: bool, keep_after: Optional[pd.Timestamp] = None) -> bool:
+        """Rewrites one series without duplicate bars or bars before `keep_after`. Returns True if it changed."""
+        path = self._series_dir(ticker, interval, prepost)
+        with self._locked(path):
+            meta = self._load_meta(path)
+            if meta is None:
+                return False
+            df = self._read_series(path, meta)
+            if keep_after is not None and len(df):
+                df = df[df.index >= keep_after]
+            if len(df) == int(meta["rows"]):
+                return False
+            self._rewrite(path, meta, df.copy(), meta.get("storedAt"))
+            return True
+
+    def series(self) -> Iterator[Tuple[str, str, bool]]:
+        """Yields the (directory-safe) ticker, interval and prepost of every stored series."""
+        if not os.path.isdir(self.root):
+            return
+        for interval in sorted(os.listdir(self.root)):
+            for prepost_dir in ("prepost=0", "prepost=1"):
+                base = os.path.join(self.root, interval, prepost_dir)
+                if not os.path.isdir(base):
+                    continue
+                for ticker in sorted(os.listdir(base)):
+                    if os.path.isfile(os.path.join(base, ticker, META_FILE)):
+                        yield ticker, interval, prepost_dir.endswith("1")
+
+    def compact_all(self, retention_days: int) -> dict:
+        cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=max(1, int(retention_days)))
+        compacted: List[str] = []
+        errors: List[str] = []
+        for ticker, interval, prepost in list(self.series()):
+            try:
+                if self.compact(ticker, interval, prepost, keep_after=cutoff):
+                    compacted.append(f"{ticker}:{interval}:prepost={int(prepost)}")
+            except Exception as exc:
+                errors.append(f"{ticker}:{interval}: {exc}")
+        return {"compacted": len(compacted), "errors": errors}
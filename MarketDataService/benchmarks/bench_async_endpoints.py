@@ -0,0 +1,143 @@
+"""
+Load test: dashboard polls that hit the scanner cache while slow cache misses (yfinance work)
+are in flight, comparing the previous sync `def` endpoint with the async endpoint.
+
+With sync endpoints every request, hit or miss, needs one of Starlette's 40 threadpool tokens,
+so a burst of slow misses queues the cheap hits behind them. The async endpoint answers hits on
+the event loop via the async Redis client and runs misses on the sized request executor.
+
+Redis is a local stand-in adding `RTT_MS` per command; yfinance work is a `MISS_MS` sleep.
+Requests go through httpx's in-process ASGI transport, so no server or network is needed.
+
+Run from `MarketDataService/`:
+    python benchmarks/bench_async_endpoints.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+
+RTT_MS = float(os.getenv("RTT_MS", "2.0"))
+MISS_MS = float(os.getenv("MISS_MS", "1000"))
+MISSES = int(os.getenv("MISSES", "60"))
+HITS = int(os.getenv("HITS", "1000"))
+CONCURRENCY = int(os.getenv("CONCURRENCY", "100"))
+
+
+class SyncLatencyCache:
+    def __init__(self, store: dict):
+        self.store = store
+
+    def get(self, key):
+        time.sleep(RTT_MS / 1000.0)
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        time.sleep(RTT_MS / 1000.0)
+        self.store[key] = value
+
+
+class AsyncLatencyCache:
+    def __init__(self, store: dict):
+        self.store = store
+
+    async def get(self, key):
+        await asyncio.sleep(RTT_MS / 1000.0)
+        return self.store.get(key)
+
+
+def legacy_app() -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.post("/scan/day-gainers")
+    def scan_day_gainers(request: app.DayGainersRequest) -> dict:
+        cache_key = app._day_gainers_cache_key(request)
+        request_snapshot = request.model_dump()
+        return app._serve_scan_cached(
+            cache_key, lambda: app._compute_day_gainers_payload(app.DayGainersRequest(**request_snapshot))
+        )
+
+    return legacy
+
+
+def slow_compute(_request) -> dict:
+    time.sleep(MISS_MS / 1000.0)
+    return {"scanner": "day_gainers", "asOf": app.utc_now_iso(), "sorted_by": "", "results": []}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(target: FastAPI) -> dict:
+    transport = httpx.ASGITransport(app=target)
+    latencies: list[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(HITS):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        async def miss(i: int):
+            response = await client.post("/scan/day-gainers", json={"minTodayVolume": 1000 + i})
+            response.raise_for_status()
+
+        async def poller():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post("/scan/day-gainers", json={})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        misses = [asyncio.create_task(miss(i)) for i in range(MISSES)]
+        await asyncio.sleep(0.05)  # let the misses grab their threads first
+        await asyncio.gather(*(poller() for _ in range(CONCURRENCY)))
+        hits_done = time.perf_counter() - started
+        await asyncio.gather(*misses)
+        total = time.perf_counter() - started
+
+    return {
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "rps": HITS / hits_done,
+        "total": total,
+    }
+
+
+def main() -> None:
+    print(
+        f"{HITS} cached polls ({CONCURRENCY} concurrent) during {MISSES} cache misses of {MISS_MS:g} ms, "
+        f"Redis RTT {RTT_MS:g} ms"
+    )
+    print(f"{'mode':>6} {'hit p50 ms':>11} {'hit p99 ms':>11} {'hit req/s':>10} {'total s':>8}")
+    for mode, target in (("sync", legacy_app()), ("async", app.app)):
+        store: dict = {}
+        with mock.patch.object(app, "cache_client", SyncLatencyCache(store)), mock.patch.object(
+            app, "async_cache_client", AsyncLatencyCache(store) if mode == "async" else None
+        ), mock.patch.object(app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)), mock.patch.object(
+            app, "SINGLE_FLIGHT_DISTRIBUTED", False
+        ), mock.patch.object(
+            app, "_compute_day_gainers_payload", side_effect=slow_compute
+        ):
+            hot_payload = {"scanner": "day_gainers", "asOf": app.utc_now_iso(), "sorted_by": "", "results": []}
+            app._write_scan_cache_entry(app._day_gainers_cache_key(app.DayGainersRequest()), hot_payload)
+            result = asyncio.run(run(target))
+        print(
+            f"{mode:>6} {result['p50']:>11.1f} {result['p99']:>11.1f} "
+            f"{result['rps']:>10.0f} {result['total']:>8.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
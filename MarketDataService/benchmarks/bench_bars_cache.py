@@ -0,0 +1,79 @@
+"""
+Compares the JSON and binary encodings of cached `md:barsdf:*` frames.
+
+Run from `MarketDataService/`:
+    python benchmarks/bench_bars_cache.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+
+DAYS = 7
+TICKERS = 500
+
+
+def yfinance_like_frame(days: int = DAYS, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sessions = [
+        pd.date_range(
+            pd.Timestamp(day.date()).tz_localize("America/New_York") + pd.Timedelta(hours=9, minutes=30),
+            periods=390,
+            freq="1min",
+        )
+        for day in pd.bdate_range("2024-03-04", periods=days)
+    ]
+    index = sessions[0].append(sessions[1:])
+    close = np.round(10 + np.cumsum(rng.normal(0, 0.02, len(index))), 4)
+    return pd.DataFrame(
+        {
+            "Adj Close": close,
+            "Close": close,
+            "High": np.round(close + rng.random(len(index)) * 0.03, 4),
+            "Low": np.round(close - rng.random(len(index)) * 0.03, 4),
+            "Open": np.round(close + rng.normal(0, 0.01, len(index)), 4),
+            "Volume": rng.integers(100, 80_000, len(index)),
+        },
+        index=index,
+    )
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    df = yfinance_like_frame()
+    print(f"frame: {len(df)} rows x {len(df.columns)} columns ({DAYS}d of 1m bars)")
+    print(f"{'format':>16} {'bytes':>10} {'encode ms':>10} {'decode ms':>10} {f'x{TICKERS} MB':>9}")
+    for name, fmt, compress in (
+        ("json", "json", False),
+        ("binary", "binary", False),
+        ("binary+zlib", "binary", True),
+    ):
+        app.BARS_CACHE_FORMAT = fmt
+        app.BARS_CACHE_COMPRESS = compress
+        encoded = app._encode_bars_cache(df)
+        encode_s = best_of(lambda: app._encode_bars_cache(df))
+        decode_s = best_of(lambda: app._decode_bars_cache(encoded))
+        size = len(encoded)
+        print(
+            f"{name:>16} {size:>10} {encode_s * 1000:>10.2f} {decode_s * 1000:>10.2f} "
+            f"{size * TICKERS / 1_000_000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Measures `_download_intraday` cache latency with serial per-key commands versus
+MGET / pipelined SETEX.
+
+By default a local stand-in adds `RTT_MS` per round trip (Upstash REST calls are
+typically 1-20 ms). Set `BENCH_REDIS_URL=redis://localhost:6379/15` to run against
+a real Redis instead.
+
+Run from `MarketDataService/`:
+    python benchmarks/bench_cache_bulk.py
+"""
+
+import os
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+
+TICKERS = 500
+RTT_MS = float(os.getenv("RTT_MS", "1.0"))
+
+
+class LatencyCache:
+    def __init__(self, rtt_seconds: float):
+        self.rtt_seconds = rtt_seconds
+        self.store: dict[str, str] = {}
+        self.round_trips = 0
+
+    def _round_trip(self):
+        self.round_trips += 1
+        time.sleep(self.rtt_seconds)
+
+    def get(self, key):
+        self._round_trip()
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self._round_trip()
+        self.store[key] = value
+
+    def mget(self, *keys):
+        self._round_trip()
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        cache = self
+
+        class _Pipeline:
+            def __init__(self):
+                self.ops = []
+
+            def setex(self, key, ttl, value):
+                self.ops.append((key, value))
+
+            def execute(self):
+                cache._round_trip()
+                cache.store.update(self.ops)
+
+        return _Pipeline()
+
+
+class SerialOnly:
+    """Hides mget/pipeline so the bulk helpers fall back to the old per-key behaviour."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def setex(self, key, ttl, value):
+        return self._client.setex(key, ttl, value)
+
+
+def download_stub(tickers: list[str]) -> pd.DataFrame:
+    index = pd.date_range("2024-03-08 09:30", periods=390, freq="1min", tz="America/New_York")
+    close = np.round(10 + np.cumsum(np.random.default_rng(3).normal(0, 0.02, len(index))), 4)
+    bars = pd.DataFrame(
+        {"Open": close, "High": close, "Low": close, "Close": close, "Volume": np.arange(len(index))},
+        index=index,
+    )
+    return pd.concat({t: bars for t in tickers}, axis=1)
+
+
+def make_backend():
+    url = os.getenv("BENCH_REDIS_URL")
+    if url:
+        import redis
+
+        client = redis.Redis.from_url(url, decode_responses=True)
+        client.flushdb()
+        return client
+    return LatencyCache(RTT_MS / 1000.0)
+
+
+def run(client, tickers, frames_data) -> tuple[float, float]:
+    with mock.patch.object(app, "cache_client", client), mock.patch.object(
+        app.yf, "download", side_effect=lambda tickers, **_: frames_data[tickers]
+    ):
+        started = time.perf_counter()
+        app._download_intraday(tickers, interval="1m", period="1d", prepost=False)
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        app._download_intraday(tickers, interval="1m", period="1d", prepost=False)
+        warm = time.perf_counter() - started
+    return cold, warm
+
+
+def main() -> None:
+    tickers = [f"T{i:04d}" for i in range(TICKERS)]
+    frames_data = {" ".join(batch): download_stub(batch) for batch in app._chunk(tickers, 50)}
+    label = os.getenv("BENCH_REDIS_URL") or f"stand-in, {RTT_MS:g} ms RTT"
+    print(f"{TICKERS} tickers, 1d x 1m bars, cache: {label}")
+    print(f"{'mode':>8} {'cold ms':>9} {'warm ms':>9}")
+    for mode in ("serial", "bulk"):
+        backend = make_backend()
+        client = SerialOnly(backend) if mode == "serial" else backend
+        cold, warm = run(client, tickers, frames_data)
+        print(f"{mode:>8} {cold * 1000:>9.0f} {warm * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
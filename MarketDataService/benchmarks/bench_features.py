@@ -0,0 +1,82 @@
+"""
+Compares the per-ticker feature loop with the stacked feature engine.
+
+Run from `MarketDataService/`:
+    python benchmarks/bench_features.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+
+UNIVERSE_SIZES = (50, 200, 500)
+HISTORY_DAYS = 7
+CLOSE_SLOPE_N = 6
+
+
+def synthetic_frames(count: int, days: int = HISTORY_DAYS, seed: int = 7) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    sessions = [
+        pd.date_range(
+            pd.Timestamp(day.date()).tz_localize("America/New_York") + pd.Timedelta(hours=4),
+            periods=16 * 60,
+            freq="1min",
+        )
+        for day in pd.bdate_range("2024-03-04", periods=days)
+    ]
+    index = sessions[0].append(sessions[1:])
+    frames: dict[str, pd.DataFrame] = {}
+    for i in range(count):
+        close = 5 + i % 20 + np.cumsum(rng.normal(0, 0.03, len(index)))
+        frames[f"T{i:04d}"] = pd.DataFrame(
+            {
+                "Open": close,
+                "High": close + rng.random(len(index)) * 0.05,
+                "Low": close - rng.random(len(index)) * 0.05,
+                "Close": close,
+                "Volume": rng.integers(100, 100_000, len(index)).astype(float),
+            },
+            index=index,
+        )
+    return frames
+
+
+def per_ticker(tickers, frames):
+    stats = {t: app._session_stats_from_frame(frames.get(t), CLOSE_SLOPE_N) for t in tickers}
+    rel_vol = {t: app._rel_vol_fields_from_frame(frames.get(t)) for t in tickers}
+    return stats, rel_vol
+
+
+def stacked(tickers, frames):
+    return app._universe_bar_stats(tickers, frames, frames, CLOSE_SLOPE_N)
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    print(f"{'tickers':>8} {'per-ticker ms':>14} {'stacked ms':>11} {'speedup':>8}")
+    for count in UNIVERSE_SIZES:
+        frames = synthetic_frames(count)
+        tickers = list(frames)
+        assert repr(per_ticker(tickers, frames)) == repr(stacked(tickers, frames))
+        baseline = best_of(lambda: per_ticker(tickers, frames))
+        candidate = best_of(lambda: stacked(tickers, frames))
+        print(f"{count:>8} {baseline * 1000:>14.1f} {candidate * 1000:>11.1f} {baseline / candidate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+/history serialization cost per bar: the previous `iterrows` loop rendered by the stdlib JSON
+encoder, versus the vectorized row builder and the `format=columnar` payload rendered by orjson.
+
+Each mode turns the same tz-aware yfinance-shaped frame into the response body, including the
+response-model pass FastAPI applies to row payloads (columnar responses skip it).
+
+Run from `MarketDataService/`:
+    python benchmarks/bench_history_serialization.py
+"""
+
+import os
+import sys
+import time
+from datetime import timezone
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+
+BARS = int(os.getenv("BARS", "1950"))  # 5d x 1m regular session
+REPEAT = int(os.getenv("REPEAT", "20"))
+
+
+def synthetic_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2024-01-02 14:30", periods=rows, freq="min", tz="UTC").tz_convert(app.ET_TZ)
+    close = 10 + rng.standard_normal(rows).cumsum() * 0.01
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.01, rows),
+            "High": close + 0.02,
+            "Low": close - 0.02,
+            "Close": close,
+            "Volume": rng.integers(0, 100_000, rows),
+        },
+        index=index,
+    )
+
+
+def legacy_bars(df: pd.DataFrame) -> list[dict]:
+    bars = []
+    for idx, row in df.iterrows():
+        if pd.isna(row.get("Close")):
+            continue
+        dt_utc = idx.to_pydatetime().astimezone(timezone.utc)
+        bars.append(
+            {
+                "t": dt_utc.replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+                "o": float(row["Open"]),
+                "h": float(row["High"]),
+                "l": float(row["Low"]),
+                "c": float(row["Close"]),
+                "v": int(row["Volume"]) if not pd.isna(row.get("Volume")) else 0,
+            }
+        )
+    return bars
+
+
+def render_rows(bars: list[dict], response_class) -> bytes:
+    payload = {**app._history_meta("AAA", "1m", "5d", False), "bars": bars}
+    content = app.HistoryResponse.model_validate(payload).model_dump(mode="json")
+    return response_class(content).body
+
+
+def render_columnar(df: pd.DataFrame) -> bytes:
+    payload = {**app._history_meta("AAA", "1m", "5d", False), "format": "columnar", "bars": app._history_columnar(df)}
+    return ORJSONResponse(payload).body
+
+
+MODES = [
+    ("iterrows + json", lambda df: render_rows(legacy_bars(df), JSONResponse)),
+    ("vectorized + orjson", lambda df: render_rows(app._history_bars(df), ORJSONResponse)),
+    ("columnar + orjson", render_columnar),
+]
+
+
+def main() -> None:
+    df = synthetic_frame(BARS)
+    print(f"{BARS} bars, best of {REPEAT}")
+    print(f"{'mode':>20} {'us/bar':>8} {'bytes/bar':>10} {'total ms':>9}")
+    for name, render in MODES:
+        best = float("inf")
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            body = render(df)
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:>20} {best * 1e6 / BARS:>8.2f} {len(body) / BARS:>10.1f} {best * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
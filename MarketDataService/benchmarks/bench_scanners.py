@@ -0,0 +1,107 @@
+"""
+Scanner filter/rank cost: the row-by-row loops over the features payload versus the vectorized
+masks over the columnar FeatureSnapshot, on a synthetic universe of `ROWS` tickers.
+
+The snapshot is built once per features asOf and shared by every scanner, so its build time is
+reported separately from the per-scan times. Both paths return identical rows (see
+tests/test_snapshot.py); the check is repeated here.
+
+Run from `MarketDataService/`:
+    python benchmarks/bench_scanners.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+from snapshot import FeatureSnapshot  # noqa: E402
+
+ROWS = int(os.getenv("ROWS", "5000"))
+REPEAT = int(os.getenv("REPEAT", "20"))
+
+
+def synthetic_features(rows: int) -> dict:
+    rng = random.Random(7)
+    features = []
+    for i in range(rows):
+        prev_close = rng.uniform(1.0, 60.0)
+        price = prev_close * rng.uniform(0.9, 1.3)
+        hod = price * rng.uniform(1.0, 1.03)
+        lod = price * rng.uniform(0.85, 1.0)
+        vwap = price * rng.uniform(0.97, 1.03)
+        features.append(
+            {
+                "ticker": f"T{i:05d}",
+                "exchange": "NMS",
+                "price": price,
+                "prevClose": prev_close,
+                "hod": hod,
+                "lod": lod,
+                "rangePct": (hod - lod) / lod,
+                "posInRange": (price - lod) / (hod - lod) if hod > lod else 1.0,
+                "distToHod": (hod - price) / hod,
+                "vwap": vwap,
+                "absVwapDistance": abs(price - vwap) / vwap,
+                "lastRegHigh": hod * rng.choice([1.0, 0.99]),
+                "relVol": None if rng.random() < 0.05 else rng.uniform(0.2, 6.0),
+                "relVolTod": rng.uniform(0.2, 6.0),
+                "closeSlopeN": rng.uniform(-0.2, 0.4),
+                "atr": price * rng.uniform(0.005, 0.05),
+                "todayVolume": rng.randint(0, 5_000_000),
+                "todayCumVol": rng.randint(0, 5_000_000),
+                "avgVolume20d": rng.uniform(1e6, 2e7),
+                "barIndex": 12,
+                "barTime": "2026-01-02T15:00:00Z",
+            }
+        )
+    return {"asOf": "2026-01-02T15:00:00Z", "features": features}
+
+
+# Float columns read by the vectorized scanners.
+FLOAT_COLUMNS = (
+    "price", "prevClose", "hod", "lod", "rangePct", "posInRange", "distToHod", "vwap",
+    "absVwapDistance", "lastRegHigh", "relVol", "closeSlopeN", "atr",
+)
+
+SCANS = [
+    ("day-gainers", app.DayGainersRequest(minChangePct=0.0), app._day_gainers_results, app._day_gainers_results_vectorized),
+    ("hod-vwap-momentum", app.HodVwapMomentumRequest(), app._momentum_results, app._momentum_results_vectorized),
+    ("volume-spikes", app.VolumeSpikesRequest(), app._volume_spikes_results, app._volume_spikes_results_vectorized),
+    ("hod-vwap-approach", app.HodVwapApproachRequest(), app._approach_results, app._approach_results_vectorized),
+]
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    payload = synthetic_features(ROWS)
+    build_ms = best_of(lambda: [FeatureSnapshot(payload).floats(name) for name in FLOAT_COLUMNS])
+    snap = FeatureSnapshot(payload)
+    with mock.patch.object(app, "SCANNER_RESULTS_LIMIT", 25):
+        for _, request, legacy, vectorized in SCANS:
+            assert json.dumps(legacy(request, payload)) == json.dumps(vectorized(request, snap))
+
+        print(f"{ROWS} tickers, best of {REPEAT}; snapshot build ({len(FLOAT_COLUMNS)} columns): {build_ms:.2f} ms")
+        print(f"{'scanner':>18} {'rows ms':>9} {'vector ms':>10} {'speedup':>8}")
+        for name, request, legacy, vectorized in SCANS:
+            legacy_ms = best_of(lambda: legacy(request, payload))
+            vector_ms = best_of(lambda: vectorized(request, snap))
+            print(f"{name:>18} {legacy_ms:>9.2f} {vector_ms:>10.2f} {legacy_ms / vector_ms:>7.1f}x")
+    print(f"snapshot with all columns built: {snap.nbytes / 1024:.0f} KiB (estimate)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
 
 import redis
 
+try:
+    CACHE_BULK_BATCH_SIZE = int(os.getenv("CACHE_BULK_BATCH_SIZE", "100"))
+except ValueError:
+    CACHE_BULK_BATCH_SIZE = 100
+CACHE_BULK_BATCH_SIZE = max(1, CACHE_BULK_BATCH_SIZE)
+
+T = TypeVar("T")
+
 
 def create_cache_client():
     upstash_rest_url = (os.getenv("UPSTASH_REDIS_REST_URL") or "").strip()
@@ -14,3 +27,272 @@ def create_cache_client():
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     return redis.Redis.from_url(redis_url, decode_responses=True)
 
+
+def create_async_cache_client():
+    """Event-loop counterpart of `create_cache_client`, pointed at the same Redis / Upstash store."""
+    upstash_rest_url = (os.getenv("UPSTASH_REDIS_REST_URL") or "").strip()
+    upstash_rest_token = (os.getenv("UPSTASH_REDIS_REST_TOKEN") or "").strip()
+    if upstash_rest_url and upstash_rest_token:
+        from upstash_redis.asyncio import Redis as AsyncUpstashRedis
+
+        return AsyncUpstashRedis(url=upstash_rest_url, token=upstash_rest_token)
+
+    from redis import asyncio as redis_asyncio
+
+    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    return redis_asyncio.Redis.from_url(redis_url, decode_responses=True)
+
+
+async def close_async_cache_client(client) -> None:
+    try:
+        if hasattr(client, "aclose"):
+            await client.aclose()
+        elif hasattr(client, "close"):
+            await client.close()
+    except Exception:
+        return
+
+
+def _pipeline(client):
+    try:
+        return client.pipeline(transaction=False)
+    except TypeError:
+        # upstash_redis.Redis.pipeline() takes no arguments.
+        return client.pipeline()
+
+
+def mget(client, keys: List[str], batch_size: int = CACHE_BULK_BATCH_SIZE) -> List[Optional[object]]:
+    """
+    Reads many keys with one MGET per `batch_size` keys (one round trip / REST call each).
+    Works with both redis.Redis and upstash_redis.Redis; clients without `mget` fall back
+    to per-key GETs. A failed batch yields None for its keys, like a cache miss.
+    """
+    values: List[Optional[object]] = []
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start : start + batch_size]
+        try:
+            if hasattr(client, "mget"):
+                fetched = list(client.mget(*batch))
+            else:
+                fetched = [client.get(key) for key in batch]
+        except Exception:
+            fetched = [None] * len(batch)
+        if len(fetched) != len(batch):
+            fetched = [None] * len(batch)
+        values.extend(fetched)
+    return values
+
+
+async def mget_async(client, keys: List[str], batch_size: int = CACHE_BULK_BATCH_SIZE) -> List[Optional[object]]:
+    """`mget` for the async Redis / Upstash clients."""
+    values: List[Optional[object]] = []
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start : start + batch_size]
+        try:
+            if hasattr(client, "mget"):
+                fetched = list(await client.mget(*batch))
+            else:
+                fetched = [await client.get(key) for key in batch]
+        except Exception:
+            fetched = [None] * len(batch)
+        if len(fetched) != len(batch):
+            fetched = [None] * len(batch)
+        values.extend(fetched)
+    return values
+
+
+def setex_many(client, items: Iterable[Tuple[str, int, str]], batch_size: int = CACHE_BULK_BATCH_SIZE) -> None:
+    """
+    Writes (key, ttl_seconds, value) triples through a non-transactional pipeline, one
+    round trip per `batch_size` entries. Errors are swallowed like the single-key writers.
+    """
+    items = [(key, max(int(ttl), 1), value) for key, ttl, value in items]
+    for start in range(0, len(items), batch_size):
+        batch = items[start : start + batch_size]
+        if hasattr(client, "pipeline"):
+            try:
+                pipe = _pipeline(client)
+                for key, ttl, value in batch:
+                    pipe.setex(key, ttl, value)
+                pipe.execute()
+            except Exception:
+                pass
+            continue
+        for key, ttl, value in batch:
+            try:
+                client.setex(key, ttl, value)
+            except Exception:
+                continue
+
+
+class LocalCache:
+    """
+    In-process LRU tier in front of the shared cache. Holds decoded values, bounded by
+    entry count and by the approximate encoded size of each value. Values are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[str, tuple[float, int, object]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def get(self, key: str) -> Optional[object]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, value = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: object, ttl_seconds: float, size: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._discard(key)
+            if value is None or ttl_seconds <= 0 or size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + ttl_seconds, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": (self.hits / lookups) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key within this process: the first caller
+    runs `fn`, later callers block until it finishes and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def inflight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._flights
+
+
+def acquire_lease(client, key: str, ttl_seconds: int) -> Optional[str]:
+    """
+    Tries to take a cross-worker lease with SET NX EX. Returns the owner token, or None
+    when another worker holds the lease. If the cache cannot be reached the lease is
+    treated as granted so callers degrade to per-worker behaviour.
+    """
+    token = uuid.uuid4().hex
+    try:
+        acquired = client.set(key, token, nx=True, ex=max(int(ttl_seconds), 1))
+    except Exception:
+        return token
+    return token if acquired else None
+
+
+# Compare-and-delete: a lease that expired and was taken by another worker is left alone.
+_RELEASE_LEASE_SCRIPT = 'if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end return 0'
+
+
+def release_lease(client, key: str, token: str) -> None:
+    """Deletes the lease if `token` still owns it, atomically via a Lua script."""
+    try:
+        if type(client).__module__.startswith("upstash_redis"):
+            client.eval(_RELEASE_LEASE_SCRIPT, keys=[key], args=[token])
+        elif hasattr(client, "eval"):
+            client.eval(_RELEASE_LEASE_SCRIPT, 1, key, token)
+        elif client.get(key) == token:
+            # Stand-in clients without scripting.
+            client.delete(key)
+    except Exception:
+        return
+
+
+def lease_held(client, key: str) -> bool:
+    try:
+        return bool(client.get(key))
+    except Exception:
+        return False
@@ -0,0 +1,438 @@
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+
+PRE_START_NS = (4 * 60) * NS_PER_MINUTE
+PRE_END_NS = (9 * 60 + 29) * NS_PER_MINUTE
+REG_START_NS = (9 * 60 + 30) * NS_PER_MINUTE
+REG_END_NS = (16 * 60) * NS_PER_MINUTE
+POST_START_NS = (16 * 60) * NS_PER_MINUTE
+POST_END_NS = (20 * 60) * NS_PER_MINUTE
+
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class BarStack:
+    """
+    Bars for many tickers laid out back to back in flat arrays.
+    Rows of `tickers[i]` live in `[offsets[i], offsets[i + 1])`.
+    """
+
+    __slots__ = ("tickers", "offsets", "owner", "utc_ns", "day", "tod", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        tickers: List[str],
+        offsets: np.ndarray,
+        utc_ns: np.ndarray,
+        local_ns: np.ndarray,
+        columns: Dict[str, np.ndarray],
+    ):
+        self.tickers = tickers
+        self.offsets = offsets
+        self.owner = np.repeat(np.arange(len(tickers)), np.diff(offsets))
+        self.utc_ns = utc_ns
+        self.day = local_ns // NS_PER_DAY
+        self.tod = local_ns - self.day * NS_PER_DAY
+        self.open = columns["Open"]
+        self.high = columns["High"]
+        self.low = columns["Low"]
+        self.close = columns["Close"]
+        self.volume = columns["Volume"]
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+def is_stackable(df: Optional[pd.DataFrame]) -> bool:
+    return df is not None and not df.empty and isinstance(df.index, pd.DatetimeIndex)
+
+
+def stack_frames(frames: Dict[str, pd.DataFrame], tickers: List[str], tz) -> BarStack:
+    """
+    Stacks the DatetimeIndex frames of `tickers` (in order) into one BarStack.
+    Naive indexes are treated as UTC, matching `_df_to_et`. Tickers whose frame is
+    missing, empty or not time-indexed are left out.
+    """
+    names: List[str] = []
+    lengths: List[int] = []
+    stamps: List[np.ndarray] = []
+    blocks: List[np.ndarray] = []
+    for ticker in tickers:
+        df = frames.get(ticker)
+        if not is_stackable(df):
+            continue
+        names.append(ticker)
+        lengths.append(len(df))
+        stamps.append(np.asarray(df.index.values).astype("datetime64[ns]").view("int64"))
+        blocks.append(df.reindex(columns=list(BAR_COLUMNS)).to_numpy(dtype=np.float64, na_value=np.nan))
+
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    if lengths:
+        np.cumsum(lengths, out=offsets[1:])
+    if not names:
+        empty_f = np.empty(0, dtype=np.float64)
+        empty_i = np.empty(0, dtype=np.int64)
+        return BarStack([], offsets, empty_i, empty_i, {name: empty_f for name in BAR_COLUMNS})
+
+    utc_ns = np.concatenate(stamps)
+    local = pd.to_datetime(utc_ns, unit="ns", utc=True).tz_convert(tz).tz_localize(None)
+    local_ns = np.asarray(local.values).astype("datetime64[ns]").view("int64")
+    values = np.concatenate(blocks)
+    columns = {name: np.ascontiguousarray(values[:, i]) for i, name in enumerate(BAR_COLUMNS)}
+    return BarStack(names, offsets, utc_ns, local_ns, columns)
+
+
+class SessionIndex:
+    """
+    ET layout of one time-sorted frame from a single tz conversion: local day and time of day per
+    row, and the row offsets where each day starts. Session segments are found by `searchsorted`, so
+    `df.iloc[start:end]` slices replace repeated `tz_convert` / `between_time` masks.
+    """
+
+    __slots__ = ("tod", "day_starts")
+
+    def __init__(self, index: pd.DatetimeIndex, tz):
+        utc = index if index.tz is not None else index.tz_localize("UTC")
+        local_ns = np.asarray(utc.tz_convert(tz).tz_localize(None).values).astype("datetime64[ns]").view("int64")
+        day = local_ns // NS_PER_DAY
+        self.tod = local_ns - day * NS_PER_DAY
+        self.day_starts = np.concatenate(([0], np.flatnonzero(np.diff(day)) + 1, [len(day)])).astype(np.int64)
+
+    @property
+    def days(self) -> int:
+        return len(self.day_starts) - 1
+
+    def day(self, i: int) -> Tuple[int, int]:
+        """Row range [start, end) of the i-th day (negative i counts from the latest)."""
+        i = i % self.days
+        return int(self.day_starts[i]), int(self.day_starts[i + 1])
+
+    def segment(self, i: int, start_ns: int, end_ns: int) -> Tuple[int, int]:
+        """Rows of day i whose time of day is within [start_ns, end_ns], like `between_time(inclusive="both")`."""
+        start, end = self.day(i)
+        tod = self.tod[start:end]
+        return (
+            start + int(np.searchsorted(tod, start_ns, side="left")),
+            start + int(np.searchsorted(tod, end_ns, side="right")),
+        )
+
+    def bar_time(self, row: int) -> str:
+        minute = int(self.tod[row] // NS_PER_MINUTE)
+        return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+_session_indexes: Dict[int, Tuple[weakref.ref, str, SessionIndex]] = {}
+
+
+def session_index(df: pd.DataFrame, tz) -> SessionIndex:
+    """
+    The SessionIndex of a time-sorted frame, built on first use and kept while the frame is alive,
+    so the stats and rel-vol helpers share one conversion per cached frame.
+    """
+    key = id(df)
+    entry = _session_indexes.get(key)
+    if entry is not None and entry[0]() is df and entry[1] == str(tz):
+        return entry[2]
+    index = SessionIndex(df.index, tz)
+    _session_indexes[key] = (weakref.ref(df, lambda _ref, key=key: _session_indexes.pop(key, None)), str(tz), index)
+    return index
+
+
+def _segments(stack: BarStack, rows: np.ndarray) -> np.ndarray:
+    counts = np.bincount(stack.owner[rows], minlength=len(stack))
+    offsets = np.zeros(len(stack) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _atr_window(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> Optional[float]:
+    window = max(length + 1, 2)
+    high = high[-window:]
+    low = low[-window:]
+    close = close[-window:]
+    if high.shape[0] < 2:
+        return None
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(np.fmax(np.abs(high - low), np.abs(high - prev_close)), np.abs(low - prev_close))
+    tr = tr[~np.isnan(tr)]
+    if tr.shape[0] == 0:
+        return None
+    tr = tr[-length:]
+    return float(tr.sum() / tr.shape[0])
+
+
+def _close_slope_window(close: np.ndarray, n: int) -> Optional[float]:
+    if close.shape[0] < max(n, 2):
+        return None
+    if n < 2:
+        # Degenerate windows keep the exact pandas semantics of `_close_slope`.
+        closes = pd.Series(close).tail(n)
+        return float(closes.iloc[-1] - closes.iloc[0]) / float(n - 1)
+    return float(close[-1] - close[-n]) / float(n - 1)
+
+
+def session_stats(stack: BarStack, close_slope_n: int, atr_length: int = 14) -> Dict[str, dict]:
+    """
+    Latest-session bar statistics for every ticker in `stack`, computed in one pass.
+    Values match the per-frame helpers in `app` (`_last_close`, `_sum_volume`, `_vwap`,
+    `_atr`, `_close_slope`) applied to the pre/regular/post slices of the latest ET session.
+    Recomputed from the stacked bars on every run: persisting per-ticker running state and folding
+    in only new bars measured ~90 ms vs ~22 ms here for 300 tickers (per-ticker state round trip).
+    """
+    n = len(stack)
+    if n == 0:
+        return {}
+
+    last_rows = stack.offsets[1:] - 1
+    session_day = stack.day[last_rows]
+    today = stack.day == session_day[stack.owner]
+    tod = stack.tod
+    volume0 = np.nan_to_num(stack.volume, nan=0.0)
+
+    def _session(start_ns: int, end_ns: int):
+        rows = np.flatnonzero(today & (tod >= start_ns) & (tod <= end_ns))
+        offsets = _segments(stack, rows)
+        counts = np.diff(offsets)
+        volume = np.bincount(stack.owner[rows], weights=volume0[rows], minlength=n)
+        return rows, offsets, counts, volume
+
+    pre_rows, pre_offsets, pre_counts, pre_volume = _session(PRE_START_NS, PRE_END_NS)
+    reg_rows, reg_offsets, reg_counts, reg_volume = _session(REG_START_NS, REG_END_NS)
+    post_rows, post_offsets, post_counts, post_volume = _session(POST_START_NS, POST_END_NS)
+
+    reg_high = stack.high[reg_rows]
+    reg_low = stack.low[reg_rows]
+    reg_close = stack.close[reg_rows]
+    reg_owner = stack.owner[reg_rows]
+
+    hod = np.full(n, np.nan)
+    lod = np.full(n, np.nan)
+    nonempty = np.flatnonzero(reg_counts > 0)
+    if nonempty.size:
+        starts = reg_offsets[nonempty]
+        hod[nonempty] = np.fmax.reduceat(reg_high, starts)
+        lod[nonempty] = np.fmin.reduceat(reg_low, starts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hod_rows = hod[reg_owner]
+        near_hod = np.abs(hod_rows - reg_close) / hod_rows <= 0.003
+        typical = (reg_high + reg_low + reg_close) / 3.0
+        weighted = typical * volume0[reg_rows]
+    weighted[np.isnan(weighted)] = 0.0
+    hod_tests = np.bincount(reg_owner, weights=near_hod, minlength=n)
+
+    stats: Dict[str, dict] = {}
+    for i, ticker in enumerate(stack.tickers):
+        row = {
+            "todayClose": float(stack.close[last_rows[i]]),
+            "prePrice": float(stack.close[pre_rows[pre_offsets[i + 1] - 1]]) if pre_counts[i] else None,
+            "preVolume": int(pre_volume[i]),
+            "regularClose": None,
+            "regularVolume": int(reg_volume[i]),
+            "postPrice": float(stack.close[post_rows[post_offsets[i + 1] - 1]]) if post_counts[i] else None,
+            "postVolume": int(post_volume[i]),
+            "prevBarClose": None,
+            "hod": None,
+            "lod": None,
+            "hodTestCount": 0,
+            "vwap": None,
+            "closeSlopeN": None,
+            "atr": None,
+            "lastRegLow": None,
+            "lastRegHigh": None,
+        }
+        count = int(reg_counts[i])
+        if count:
+            start, end = int(reg_offsets[i]), int(reg_offsets[i + 1])
+            row["regularClose"] = float(reg_close[end - 1])
+            if count >= 2:
+                row["prevBarClose"] = float(reg_close[end - 2])
+            row["hod"] = float(hod[i])
+            row["lod"] = float(lod[i])
+            if row["hod"] != 0:
+                row["hodTestCount"] = int(hod_tests[i])
+            total_volume = float(reg_volume[i])
+            if total_volume > 0:
+                row["vwap"] = float(weighted[start:end].sum() / total_volume)
+            row["closeSlopeN"] = _close_slope_window(reg_close[start:end], close_slope_n)
+            row["atr"] = _atr_window(reg_high[start:end], reg_low[start:end], reg_close[start:end], atr_length)
+            row["lastRegLow"] = float(reg_low[end - 1])
+            row["lastRegHigh"] = float(reg_high[end - 1])
+        stats[ticker] = row
+    return stats
+
+
+def _empty_rvol() -> dict:
+    return {
+        "relVol": None,
+        "relVolTod": None,
+        "todayBarVol": None,
+        "baselineBarVol": None,
+        "todayCumVol": None,
+        "baselineCumVol": None,
+        "barIndex": None,
+        "barTime": None,
+    }
+
+
+def _rvol_fields(today_volume: np.ndarray, k: int, baseline_1m_avg: Optional[float], last_minute: int) -> dict:
+    today_k_vol = float(today_volume[-k:].sum())
+    today_cum_vol = float(today_volume.sum())
+    baseline_k_vol = None
+    baseline_cum_vol = None
+    rel_vol = None
+    rel_vol_tod = None
+    if baseline_1m_avg is not None and baseline_1m_avg > 0:
+        baseline_k_vol = baseline_1m_avg * k
+        if baseline_k_vol > 0:
+            rel_vol = today_k_vol / baseline_k_vol
+        baseline_cum_vol = baseline_1m_avg * float(len(today_volume))
+        if baseline_cum_vol > 0:
+            rel_vol_tod = today_cum_vol / baseline_cum_vol
+    return {
+        "relVol": rel_vol,
+        "relVolTod": rel_vol_tod,
+        "todayBarVol": int(today_k_vol),
+        "baselineBarVol": baseline_k_vol,
+        "todayCumVol": int(today_cum_vol),
+        "baselineCumVol": baseline_cum_vol,
+        "barIndex": len(today_volume) - 1,
+        "barTime": f"{last_minute // 60:02d}:{last_minute % 60:02d}",
+    }
+
+
+def _regular_rows(stack: BarStack) -> tuple[np.ndarray, np.ndarray]:
+    """Regular-session rows of `stack` ordered by ticker then time, and their per-ticker offsets."""
+    rows = np.flatnonzero((stack.tod >= REG_START_NS) & (stack.tod <= REG_END_NS))
+    rows = rows[np.lexsort((stack.utc_ns[rows], stack.owner[rows]))]
+    return rows, _segments(stack, rows)
+
+
+def rvol_recent_k_1m(
+    stack: BarStack,
+    baseline_days: int,
+    k_bars: int,
+    include_today: bool,
+    exclude_last_k_from_today: bool,
+) -> Dict[str, dict]:
+    """
+    Batch equivalent of `app._compute_rvol_recent_k_1m` for every ticker in `stack`.
+    """
+    results: Dict[str, dict] = {ticker: _empty_rvol() for ticker in stack.tickers}
+    if len(stack) == 0 or baseline_days <= 0 or k_bars <= 0:
+        return results
+
+    rows, offsets = _regular_rows(stack)
+    if rows.size == 0:
+        return results
+    day = stack.day[rows]
+    tod = stack.tod[rows]
+    volume0 = np.nan_to_num(stack.volume[rows], nan=0.0)
+
+    for i, ticker in enumerate(stack.tickers):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        if start == end:
+            continue
+        days = day[start:end]
+        today_start = start + int(np.searchsorted(days, days[-1], side="left"))
+        today_count = end - today_start
+        today_volume = volume0[today_start:end]
+
+        k = min(int(k_bars), today_count)
+
+        baseline_start = today_start
+        if today_start > start:
+            prior_days = np.unique(days[: today_start - start])
+            first_day = prior_days[-baseline_days:][0]
+            baseline_start = start + int(np.searchsorted(days, first_day, side="left"))
+        baseline_end = today_start
+        if include_today:
+            baseline_end = end - k if (exclude_last_k_from_today and today_count > k) else end
+
+        baseline_1m_avg = None
+        if baseline_end > baseline_start:
+            baseline_1m_avg = float(volume0[baseline_start:baseline_end].sum() / (baseline_end - baseline_start))
+
+        results[ticker] = _rvol_fields(today_volume, k, baseline_1m_avg, int(tod[end - 1] // NS_PER_MINUTE))
+    return results
+
+
+def rvol_baselines(stack: BarStack, baseline_days: int) -> Dict[str, dict]:
+    """
+    The part of each ticker's `rvol_recent_k_1m` baseline that only changes once a day: regular-session
+    `volume` and `bars` over the `baseline_days` sessions before the latest one, which is `day`
+    (ET days since the epoch). Tickers without regular bars are left out.
+    """
+    results: Dict[str, dict] = {}
+    if len(stack) == 0 or baseline_days <= 0:
+        return results
+
+    rows, offsets = _regular_rows(stack)
+    day = stack.day[rows]
+    volume0 = np.nan_to_num(stack.volume[rows], nan=0.0)
+    for i, ticker in enumerate(stack.tickers):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        if start == end:
+            continue
+        days = day[start:end]
+        today_start = start + int(np.searchsorted(days, days[-1], side="left"))
+        baseline_start = today_start
+        if today_start > start:
+            first_day = np.unique(days[: today_start - start])[-baseline_days:][0]
+            baseline_start = start + int(np.searchsorted(days, first_day, side="left"))
+        results[ticker] = {
+            "day": int(days[-1]),
+            "bars": today_start - baseline_start,
+            "volume": float(volume0[baseline_start:today_start].sum()),
+        }
+    return results
+
+
+def rvol_from_baselines(
+    stack: BarStack,
+    baselines: Dict[str, dict],
+    k_bars: int,
+    include_today: bool,
+    exclude_last_k_from_today: bool,
+) -> Dict[str, dict]:
+    """
+    `rvol_recent_k_1m` from today's bars plus a precomputed `rvol_baselines` entry. Only tickers whose
+    baseline was built for the latest session in `stack` are returned; the rest need their history.
+    """
+    results: Dict[str, dict] = {}
+    if len(stack) == 0 or k_bars <= 0:
+        return results
+
+    rows, offsets = _regular_rows(stack)
+    day = stack.day[rows]
+    tod = stack.tod[rows]
+    volume0 = np.nan_to_num(stack.volume[rows], nan=0.0)
+    for i, ticker in enumerate(stack.tickers):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        baseline = baselines.get(ticker)
+        if start == end or not baseline or baseline.get("day") != int(day[end - 1]):
+            continue
+        today_start = start + int(np.searchsorted(day[start:end], day[end - 1], side="left"))
+        today_count = end - today_start
+        today_volume = volume0[today_start:end]
+        k = min(int(k_bars), today_count)
+
+        volume = float(baseline.get("volume") or 0.0)
+        bars = int(baseline.get("bars") or 0)
+        if include_today:
+            today_bars = today_count - k if (exclude_last_k_from_today and today_count > k) else today_count
+            volume += float(today_volume[:today_bars].sum())
+            bars += today_bars
+        baseline_1m_avg = volume / bars if bars > 0 else None
+
+        results[ticker] = _rvol_fields(today_volume, k, baseline_1m_avg, int(tod[end - 1] // NS_PER_MINUTE))
+    return results
@@ -0,0 +1,99 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def _to_float(value: object) -> Optional[float]:
+    try:
+        if value is None:
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: object) -> Optional[int]:
+    try:
+        if value is None:
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FeatureSnapshot:
+    """
+    Typed columnar view of a features payload for vectorized scanner filters.
+
+    Float columns hold NaN where the row value is missing; `nulls(name)` tells missing values
+    apart from real NaNs so masks can mirror the row-by-row `is None` checks, while NaN keeps its
+    Python comparison semantics (every comparison False). Columns are built on first use.
+    """
+
+    def __init__(self, payload: dict):
+        # Scanners skip rows without a ticker, so the snapshot never contains them.
+        self.rows: List[dict] = [f for f in payload.get("features", []) or [] if f.get("ticker")]
+        self.as_of = payload.get("asOf")
+        self._floats: dict[str, np.ndarray] = {}
+        self._nulls: dict[str, np.ndarray] = {}
+        self._ints: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [*self._floats.values(), *self._nulls.values(), *self._ints.values()]
+        return sum(a.nbytes for a in arrays) + 512 * len(self.rows)
+
+    def _build_float(self, name: str) -> None:
+        values = [_to_float(f.get(name)) for f in self.rows]
+        nulls = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+        self._floats[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        self._nulls[name] = nulls
+
+    def floats(self, name: str) -> np.ndarray:
+        if name not in self._floats:
+            self._build_float(name)
+        return self._floats[name]
+
+    def nulls(self, name: str) -> np.ndarray:
+        if name not in self._nulls:
+            self._build_float(name)
+        return self._nulls[name]
+
+    def ints(self, name: str) -> np.ndarray:
+        """Integer column with missing values as 0 (`_safe_int(value) or 0`)."""
+        if name not in self._ints:
+            self._ints[name] = np.array([_to_int(f.get(name)) or 0 for f in self.rows], dtype=np.int64)
+        return self._ints[name]
+
+
+def or_default(values: np.ndarray, nulls: np.ndarray, default: float) -> np.ndarray:
+    """Vector form of `value or default` for float columns (None and 0.0 are falsy, NaN is not)."""
+    return np.where(nulls | (values == 0), default, values)
+
+
+def py_min(a, b):
+    """Elementwise `min(a, b)` with Python's NaN behaviour (b wins only if b < a)."""
+    return np.where(b < a, b, a)
+
+
+def py_max(a, b):
+    """Elementwise `max(a, b)` with Python's NaN behaviour (b wins only if b > a)."""
+    return np.where(b > a, b, a)
+
+
+def sort_indices(indices: np.ndarray, keys: Sequence[np.ndarray], descending: bool) -> Optional[np.ndarray]:
+    """
+    Orders `indices` like `sorted(rows, key=lambda r: tuple(keys), reverse=descending)`: stable,
+    first key most significant. Returns None when a key holds NaN, whose Python ordering is not
+    a total order; callers then sort the rows in Python.
+    """
+    columns = [np.asarray(key)[indices] for key in keys]
+    for column in columns:
+        if column.dtype.kind == "f" and np.isnan(column).any():
+            return None
+    if descending:
+        columns = [-column for column in columns]
+    return indices[np.lexsort(tuple(reversed(columns)))]
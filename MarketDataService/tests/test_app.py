@@ -1,5 +1,10 @@
+import asyncio
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
 import unittest
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -121,7 +126,7 @@ class TestScannerWrappers(unittest.TestCase):
         ), mock.patch.object(app, "_write_scan_cache_entry", return_value={}), mock.patch.object(
             app, "scan_hod_vwap_momentum", return_value=payload
         ):
-            result = app.scan_hod_breakouts(request)
+            result = asyncio.run(app.scan_hod_breakouts(request))
 
         self.assertEqual(result["scanner"], "hod_breakouts")
         self.assertEqual(
@@ -131,14 +136,802 @@ class TestScannerWrappers(unittest.TestCase):
         row = result["results"][0]
         self.assertIsNone(row["vwap"])
         self.assertIsNone(row["vwap_distance"])
+        # The combined scanner payload may be shared through the in-process cache.
+        self.assertEqual(payload["scanner"], "hod_vwap_momentum")
+        self.assertEqual(payload["results"][0]["vwap"], 10.0)
 
 
-class TestQuotesEndpoint(unittest.TestCase):
-    def test_quotes_uses_cache_entry_when_available(self):
-        cached_payload = {
+    def test_combined_scan_hit_skips_the_features_load_unless_refreshed(self):
+        cached = {"scanner": "hod_vwap_momentum", "asOf": "old", "results": []}
+        features = ({"asOf": "new", "features": []}, None)
+        with mock.patch.object(app, "read_cache", return_value=cached), mock.patch.object(
+            app, "write_cache"
+        ) as write, mock.patch.object(app, "_get_features_snapshot", return_value=features) as load:
+            self.assertIs(app.scan_hod_vwap_momentum(app.HodVwapMomentumRequest()), cached)
+            load.assert_not_called()
+
+            refreshed = app.scan_hod_vwap_momentum(app.HodVwapMomentumRequest(), refresh=True)
+
+        load.assert_called_once()
+        self.assertEqual(refreshed["asOf"], "new")
+        write.assert_called_once()
+
+class _CountingCache:
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.mget_calls = 0
+        self.pipeline_calls = 0
+
+    def mget(self, *keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        cache = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def setex(self, key, ttl, value):
+                self.ops.append((key, ttl, value))
+
+            def execute(self):
+                cache.pipeline_calls += 1
+                for key, ttl, value in self.ops:
+                    cache.store[key] = value
+                    cache.ttls[key] = ttl
+
+        return _Pipe()
+
+
+class TestDownloadIntraday(unittest.TestCase):
+    def test_reads_and_fills_bar_cache_in_bulk(self):
+        tz = ZoneInfo("America/New_York")
+        idx = pd.DatetimeIndex([datetime(2024, 1, 2, 10, 0, tzinfo=tz), datetime(2024, 1, 2, 10, 1, tzinfo=tz)])
+        bars = pd.DataFrame({"Close": [1.0, 2.0], "Volume": [10, 20]}, index=idx)
+        download = pd.concat({"AAA": bars, "BBB": bars}, axis=1)
+        cache = _CountingCache()
+
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(
+            app.yf, "download", return_value=download
+        ) as yf_download:
+            frames = app._download_intraday(["AAA", "BBB"], interval="1m", period="1d", prepost=False)
+            self.assertEqual(sorted(frames), ["AAA", "BBB"])
+            # One MGET for the requested period, one for the longer periods that could cover the misses.
+            self.assertEqual((cache.mget_calls, cache.pipeline_calls), (2, 1))
+
+            cached = app._download_intraday(["AAA", "BBB"], interval="1m", period="1d", prepost=False)
+
+        self.assertEqual(yf_download.call_count, 1)
+        self.assertEqual(cache.mget_calls, 3)
+        self.assertEqual(cached["BBB"]["Close"].tolist(), [1.0, 2.0])
+
+
+    def _cache_with(self, cache, ticker, df, stored_at):
+        df = df.copy()
+        df.attrs = {"storedAt": stored_at}
+        cache.store[app._bars_cache_key(ticker, "1m", "2d", False)] = app._encode_bars_cache(df)
+
+    def test_expired_entries_fetch_only_the_tail(self):
+        tz = ZoneInfo("America/New_York")
+        idx = pd.DatetimeIndex(
+            [
+                datetime(2024, 1, 2, 15, 59, tzinfo=tz),
+                datetime(2024, 1, 3, 10, 0, tzinfo=tz),
+                datetime(2024, 1, 3, 10, 1, tzinfo=tz),
+            ]
+        )
+        old = pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": [10, 20, 30]}, index=idx)
+        tail_idx = pd.DatetimeIndex([datetime(2024, 1, 3, 10, 1, tzinfo=tz), datetime(2024, 1, 4, 9, 30, tzinfo=tz)])
+        tail = pd.DataFrame({"Close": [3.5, 4.0], "Volume": [35, 40]}, index=tail_idx)
+        cache = _CountingCache()
+        self._cache_with(cache, "AAA", old, 0)
+
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(
+            app.yf, "download", return_value=pd.concat({"AAA": tail}, axis=1)
+        ) as yf_download:
+            frames = app._download_intraday(["AAA"], interval="1m", period="2d", prepost=False)
+
+        kwargs = yf_download.call_args.kwargs
+        self.assertNotIn("period", kwargs)
+        self.assertEqual(pd.Timestamp(kwargs["start"]), idx[-1])
+        # Jan 2 falls out of the 2-day window; the still-forming 10:01 bar is replaced.
+        self.assertEqual(frames["AAA"]["Close"].tolist(), [2.0, 3.5, 4.0])
+        rewritten = app._decode_bars_cache(cache.store[app._bars_cache_key("AAA", "1m", "2d", False)])
+        self.assertEqual(rewritten["Close"].tolist(), [2.0, 3.5, 4.0])
+        self.assertGreater(rewritten.attrs["storedAt"], 0)
+
+    def test_failed_tail_falls_back_to_full_download(self):
+        tz = ZoneInfo("America/New_York")
+        idx = pd.DatetimeIndex([datetime(2024, 1, 3, 10, 0, tzinfo=tz)])
+        old = pd.DataFrame({"Close": [1.0], "Volume": [10]}, index=idx)
+        full = pd.DataFrame({"Close": [1.0, 2.0], "Volume": [10, 20]}, index=idx.append(idx + pd.Timedelta(minutes=1)))
+        cache = _CountingCache()
+        self._cache_with(cache, "AAA", old, 0)
+
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(
+            app, "DOWNLOAD_MAX_RETRIES", 0
+        ), mock.patch.object(
+            app.yf, "download", side_effect=[RuntimeError("rate limited"), pd.concat({"AAA": full}, axis=1)]
+        ) as yf_download:
+            frames = app._download_intraday(["AAA"], interval="1m", period="2d", prepost=False)
+
+        self.assertEqual(yf_download.call_args.kwargs["period"], "2d")
+        self.assertEqual(frames["AAA"]["Close"].tolist(), [1.0, 2.0])
+
+    def test_resample_aligns_bins_to_session_starts(self):
+        idx = pd.date_range("2024-01-02 09:00", "2024-01-02 16:29", freq="min", tz=app.ET_TZ)
+        df = pd.DataFrame(
+            {"Open": range(len(idx)), "High": range(len(idx)), "Low": range(len(idx)), "Close": range(len(idx)),
+             "Volume": [1] * len(idx)},
+            index=idx,
+            dtype=float,
+        ).astype({"Volume": "int64"})
+        bars = app._resample_bars(df, 90)
+
+        labels = [ts.strftime("%H:%M") for ts in bars.index]
+        self.assertEqual(labels, ["08:30", "09:30", "11:00", "12:30", "14:00", "15:30", "16:00"])
+        # The 08:30 pre-market bin and the last regular bar (15:30-15:59) are cut at the session boundary.
+        self.assertEqual(bars["Volume"].tolist(), [30, 90, 90, 90, 90, 30, 30])
+        first_regular = bars.loc[bars.index[1]]
+        self.assertEqual((first_regular["Open"], first_regular["High"], first_regular["Close"]), (30.0, 119.0, 119.0))
+
+    def test_coarse_intervals_are_built_from_fresh_cached_1m_bars(self):
+        idx = pd.date_range("2024-01-02 09:30", periods=10, freq="min", tz=app.ET_TZ)
+        one_minute = pd.DataFrame(
+            {"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 10}, index=idx
+        )
+        one_minute.attrs = {"storedAt": int(time.time())}
+        cache = _CountingCache()
+        cache.store[app._bars_cache_key("AAA", "1m", "1d", False)] = app._encode_bars_cache(one_minute)
+
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(
+            app, "BARS_RESAMPLE_FROM_1M", "cached"
+        ), mock.patch.object(app.yf, "download", side_effect=AssertionError("unexpected download")):
+            frames = app._download_intraday(["AAA"], interval="5m", period="1d", prepost=False)
+
+        self.assertEqual(frames["AAA"]["Volume"].tolist(), [50, 50])
+        self.assertIn(app._bars_cache_key("AAA", "5m", "1d", False), cache.store)
+
+    def test_bar_store_survives_a_lost_redis_cache(self):
+        idx = pd.date_range("2024-01-02 09:30", periods=3, freq="min", tz=app.ET_TZ)
+        bars = pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": [10, 20, 30]}, index=idx)
+        with tempfile.TemporaryDirectory() as root:
+            store = app.BarStore(root)
+            with mock.patch.object(app, "bar_store", store), mock.patch.object(
+                app, "cache_client", _CountingCache()
+            ), mock.patch.object(app.yf, "download", return_value=pd.concat({"AAA": bars}, axis=1)):
+                app._download_intraday(["AAA"], interval="1m", period="1d", prepost=False)
+
+            # A fresh Redis (restart or eviction) is refilled from disk without downloading.
+            cache = _CountingCache()
+            with mock.patch.object(app, "bar_store", store), mock.patch.object(
+                app, "cache_client", cache
+            ), mock.patch.object(app.yf, "download", side_effect=AssertionError("unexpected download")):
+                frames = app._download_intraday(["AAA"], interval="1m", period="1d", prepost=False)
+
+        self.assertEqual(frames["AAA"]["Close"].tolist(), [1.0, 2.0, 3.0])
+        self.assertIn(app._bars_cache_key("AAA", "1m", "1d", False), cache.store)
+
+
+class TestRelVolBaselines(unittest.TestCase):
+    def _bars(self, day) -> pd.DataFrame:
+        start = pd.Timestamp(day).tz_localize(app.ET_TZ) + pd.Timedelta(hours=9, minutes=30)
+        idx = pd.date_range(start, periods=30, freq="min")
+        volume = (pd.Series(range(30), index=idx) * 100 + 1000 * (day.day % 7 + 1)).astype(float)
+        return pd.DataFrame({"Open": 1.0, "High": 1.1, "Low": 0.9, "Close": 1.0, "Volume": volume})
+
+    def test_cached_baselines_only_need_todays_bars(self):
+        today = datetime.now(app.ET_TZ).date()
+        history = pd.concat([self._bars(today - pd.Timedelta(days=1)), self._bars(today)])
+        periods = []
+
+        def download(tickers, *, interval, period, prepost, refresh=False):
+            periods.append(period)
+            frame = history if period == "2d" else history[history.index.date == today]
+            return {ticker: frame for ticker in tickers}
+
+        request = app.ScannerUniverseRequest(interval="1m", period="1d")
+        with mock.patch.object(app, "cache_client", _CountingCache()), mock.patch.object(
+            app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)
+        ), mock.patch.object(app, "_load_universe_items", return_value=[{"ticker": "AAA"}]), mock.patch.object(
+            app, "_download_intraday", side_effect=download
+        ), mock.patch.object(app, "REL_VOL_HISTORY_DAYS", 2):
+            first = app._compute_features(request)
+            second = app._compute_features(request)
+
+        self.assertEqual(periods, ["2d", "1d"])
+        first_row, second_row = first["features"][0], second["features"][0]
+        self.assertIsNotNone(second_row["relVol"])
+        for key in ("relVol", "relVolTod", "baselineBarVol", "baselineCumVol"):
+            self.assertAlmostEqual(first_row[key], second_row[key])
+        self.assertEqual((first_row["todayCumVol"], first_row["barTime"]), (second_row["todayCumVol"], second_row["barTime"]))
+
+
+class TestBatchedDownloads(unittest.TestCase):
+    def setUp(self):
+        self.cache = _CountingCache()
+        self.patches = [
+            mock.patch.object(app, "cache_client", self.cache),
+            mock.patch.object(app, "_download_batch_size", app.AdaptiveBatchSize(2, 1, 2)),
+            mock.patch.object(app, "_download_limiter", app.TokenBucket(rate=0, capacity=1)),
+            mock.patch.object(app, "DOWNLOAD_RETRY_BACKOFF_MS", 0),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+
+    def _bars(self):
+        idx = pd.DatetimeIndex([datetime(2024, 1, 2, 10, 0, tzinfo=ZoneInfo("America/New_York"))])
+        return pd.DataFrame({"Close": [1.0], "Volume": [10]}, index=idx)
+
+    def _fake_download(self, fail=()):
+        def download(tickers, **_kwargs):
+            batch = tickers.split()
+            time.sleep(0.1)
+            if any(ticker in fail for ticker in batch):
+                raise RuntimeError("boom")
+            return pd.concat({ticker: self._bars() for ticker in batch}, axis=1)
+
+        return download
+
+    def _download_concurrently(self, ticker_sets):
+        results = [None] * len(ticker_sets)
+
+        def run(i):
+            results[i] = app._download_intraday(ticker_sets[i], interval="1m", period="1d", prepost=False)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(ticker_sets))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_yfinance_is_never_called_concurrently(self):
+        active = []
+        overlaps = []
+        fake = self._fake_download()
+
+        def download(tickers, **kwargs):
+            active.append(tickers)
+            overlaps.append(len(active))
+            try:
+                return fake(tickers, **kwargs)
+            finally:
+                active.remove(tickers)
+
+        with mock.patch.object(app.yf, "download", side_effect=download) as yf_download:
+            first, second = self._download_concurrently([["AAA", "BBB", "CCC"], ["DDD", "EEE", "FFF"]])
+
+        self.assertEqual((sorted(first), sorted(second)), (["AAA", "BBB", "CCC"], ["DDD", "EEE", "FFF"]))
+        self.assertEqual(yf_download.call_count, 4)
+        self.assertEqual(max(overlaps), 1)
+
+    def test_real_download_keeps_every_ticker_across_concurrent_requests(self):
+        bars = self._bars()
+
+        class FakeTicker:
+            def __init__(self, ticker, *args, **kwargs):
+                self.ticker = ticker
+
+            def history(self, *args, **kwargs):
+                # Staggered latencies, so overlapping downloads would reset each other's results.
+                time.sleep(0.01 * (int(self.ticker[1:]) % 5))
+                return bars.assign(Open=1.0, High=1.0, Low=1.0)
+
+        ticker_sets = [[f"T{i:02d}" for i in range(start, start + 6)] for start in range(0, 30, 6)]
+        # No retries, so a lost ticker cannot be recovered by downloading it again.
+        with mock.patch("yfinance.multi.Ticker", FakeTicker), mock.patch.object(app, "DOWNLOAD_MAX_RETRIES", 0):
+            results = self._download_concurrently(ticker_sets)
+
+        self.assertEqual([sorted(frames) for frames in results], ticker_sets)
+
+    def test_tickers_missing_from_a_result_are_retried(self):
+        calls = []
+
+        def download(tickers, **_kwargs):
+            calls.append(tickers)
+            # The first call drops BBB, like yf.download does for a ticker whose request failed.
+            batch = [ticker for ticker in tickers.split() if ticker != "BBB" or len(calls) > 1]
+            return pd.concat({ticker: self._bars() for ticker in batch}, axis=1)
+
+        with mock.patch.object(app.yf, "download", side_effect=download):
+            frames = app._download_intraday(["AAA", "BBB"], interval="1m", period="1d", prepost=False)
+
+        self.assertEqual(sorted(frames), ["AAA", "BBB"])
+        self.assertEqual(calls, ["AAA BBB", "BBB"])
+
+    def test_tickers_that_never_return_bars_are_left_out(self):
+        with mock.patch.object(app.yf, "download", return_value=pd.DataFrame()) as yf_download:
+            frames = app._download_intraday(["ZZZ"], interval="1m", period="1d", prepost=False)
+
+        self.assertEqual(frames, {})
+        self.assertEqual(yf_download.call_count, app.DOWNLOAD_MAX_RETRIES + 1)
+
+    def test_failing_batch_is_split_and_retried_without_failing_the_request(self):
+        with mock.patch.object(app.yf, "download", side_effect=self._fake_download(fail={"BBB"})):
+            frames = app._download_intraday(["AAA", "BBB", "CCC", "DDD"], interval="1m", period="1d", prepost=False)
+
+        # AAA is recovered by the split retry; only the bad ticker is dropped.
+        self.assertEqual(sorted(frames), ["AAA", "CCC", "DDD"])
+
+    def test_all_batches_failing_is_a_502(self):
+        with mock.patch.object(app.yf, "download", side_effect=self._fake_download(fail={"AAA", "BBB"})):
+            with self.assertRaises(HTTPException) as ctx:
+                app._download_intraday(["AAA", "BBB"], interval="1m", period="1d", prepost=False)
+        self.assertEqual(ctx.exception.status_code, 502)
+
+
+def _screen_quote(symbol: str, change: float) -> dict:
+    return {
+        "symbol": symbol,
+        "quoteType": "EQUITY",
+        "exchange": "NMS",
+        "regularMarketPrice": 5.0,
+        "regularMarketChangePercent": change,
+        "averageDailyVolume10Day": 2_000_000,
+        "shortName": symbol,
+    }
+
+
+class TestScreenerFanOut(unittest.TestCase):
+    def _universe(self):
+        return app._fetch_scanner_universe(
+            universe_limit=25, min_price=1.5, max_price=30, min_avg_vol=1_000_000, min_change_pct=0.0
+        )
+
+    def test_screeners_run_concurrently(self):
+        def fake_screen(screener, **_kwargs):
+            time.sleep(0.2)
+            return {"quotes": [_screen_quote(screener.upper()[:4], 5.0)]}
+
+        with mock.patch.object(app.yf, "screen", side_effect=fake_screen):
+            started = time.monotonic()
+            universe = self._universe()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(universe), 4)
+        # Serial calls would take ~0.8s; concurrently the slowest screener bounds the build.
+        self.assertLess(elapsed, 0.5)
+
+    def test_partial_results_survive_errors_and_timeouts(self):
+        def fake_screen(screener, **_kwargs):
+            if screener == "most_actives":
+                raise RuntimeError("boom")
+            if screener == "small_cap_gainers":
+                time.sleep(1.0)
+            return {"quotes": [_screen_quote("AAA", 5.0)]}
+
+        with mock.patch.object(app.yf, "screen", side_effect=fake_screen), mock.patch.object(
+            app, "SCREENER_TIMEOUT_SECONDS", 0.2
+        ):
+            payloads, errors = app._fetch_screener_payloads(
+                ["day_gainers", "most_actives", "aggressive_small_caps", "small_cap_gainers"], 25
+            )
+
+        self.assertEqual(len(payloads), 2)
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(any("timed out" in error for error in errors))
+
+    def test_no_payloads_is_a_502(self):
+        with mock.patch.object(app.yf, "screen", side_effect=RuntimeError("down")):
+            with self.assertRaises(HTTPException) as ctx:
+                self._universe()
+        self.assertEqual(ctx.exception.status_code, 502)
+
+
+class TestSingleFlightFeatures(unittest.TestCase):
+    def setUp(self):
+        self._local_cache = app.local_cache
+        app.local_cache = app.LocalCache(max_entries=0, max_bytes=0)
+        # Per-filter payloads, so the cached payload itself is what callers get back.
+        self._superset = mock.patch.object(app, "SCANNER_SUPERSET_FEATURES", False)
+        self._superset.start()
+
+    def tearDown(self):
+        self._superset.stop()
+        app.local_cache = self._local_cache
+
+    def test_concurrent_cold_requests_compute_features_once(self):
+        store = {}
+        calls = []
+
+        def compute(_request, refresh=False):
+            calls.append(1)
+            time.sleep(0.05)
+            return {"asOf": "2024-01-02T15:00:00Z", "universe": [], "features": []}
+
+        results = []
+        request = app.ScannerUniverseRequest()
+        with mock.patch.object(app, "read_cache", side_effect=lambda key: store.get(key)), mock.patch.object(
+            app, "write_cache", side_effect=lambda key, payload: store.__setitem__(key, payload)
+        ), mock.patch.object(app, "_compute_features", side_effect=compute), mock.patch.object(
+            app, "SINGLE_FLIGHT_DISTRIBUTED", False
+        ):
+            threads = [
+                threading.Thread(target=lambda: results.append(app._get_features_cached(request))) for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+
+    def test_waits_for_remote_lease_holder_instead_of_computing(self):
+        payload = {"asOf": "2024-01-02T15:00:00Z", "universe": [], "features": []}
+        reads = iter([None, None, None, payload])
+
+        with mock.patch.object(app, "read_cache", side_effect=lambda key: next(reads)), mock.patch.object(
+            app, "acquire_lease", return_value=None
+        ), mock.patch.object(app, "lease_held", return_value=True), mock.patch.object(
+            app, "SINGLE_FLIGHT_POLL_MS", 10
+        ), mock.patch.object(
+            app, "_compute_features"
+        ) as compute:
+            result = app._get_features_cached(app.ScannerUniverseRequest())
+
+        self.assertIs(result, payload)
+        compute.assert_not_called()
+
+
+class TestSupersetFeatures(unittest.TestCase):
+    QUOTES = [
+        # symbol, price, change %, avg volume
+        ("AAA", 5.0, 12.0, 2_000_000),
+        ("BBB", 45.0, 9.0, 3_000_000),
+        ("CCC", 8.0, 1.0, 5_000_000),
+        ("DDD", 3.0, 6.0, 400_000),
+        ("EEE", 1.0, 20.0, 9_000_000),
+    ]
+
+    def _screen(self, screener, **_kwargs):
+        quotes = []
+        for symbol, price, change, avg_vol in self.QUOTES:
+            quote = _screen_quote(symbol, change)
+            quote.update(regularMarketPrice=price, averageDailyVolume10Day=avg_vol)
+            quotes.append(quote)
+        return {"quotes": quotes}
+
+    def _download(self, tickers, *, interval, period, prepost, refresh=False):
+        self.downloads.append(sorted(tickers))
+        today = pd.Timestamp(datetime.now(app.ET_TZ).date()).tz_localize(app.ET_TZ)
+        start = today + pd.Timedelta(hours=9, minutes=30)
+        idx = pd.date_range(start, periods=12, freq="5min")
+        frames = {}
+        for ticker in tickers:
+            n = ord(ticker[0]) - ord("A")
+            close = pd.Series([1.0 + n + 0.1 * i for i in range(12)], index=idx)
+            frames[ticker] = pd.DataFrame(
+                {"Open": close, "High": close + 0.05, "Low": close - 0.05, "Close": close, "Volume": 1000.0 * (n + 1)}
+            )
+        return frames
+
+    def _run(self, superset: bool, requests) -> list:
+        store = {}
+        self.downloads = []
+        with mock.patch.object(app, "SCANNER_SUPERSET_FEATURES", superset), mock.patch.object(
+            app, "read_cache", side_effect=lambda key: store.get(key)
+        ), mock.patch.object(
+            app, "write_cache", side_effect=lambda key, payload: store.__setitem__(key, payload)
+        ), mock.patch.object(app, "local_cache", app.LocalCache(max_entries=64, max_bytes=1_000_000)), mock.patch.object(
+            app, "SINGLE_FLIGHT_DISTRIBUTED", False
+        ), mock.patch.object(app, "REL_VOL_METHOD", "off"), mock.patch.object(
+            app.yf, "screen", side_effect=self._screen
+        ), mock.patch.object(app, "_download_intraday", side_effect=self._download):
+            return [app._get_features_cached(request) for request in requests]
+
+    def test_filter_sets_share_one_computation_with_identical_results(self):
+        requests = [
+            app.ScannerUniverseRequest(),
+            app.ScannerUniverseRequest(minChangePct=0.0, maxPrice=50.0),
+            app.ScannerUniverseRequest(minAvgVol=100_000, minPrice=2.0),
+        ]
+        per_filter = self._run(False, requests)
+        self.assertEqual(len(self.downloads), 3)
+
+        shared = self._run(True, requests)
+        self.assertEqual(self.downloads, [["AAA", "BBB", "CCC", "DDD"]])
+        for expected, actual in zip(per_filter, shared):
+            self.assertEqual(actual["universe"], expected["universe"])
+            self.assertEqual(actual["features"], expected["features"])
+        self.assertEqual(shared[1]["universe"], ["AAA", "BBB", "CCC"])
+
+    def test_view_is_memoized_against_the_superset_payload(self):
+        request = app.ScannerUniverseRequest(minChangePct=0.0)
+        superset = {
             "asOf": "2024-01-02T15:00:00Z",
-            "results": [{"symbol": "AAA", "price": 12.34}],
+            "items": [{"ticker": "AAA", "last": 5.0}, {"ticker": "BBB", "last": 50.0}],
+            "features": [{"ticker": "AAA"}, {"ticker": "BBB"}],
+        }
+        with mock.patch.object(app, "local_cache", app.LocalCache(max_entries=64, max_bytes=1_000_000)):
+            first = app._features_view(request, superset)
+            self.assertIs(app._features_view(request, superset), first)
+            self.assertIsNot(app._features_view(request, dict(superset)), first)
+        self.assertEqual(first, {"asOf": "2024-01-02T15:00:00Z", "universe": ["AAA"], "features": [{"ticker": "AAA"}]})
+
+
+class _AsyncCache:
+    def __init__(self, store):
+        self.store = store
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+
+class TestAsyncRequestPath(unittest.TestCase):
+    def setUp(self):
+        self.patches = [
+            mock.patch.object(app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+
+    def test_cache_hits_are_served_on_the_event_loop(self):
+        now = datetime.now(app.timezone.utc)
+        envelope = {
+            "__cache": {
+                "v": 1,
+                "storedAt": app._format_utc_iso(now),
+                "freshUntil": app._format_utc_iso(now + app.timedelta(minutes=5)),
+                "staleUntil": app._format_utc_iso(now + app.timedelta(hours=1)),
+            },
+            "data": {"asOf": "2024-01-02T15:00:00Z", "results": []},
         }
+        async_cache = _AsyncCache({"md:test": app.json.dumps(envelope)})
+        compute = mock.Mock()
+
+        with mock.patch.object(app, "async_cache_client", async_cache), mock.patch.object(
+            app, "_run_blocking", side_effect=AssertionError("unexpected executor hop")
+        ):
+            result = asyncio.run(app._serve_scan_cached_async("md:test", compute))
+
+        self.assertEqual(async_cache.gets, 1)
+        self.assertEqual(result["cache"]["source"], "cache")
+        compute.assert_not_called()
+
+    def test_misses_compute_on_the_request_executor(self):
+        threads = []
+
+        def compute():
+            threads.append(threading.current_thread().name)
+            return {"asOf": "2024-01-02T15:00:00Z", "results": []}
+
+        with mock.patch.object(app, "async_cache_client", _AsyncCache({})), mock.patch.object(
+            app, "_read_scan_cache_entry", return_value=(None, None)
+        ), mock.patch.object(app, "_write_scan_cache_entry", return_value={"source": "yfinance"}):
+            result = asyncio.run(app._serve_scan_cached_async("md:test", compute))
+
+        self.assertEqual(result["cache"]["source"], "yfinance")
+        self.assertTrue(threads[0].startswith("md-request"))
+
+    def test_history_reads_the_async_cache(self):
+        payload = {"ticker": "AAA", "interval": "5m", "period": "1d", "prepost": False, "bars": []}
+        async_cache = _AsyncCache({"md:bars:AAA:5m:1d:prepost=0": app.json.dumps(payload)})
+
+        with mock.patch.object(app, "async_cache_client", async_cache), mock.patch.object(
+            app.yf, "Ticker", side_effect=AssertionError("unexpected download")
+        ):
+            result = asyncio.run(app.history(ticker="AAA", interval="5m", period="1d", prepost=False))
+
+        self.assertEqual(result, payload)
+
+
+class TestHistoryStreaming(unittest.TestCase):
+    def _payload(self):
+        bars = [{"t": f"2024-01-02T15:{i:02d}:00Z", "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5, "v": i} for i in range(5)]
+        bars[2]["o"] = float("nan")
+        return {"ticker": "AAA", "interval": "1m", "period": "1d", "prepost": False, "timezone": "America/New_York", "bars": bars}
+
+    def _read(self, response):
+        async def _collect():
+            return "".join([chunk async for chunk in response.body_iterator])
+
+        return asyncio.run(_collect())
+
+    def _stream(self, payload, fmt):
+        async_cache = _AsyncCache({"md:bars:AAA:1m:1d:prepost=0": app.json.dumps(payload)})
+        with mock.patch.object(app, "async_cache_client", async_cache), mock.patch.object(
+            app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)
+        ), mock.patch.object(app, "HISTORY_STREAM_CHUNK_BARS", 2):
+            return asyncio.run(app.history(ticker="AAA", interval="1m", period="1d", prepost=False, stream=fmt))
+
+    def test_ndjson_writes_metadata_then_one_bar_per_line(self):
+        response = self._stream(self._payload(), "ndjson")
+        self.assertEqual(response.media_type, "application/x-ndjson")
+        lines = [app.json.loads(line) for line in self._read(response).splitlines()]
+        self.assertEqual(lines[0]["ticker"], "AAA")
+        self.assertNotIn("bars", lines[0])
+        self.assertEqual([bar["v"] for bar in lines[1:]], [0, 1, 2, 3, 4])
+        self.assertIsNone(lines[3]["o"])
+
+    def test_chunked_json_matches_the_regular_document(self):
+        payload = self._payload()
+        body = app.json.loads(self._read(self._stream(payload, "json")))
+        payload["bars"][2]["o"] = None
+        self.assertEqual(body, payload)
+
+    def test_columnar_format_is_built_from_the_frame(self):
+        index = pd.date_range("2024-01-02 09:30", periods=3, freq="min", tz=app.ET_TZ)
+        df = pd.DataFrame(
+            {"Open": [1.0, 2.0, 3.0], "High": [1.5, 2.5, 3.5], "Low": [0.5, 1.5, 2.5], "Close": [1.0, None, 3.0],
+             "Volume": [10, 20, 30]},
+            index=index,
+        )
+        ticker = mock.Mock()
+        ticker.history.return_value = df
+        with mock.patch.object(app, "async_cache_client", _AsyncCache({})), mock.patch.object(
+            app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)
+        ), mock.patch.object(app, "cache_client", _BatchCache()), mock.patch.object(app.yf, "Ticker", return_value=ticker):
+            response = asyncio.run(app.history(ticker="AAA", interval="1m", period="1d", prepost=False, fmt="columnar"))
+
+        body = app.json.loads(response.body)
+        self.assertEqual(body["format"], "columnar")
+        self.assertEqual(body["bars"]["t"], [1704205800000, 1704205920000])
+        self.assertEqual(body["bars"]["h"], [1.5, 3.5])
+        self.assertEqual(body["bars"]["v"], [10, 30])
+
+    def test_stdlib_response_fallback_writes_nan_as_null(self):
+        body = {"bars": {"o": [1.0, float("nan")], "h": [float("inf")]}}
+        with mock.patch.object(app, "orjson", None):
+            response = app._FiniteJSONResponse(body)
+        self.assertEqual(response.body, b'{"bars":{"o":[1.0,null],"h":[null]}}')
+
+    def test_history_bars_skip_missing_closes(self):
+        index = pd.date_range("2024-01-02 09:30", periods=3, freq="min", tz=app.ET_TZ)
+        df = pd.DataFrame(
+            {"Open": [1.0, 2.0, 3.0], "High": [1.0, 2.0, 3.0], "Low": [1.0, 2.0, 3.0], "Close": [1.0, None, 3.0],
+             "Volume": [10.0, 20.0, None]},
+            index=index,
+        )
+        bars = app._history_bars(df)
+        self.assertEqual([bar["t"] for bar in bars], ["2024-01-02T14:30:00Z", "2024-01-02T14:32:00Z"])
+        self.assertEqual([bar["v"] for bar in bars], [10, 0])
+
+
+class TestCoveringPeriods(unittest.TestCase):
+    def _bars(self, days: int) -> pd.DataFrame:
+        today = pd.Timestamp(datetime.now(app.ET_TZ).date()).tz_localize(app.ET_TZ)
+        starts = [today - pd.Timedelta(days=d) + pd.Timedelta(hours=9, minutes=30) for d in range(days - 1, -1, -1)]
+        idx = pd.DatetimeIndex([start + pd.Timedelta(minutes=m) for start in starts for m in range(3)])
+        return pd.DataFrame({"Close": range(len(idx)), "Volume": 100}, index=idx).astype(float)
+
+    def test_shorter_periods_are_sliced_from_a_cached_longer_frame(self):
+        cache = _BatchCache()
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(app, "REL_VOL_HISTORY_DAYS", 7):
+            app._write_bars_cache_many({app._bars_cache_key("AAA", "1m", "7d", False): self._bars(7)})
+            keys_before = set(cache.store)
+            with mock.patch.object(app.yf, "download") as yf_download:
+                one_day = app._download_intraday(["AAA"], interval="1m", period="1d", prepost=False)
+                two_days = app._download_intraday(["AAA"], interval="1m", period="2d", prepost=False)
+
+        yf_download.assert_not_called()
+        self.assertEqual(set(cache.store), keys_before)
+        self.assertEqual(one_day["AAA"]["Close"].tolist(), [18.0, 19.0, 20.0])
+        self.assertEqual(len(two_days["AAA"]), 6)
+
+    def test_frames_with_too_few_sessions_are_not_sliced(self):
+        cache = _BatchCache()
+        with mock.patch.object(app, "cache_client", cache):
+            app._write_bars_cache_many({app._bars_cache_key("AAA", "1m", "5d", False): self._bars(1)})
+            self.assertEqual(app._read_covering_bars_cache(["AAA"], interval="1m", period="2d", prepost=False), {})
+            self.assertEqual(
+                list(app._read_covering_bars_cache(["AAA"], interval="1m", period="1d", prepost=False)), ["AAA"]
+            )
+
+
+class TestHistoryBatch(unittest.TestCase):
+    def test_hits_come_from_one_bulk_read_and_misses_from_one_download(self):
+        cache = _BatchCache()
+        bar = {"t": "2024-01-02T14:30:00Z", "o": 1.0, "h": 1.0, "l": 1.0, "c": 1.0, "v": 10}
+        cached = {"ticker": "AAA", "interval": "1m", "period": "1d", "prepost": False, "bars": [bar]}
+        cache.store["md:bars:AAA:1m:1d:prepost=0"] = app.json.dumps(cached)
+        idx = pd.date_range("2024-01-02 09:30", periods=2, freq="min", tz=app.ET_TZ)
+        bars = pd.DataFrame(
+            {"Open": [1.0, 2.0], "High": [1.0, 2.0], "Low": [1.0, 2.0], "Close": [1.0, 2.0], "Volume": [10, 20]}, index=idx
+        )
+        request = app.HistoryBatchRequest(tickers=["aaa", "BBB", "ccc", "BBB"], interval="1m")
+
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(
+            app, "async_cache_client", None
+        ), mock.patch.object(app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)), mock.patch.object(
+            app, "DOWNLOAD_MAX_RETRIES", 0
+        ), mock.patch.object(
+            app.yf, "download", return_value=pd.concat({"BBB": bars}, axis=1)
+        ) as yf_download:
+            body = asyncio.run(app.history_batch(request))
+            mget_calls = cache.mget_calls
+            again = asyncio.run(app.history_batch(request))
+
+        self.assertEqual(list(body["results"]), ["AAA", "BBB"])
+        self.assertEqual(body["missing"], ["CCC"])
+        self.assertEqual([bar["c"] for bar in body["results"]["BBB"]["bars"]], [1.0, 2.0])
+        self.assertEqual(yf_download.call_count, 1)
+        self.assertEqual(yf_download.call_args.kwargs["tickers"], "BBB CCC")
+        # One MGET for /history payloads, two for the bar-frame cache (requested and covering periods).
+        self.assertEqual(mget_calls, 3)
+        self.assertIn("md:bars:BBB:1m:1d:prepost=0", cache.store)
+        # CCC has no bars: it is cached empty for a short while instead of being downloaded on every call.
+        self.assertEqual(cache.ttls["md:bars:CCC:1m:1d:prepost=0"], app.HISTORY_EMPTY_TTL_SECONDS)
+        self.assertEqual((list(again["results"]), again["missing"]), (["AAA", "BBB"], ["CCC"]))
+        self.assertEqual(cache.mget_calls, mget_calls + 1)
+
+    def test_single_history_fills_the_same_normalized_unadjusted_entry(self):
+        cache = _BatchCache()
+        index = pd.date_range("2024-01-02 09:30", periods=1, freq="min", tz=app.ET_TZ)
+        ticker = mock.Mock()
+        ticker.history.return_value = pd.DataFrame(
+            {"Open": [1.0], "High": [1.0], "Low": [1.0], "Close": [1.0], "Volume": [10]}, index=index
+        )
+        with mock.patch.object(app, "cache_client", cache), mock.patch.object(
+            app, "async_cache_client", None
+        ), mock.patch.object(app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)), mock.patch.object(
+            app.yf, "Ticker", return_value=ticker
+        ) as yf_ticker:
+            body = asyncio.run(app.history(ticker=" aapl ", interval="1m", period="1d", prepost=False))
+
+        yf_ticker.assert_called_once_with("AAPL")
+        self.assertFalse(ticker.history.call_args.kwargs["auto_adjust"])
+        self.assertEqual(body["ticker"], "AAPL")
+        self.assertIn("md:bars:AAPL:1m:1d:prepost=0", cache.store)
+
+    def test_history_sources_fetch_the_same_adjustment(self):
+        ticker = mock.Mock()
+        ticker.history.return_value = pd.DataFrame()
+        with mock.patch.object(app, "cache_client", _BatchCache()), mock.patch.object(
+            app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)
+        ), mock.patch.object(app, "DOWNLOAD_MAX_RETRIES", 0), mock.patch.object(
+            app.yf, "download", return_value=pd.DataFrame()
+        ) as yf_download, mock.patch.object(app.yf, "Ticker", return_value=ticker):
+            # The grouped download feeds the bar caches, the bar store and derived intervals.
+            app._download_intraday(["AAA"], interval="1m", period="1d", prepost=False)
+            app._fetch_history_frame("AAA", "5m", "1d", False)
+
+        self.assertFalse(yf_download.call_args.kwargs["auto_adjust"])
+        self.assertFalse(ticker.history.call_args.kwargs["auto_adjust"])
+
+    def test_rejects_oversized_batches(self):
+        with mock.patch.object(app, "HISTORY_BATCH_MAX_TICKERS", 1):
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(app.history_batch(app.HistoryBatchRequest(tickers=["AAA", "BBB"])))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class TestQuotesEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.cache = _BatchCache()
+        self.patches = [
+            mock.patch.object(app, "cache_client", self.cache),
+            mock.patch.object(app, "async_cache_client", None),
+            mock.patch.object(app, "local_cache", app.LocalCache(max_entries=0, max_bytes=0)),
+            mock.patch.object(app, "SINGLE_FLIGHT_DISTRIBUTED", False),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+
+    def _frames(self, tickers, **_kwargs):
+        tz = ZoneInfo("America/New_York")
+        idx = pd.DatetimeIndex([datetime(2024, 1, 2, 10, 0, tzinfo=tz)])
+        return {ticker: pd.DataFrame({"Close": [float(len(ticker))]}, index=idx) for ticker in tickers}
+
+    def test_quotes_uses_cache_entry_when_available(self):
         cache_info = {
             "isStale": False,
             "source": "cache",
@@ -150,10 +943,12 @@ class TestQuotesEndpoint(unittest.TestCase):
         }
 
         with mock.patch.object(
-            app, "_read_scan_cache_entry", return_value=(cached_payload, cache_info)
-        ):
-            result = app.quotes(app.QuotesRequest(tickers=["AAA"]))
+            app, "_decode_scan_cache_entry", return_value=({"symbol": "AAA", "price": 12.34}, cache_info)
+        ), mock.patch.object(app, "_download_intraday") as download:
+            self.cache.store[app._quote_cache_key("AAA", "1m", "1d", False)] = "{}"
+            result = asyncio.run(app.quotes(app.QuotesRequest(tickers=["AAA"])))
 
+        download.assert_not_called()
         self.assertEqual(result["asOf"], "2024-01-02T15:00:00Z")
         self.assertEqual(result["results"][0]["symbol"], "AAA")
         self.assertEqual(result["results"][0]["price"], 12.34)
@@ -164,13 +959,269 @@ class TestQuotesEndpoint(unittest.TestCase):
         idx = pd.DatetimeIndex([datetime(2024, 1, 2, 10, 0, tzinfo=tz)])
         df = pd.DataFrame({"Close": [5.0]}, index=idx)
 
-        with mock.patch.object(app, "_read_scan_cache_entry", return_value=(None, None)), mock.patch.object(
-            app, "_write_scan_cache_entry", return_value={}
-        ), mock.patch.object(app, "_download_intraday", return_value={"AAA": df}):
-            result = app.quotes(app.QuotesRequest(tickers=["AAA"], interval="1m", period="1d"))
+        with mock.patch.object(app, "_download_intraday", return_value={"AAA": df}):
+            result = asyncio.run(app.quotes(app.QuotesRequest(tickers=["AAA"], interval="1m", period="1d")))
 
         self.assertEqual(result["results"][0]["symbol"], "AAA")
         self.assertEqual(result["results"][0]["price"], 5.0)
+        self.assertEqual(result["cache"]["source"], "yfinance")
+
+    def test_quotes_skip_a_trailing_missing_close(self):
+        tz = ZoneInfo("America/New_York")
+        idx = pd.DatetimeIndex([datetime(2024, 1, 2, 10, 0, tzinfo=tz), datetime(2024, 1, 2, 10, 1, tzinfo=tz)])
+        frames = {"AAA": pd.DataFrame({"Close": [5.0, float("nan")]}, index=idx), "BB": pd.DataFrame({"Open": [1.0]})}
+
+        with mock.patch.object(app, "_download_intraday", return_value=frames):
+            result = asyncio.run(app.quotes(app.QuotesRequest(tickers=["AAA", "BB"], interval="1m", period="1d")))
+
+        self.assertEqual(result["results"], [{"symbol": "AAA", "price": 5.0}, {"symbol": "BB", "price": None}])
+
+    def test_portfolios_share_per_symbol_entries(self):
+        with mock.patch.object(app, "_download_intraday", side_effect=self._frames) as download:
+            first = asyncio.run(app.quotes(app.QuotesRequest(tickers=["AAA", "BB"])))
+            second = asyncio.run(app.quotes(app.QuotesRequest(tickers=["bb", "C", "AAA"])))
+            third = asyncio.run(app.quotes(app.QuotesRequest(tickers=["C", "AAA"])))
+
+        self.assertEqual([call.args[0] for call in download.call_args_list], [["AAA", "BB"], ["C"]])
+        self.assertEqual(first["results"], [{"symbol": "AAA", "price": 3.0}, {"symbol": "BB", "price": 2.0}])
+        self.assertEqual([row["symbol"] for row in second["results"]], ["BB", "C", "AAA"])
+        self.assertEqual(second["cache"]["source"], "yfinance")
+        self.assertEqual(third["cache"]["source"], "cache")
+        self.assertEqual(third["results"], [{"symbol": "C", "price": 1.0}, {"symbol": "AAA", "price": 3.0}])
+
+    def test_snapshot_prices_skip_the_bar_download(self):
+        tz = ZoneInfo("America/New_York")
+        idx = pd.DatetimeIndex([datetime(2024, 1, 2, 10, 0, tzinfo=tz), datetime(2024, 1, 2, 10, 1, tzinfo=tz)])
+        with tempfile.TemporaryDirectory() as root:
+            store = app.BarStore(root)
+            store.append("AAA", "1m", False, pd.DataFrame({"Close": [7.0, 7.5]}, index=idx))
+            store.append("OLD", "1m", False, pd.DataFrame({"Close": [1.0, 1.0]}, index=idx), stored_at=1)
+            self.cache.store[app._superset_universe_key()] = json.dumps([{"ticker": "BB", "last": 4.25}])
+            with mock.patch.object(app, "bar_store", store), mock.patch.object(
+                app, "_download_intraday", side_effect=self._frames
+            ) as download:
+                result = asyncio.run(app.quotes(app.QuotesRequest(tickers=["AAA", "BB", "OLD"], period="5d")))
+
+        download.assert_called_once()
+        self.assertEqual(download.call_args.args[0], ["OLD"])
+        self.assertEqual(download.call_args.kwargs["period"], "1d")
+        self.assertEqual([row["price"] for row in result["results"]], [7.5, 4.25, 3.0])
+        self.assertIsNotNone(app._read_scan_cache_entry(app._quote_cache_key("BB", "1m", "5d", False))[0])
+
+    def test_stale_symbols_are_served_and_refreshed_together(self):
+        stale_info = {
+            "isStale": True,
+            "source": "cache",
+            "fetchedAt": "2024-01-02T15:00:00Z",
+            "freshUntil": "2024-01-02T15:05:00Z",
+            "staleUntil": "2999-01-03T15:00:00Z",
+            "willRevalidate": True,
+            "retryAfterMs": 1000,
+        }
+        stale_key = app._quote_cache_key("AAA", "1m", "1d", False)
+        real_decode = app._decode_scan_cache_entry
+
+        def decode(key, raw):
+            if key == stale_key:
+                return {"symbol": "AAA", "price": 1.5}, stale_info
+            return real_decode(key, raw)
+
+        with mock.patch.object(app, "_download_intraday", side_effect=self._frames), mock.patch.object(
+            app, "_decode_scan_cache_entry", side_effect=decode
+        ), mock.patch.object(app, "_schedule_quotes_revalidate") as revalidate:
+            asyncio.run(app.quotes(app.QuotesRequest(tickers=["BB"])))
+            self.cache.store[stale_key] = "{}"
+            result = asyncio.run(app.quotes(app.QuotesRequest(tickers=["AAA", "BB"])))
+
+        revalidate.assert_called_once_with(["AAA"], "1m", "1d", False)
+        self.assertEqual(result["results"][0], {"symbol": "AAA", "price": 1.5})
+        self.assertTrue(result["cache"]["isStale"])
+        self.assertEqual(result["cache"]["fetchedAt"], "2024-01-02T15:00:00Z")
+
+
+class TestScannerWarmer(unittest.TestCase):
+    def _et(self, *args):
+        return datetime(*args, tzinfo=ZoneInfo("America/New_York"))
+
+    def test_market_session_boundaries(self):
+        # 2024-03-04 is a Monday, 2024-03-09 a Saturday.
+        self.assertEqual(app._market_session(self._et(2024, 3, 4, 3, 59)), None)
+        self.assertEqual(app._market_session(self._et(2024, 3, 4, 4, 0)), "pre")
+        self.assertEqual(app._market_session(self._et(2024, 3, 4, 9, 30)), "regular")
+        self.assertEqual(app._market_session(self._et(2024, 3, 4, 16, 0)), "post")
+        self.assertEqual(app._market_session(self._et(2024, 3, 4, 20, 0)), None)
+        self.assertEqual(app._market_session(self._et(2024, 3, 9, 10, 0)), None)
+
+    def test_delay_backs_off_outside_sessions_until_pre_market(self):
+        with mock.patch.object(app, "SCANNER_WARMER_INTERVAL_SECONDS", 60), mock.patch.object(
+            app, "SCANNER_WARMER_IDLE_SECONDS", 7 * 86400
+        ):
+            self.assertEqual(app._warmer_delay_seconds(self._et(2024, 3, 4, 10, 0)), 60)
+            self.assertEqual(app._warmer_delay_seconds(self._et(2024, 3, 4, 3, 0)), 3600)
+            # Friday night sleeps through the weekend to Monday 04:00 ET.
+            self.assertEqual(app._warmer_delay_seconds(self._et(2024, 3, 8, 20, 0)), 56 * 3600)
+        with mock.patch.object(app, "SCANNER_WARMER_IDLE_SECONDS", 900):
+            self.assertEqual(app._warmer_delay_seconds(self._et(2024, 3, 8, 20, 0)), 900)
+
+    def test_warm_cycle_refreshes_features_once_per_key(self):
+        written = {}
+        scanners = {
+            name: (model, cache_key_fn, mock.Mock(return_value={"scanner": name, "results": []}))
+            for name, (model, cache_key_fn, _) in app._SCANNERS.items()
+        }
+        with mock.patch.dict(app._SCANNERS, scanners), mock.patch.object(
+            app, "_read_scan_cache_entry", return_value=(None, None)
+        ), mock.patch.object(
+            app, "_write_scan_cache_entry", side_effect=lambda key, payload: written.__setitem__(key, payload)
+        ), mock.patch.object(
+            app, "_get_features_cached"
+        ) as get_features:
+            result = app._warm_scanners_once(60)
+
+        self.assertEqual(len(result["warmed"]), 6)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(len(written), 6)
+        # Day gainers use minChangePct=0, but every profile filters the same superset features.
+        self.assertEqual(get_features.call_count, 1)
+        for call in get_features.call_args_list:
+            self.assertTrue(call.kwargs["refresh"])
+        for name in app._COMBINED_SCANNERS:
+            self.assertTrue(scanners[name][2].call_args.kwargs["refresh"])
+
+    def test_warm_cycle_skips_entries_fresh_past_the_horizon(self):
+        cache_info = {"isStale": False, "freshUntil": "2999-01-01T00:00:00Z"}
+        profiles = '[{"scanner": "hod-breakouts"}, {"bogus": 1}]'
+        with mock.patch.object(app, "SCANNER_WARMER_PROFILES", profiles), mock.patch.object(
+            app, "_read_scan_cache_entry", return_value=({}, cache_info)
+        ), mock.patch.object(app, "_get_features_cached") as get_features:
+            result = app._warm_scanners_once(60)
+
+        self.assertEqual(result, {"warmed": [], "skipped": ["hod-breakouts"], "errors": []})
+        get_features.assert_not_called()
+
+    def test_tick_skips_when_another_worker_holds_the_lease(self):
+        with mock.patch.object(app, "acquire_lease", return_value=None), mock.patch.object(
+            app, "_warm_scanners_once"
+        ) as warm:
+            self.assertIsNone(app._run_warmer_tick())
+        warm.assert_not_called()
+
+
+class _BatchCache(_CountingCache):
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+
+class TestScanBatch(unittest.TestCase):
+    def setUp(self):
+        self.cache = _BatchCache()
+        self.features = {
+            "asOf": "2024-01-02T15:00:00Z",
+            "features": [
+                {"ticker": "AAA", "price": 10.0, "prevClose": 8.0, "hod": 10.0, "lod": 8.0, "rangePct": 0.25,
+                 "relVol": 3.0, "todayVolume": 500_000, "vwap": 9.5, "lastRegHigh": 10.0, "closeSlopeN": 0.1},
+            ],
+        }
+        self.patches = [
+            mock.patch.object(app, "cache_client", self.cache),
+            mock.patch.object(app, "async_cache_client", None),
+            mock.patch.object(app, "local_cache", app.LocalCache(max_entries=64, max_bytes=1_000_000)),
+            mock.patch.object(app, "SINGLE_FLIGHT_DISTRIBUTED", False),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+
+    def test_batch_reads_once_and_shares_the_features_load(self):
+        cached_key = app._day_gainers_cache_key(app.DayGainersRequest())
+        app._write_scan_cache_entry(cached_key, {"scanner": "day_gainers", "sorted_by": "", "results": []})
+        app.local_cache.clear()
+        request = app.ScanBatchRequest(
+            scans=[
+                {"scanner": "day-gainers"},
+                {"scanner": "hod-breakouts", "id": "hod"},
+                {"scanner": "volume-spikes", "params": {"minChangePct": 3.0}},
+                {"scanner": "nope"},
+                {"scanner": "day-gainers", "params": {"interval": "7m"}},
+                {"scanner": "day-gainers", "params": {"minTodayVolume": "lots"}},
+            ]
+        )
+
+        items = [{"ticker": "AAA", "last": 10.0, "changePct": 0.25, "avgDailyVol10d": 2_000_000}]
+        with mock.patch.object(app, "_compute_features", return_value=self.features) as compute_features, mock.patch.object(
+            app, "_load_superset_universe", return_value=items
+        ):
+            response = asyncio.run(app.scan_batch(request))
+
+        results = response["results"]
+        self.assertEqual([r["status"] for r in results], [200, 200, 200, 400, 400, 422])
+        self.assertEqual(results[0]["data"]["cache"]["source"], "cache")
+        self.assertEqual(results[1]["id"], "hod")
+        self.assertEqual(results[1]["data"]["cache"]["source"], "yfinance")
+        self.assertEqual([row["symbol"] for row in results[1]["data"]["results"]], ["AAA"])
+        self.assertEqual(results[2]["data"]["results"][0]["relative_volume"], 3.0)
+        self.assertEqual(self.cache.mget_calls, 1)
+        compute_features.assert_called_once()
+
+    def test_rejects_oversized_batches(self):
+        request = app.ScanBatchRequest(scans=[{"scanner": "day-gainers"}] * 3)
+        with mock.patch.object(app, "SCAN_BATCH_MAX_SCANS", 2):
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(app.scan_batch(request))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class TestScanStream(unittest.TestCase):
+    def test_diff_lists_changed_rows_removals_and_order(self):
+        before = {"asOf": "t1", "results": [{"symbol": "AAA", "price": 1.0}, {"symbol": "BBB", "price": 2.0}]}
+        after = {"asOf": "t2", "results": [{"symbol": "CCC", "price": 3.0}, {"symbol": "AAA", "price": 1.0}]}
+
+        diff = app._scan_results_diff(before, after)
+        self.assertEqual(diff["upserts"], [{"symbol": "CCC", "price": 3.0}])
+        self.assertEqual(diff["removed"], ["BBB"])
+        self.assertEqual(diff["order"], ["CCC", "AAA"])
+        self.assertIsNone(app._scan_results_diff(after, dict(after)))
+
+    def test_identical_specs_share_one_poller(self):
+        payloads = [
+            {"scanner": "day_gainers", "asOf": "t1", "sorted_by": "", "results": [{"symbol": "AAA", "price": 1.0}]},
+            {"scanner": "day_gainers", "asOf": "t1", "sorted_by": "", "results": [{"symbol": "AAA", "price": 1.0}]},
+            {"scanner": "day_gainers", "asOf": "t2", "sorted_by": "", "results": [{"symbol": "AAA", "price": 1.5}]},
+        ]
+        calls = []
+
+        async def serve(cache_key, compute_fn):
+            calls.append(cache_key)
+            return payloads[min(len(calls), len(payloads)) - 1]
+
+        async def scenario():
+            first, queue_a = app._subscribe_scan_feed("day-gainers", app.DayGainersRequest())
+            second, queue_b = app._subscribe_scan_feed("day-gainers", app.DayGainersRequest(minChangePct=3.0))
+            self.assertIs(first, second)
+            events = [[await queue.get() for _ in range(2)] for queue in (queue_a, queue_b)]
+            app._unsubscribe_scan_feed(first, queue_a)
+            app._unsubscribe_scan_feed(first, queue_b)
+            self.assertEqual(app._scan_feeds, {})
+            return events
+
+        with mock.patch.object(app, "_serve_scan_cached_async", side_effect=serve), mock.patch.object(
+            app, "SCAN_STREAM_POLL_SECONDS", 0.001
+        ):
+            events = asyncio.run(scenario())
+
+        self.assertEqual(events[0], events[1])
+        self.assertTrue(events[0][0].startswith("event: snapshot\n"))
+        self.assertTrue(events[0][1].startswith("event: diff\n"))
+        self.assertIn('"price":1.5', events[0][1])
+        self.assertEqual(len(set(calls)), 1)
+        self.assertLessEqual(len(calls), 4)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import base64
+import json
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+import bars  # noqa: E402
+
+
+def _frame(tz="America/New_York") -> pd.DataFrame:
+    index = pd.date_range("2024-03-08 09:30", periods=5, freq="1min", tz=tz)
+    return pd.DataFrame(
+        {
+            "Open": [1.0, 1.1, np.nan, 1.3, 1.4],
+            "High": [1.2, 1.2, 1.3, 1.4, 1.5],
+            "Low": [0.9, 1.0, 1.1, 1.2, 1.3],
+            "Close": [1.1, 1.15, 1.25, 1.35, 1.45],
+            "Adj Close": [1.1, 1.15, 1.25, 1.35, 1.45],
+            "Volume": [100, 200, 0, 400, 500],
+        },
+        index=index,
+    )
+
+
+class TestBinaryBarCodec(unittest.TestCase):
+    def test_round_trip_preserves_values_dtypes_and_timezone(self):
+        for tz in ("America/New_York", None):
+            for compress in (True, False):
+                df = _frame(tz)
+                encoded = bars.encode_frame(df, compress=compress)
+                self.assertTrue(encoded.startswith(bars.BINARY_PREFIX))
+                decoded = bars.decode_frame(encoded)
+                pd.testing.assert_frame_equal(decoded, df, check_freq=False, check_index_type=False)
+                self.assertTrue(decoded.index.equals(df.index))
+
+    def test_attrs_round_trip_and_plain_frames_stay_v1(self):
+        df = _frame()
+        self.assertEqual(bars.decode_frame(bars.encode_frame(df)).attrs, {})
+        header = base64.b64decode(bars.encode_frame(df)[len(bars.BINARY_PREFIX) :])
+        self.assertEqual(header[0], 1)
+
+        df.attrs = {"storedAt": 1709908200}
+        decoded = bars.decode_frame(bars.encode_frame(df))
+        self.assertEqual(decoded.attrs, {"storedAt": 1709908200})
+        legacy = json.dumps({"columns": [], "index": [], "data": [], "attrs": df.attrs})
+        self.assertEqual(app._decode_bars_cache(legacy).attrs, df.attrs)
+
+    def test_unsupported_frames_are_not_encoded(self):
+        df = _frame()
+        df["Name"] = "x"
+        self.assertIsNone(bars.encode_frame(df))
+        self.assertIsNone(bars.encode_frame(df.reset_index(drop=True)))
+
+    def test_corrupt_or_foreign_payloads_decode_to_none(self):
+        self.assertIsNone(bars.decode_frame("{}"))
+        self.assertIsNone(bars.decode_frame(bars.BINARY_PREFIX + "not-base64!"))
+        self.assertIsNone(bars.decode_frame(bars.BINARY_PREFIX + "AAAA"))
+
+
+class TestBarsCacheEntries(unittest.TestCase):
+    def test_decode_reads_binary_and_legacy_json(self):
+        df = _frame()
+        binary = app._decode_bars_cache(bars.encode_frame(df))
+        self.assertEqual(binary["Close"].tolist(), df["Close"].tolist())
+
+        legacy = json.dumps(
+            {
+                "columns": list(df.columns),
+                "index": [ts.isoformat() for ts in df.index],
+                "data": df.values.tolist(),
+            }
+        )
+        decoded = app._decode_bars_cache(legacy)
+        self.assertEqual(decoded["Volume"].tolist(), df["Volume"].tolist())
+        self.assertTrue((decoded.index == df.index).all())
+
+    def test_json_format_remains_available(self):
+        original = app.BARS_CACHE_FORMAT
+        app.BARS_CACHE_FORMAT = "json"
+        try:
+            encoded = app._encode_bars_cache(_frame())
+        finally:
+            app.BARS_CACHE_FORMAT = original
+        self.assertEqual(json.loads(encoded)["columns"][0], "Open")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from barstore import BarStore  # noqa: E402
+
+
+def _frame(start: str, periods: int, close0: float = 1.0) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="1min", tz="America/New_York")
+    close = close0 + np.arange(periods, dtype=np.float64)
+    return pd.DataFrame({"Close": close, "Volume": np.arange(periods, dtype=np.int64) * 10}, index=index)
+
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = BarStore(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_keeps_values_dtypes_timezone_and_stored_at(self):
+        df = _frame("2024-03-08 09:30", 5)
+        self.assertEqual(self.store.append("AAA", "1m", False, df, stored_at=123), 5)
+
+        stored = self.store.read("AAA", "1m", False)
+        pd.testing.assert_frame_equal(stored, df, check_freq=False, check_index_type=False)
+        self.assertEqual(stored.attrs["storedAt"], 123)
+        self.assertIsNone(self.store.read("AAA", "1m", True))
+        self.assertIsNone(self.store.read("BBB", "1m", False))
+
+    def test_appends_keep_the_newest_copy_of_the_forming_bar(self):
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 09:30", 3))
+        # The 09:32 bar was still forming; the tail repeats it with final values.
+        self.assertEqual(self.store.append("AAA", "1m", False, _frame("2024-03-08 09:31", 3, close0=10.0)), 2)
+
+        stored = self.store.read("AAA", "1m", False)
+        self.assertEqual(stored["Close"].tolist(), [1.0, 2.0, 11.0, 12.0])
+        self.assertTrue(stored.index.is_unique)
+
+    def test_append_overwrites_bytes_left_by_a_torn_append(self):
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 09:30", 2))
+        # An append that died after writing the timestamps and one column, before updating meta.
+        series_dir = next(root for root, _, files in os.walk(self._tmp.name) if "meta.json" in files)
+        for name in ("0.ts.i8", "0.c0.f8"):
+            with open(os.path.join(series_dir, name), "ab") as handle:
+                handle.write(b"\xff" * 12)
+
+        self.assertEqual(self.store.append("AAA", "1m", False, _frame("2024-03-08 09:32", 2, close0=10.0)), 2)
+        stored = self.store.read("AAA", "1m", False)
+        self.assertEqual(stored["Close"].tolist(), [1.0, 2.0, 10.0, 11.0])
+        self.assertEqual(stored["Volume"].tolist(), [0, 10, 0, 10])
+        self.assertEqual(list(stored.index), list(_frame("2024-03-08 09:30", 4).index))
+
+    def test_older_bars_and_new_columns_rewrite_the_series(self):
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 10:00", 2, close0=5.0))
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 09:58", 2))
+        self.assertEqual(self.store.read("AAA", "1m", False)["Close"].tolist(), [1.0, 2.0, 5.0, 6.0])
+
+        wider = _frame("2024-03-08 10:02", 1, close0=7.0)
+        wider["Open"] = 6.5
+        self.store.append("AAA", "1m", False, wider)
+        stored = self.store.read("AAA", "1m", False)
+        self.assertEqual(stored["Close"].tolist(), [1.0, 2.0, 5.0, 6.0, 7.0])
+        self.assertEqual(stored["Open"].isna().sum(), 4)
+
+    def test_compaction_drops_duplicates_old_bars_and_old_generation_files(self):
+        self.store.append("AAA", "1m", False, _frame("2024-03-07 09:30", 2))
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 09:30", 3))
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 09:32", 2, close0=9.0))
+        before = self.store.read("AAA", "1m", False)
+
+        cutoff = pd.Timestamp("2024-03-08", tz="America/New_York")
+        self.assertTrue(self.store.compact("AAA", "1m", False, keep_after=cutoff))
+        self.assertFalse(self.store.compact("AAA", "1m", False, keep_after=cutoff))
+
+        stored = self.store.read("AAA", "1m", False)
+        pd.testing.assert_frame_equal(stored, before[before.index >= cutoff], check_freq=False, check_index_type=False)
+        path = self.store._series_dir("AAA", "1m", False)
+        self.assertEqual(sorted(name for name in os.listdir(path) if name[0].isdigit()), ["1.c0.f8", "1.c1.i8", "1.ts.i8"])
+
+    def test_last_reads_the_newest_copy_and_skips_missing_values(self):
+        self.assertIsNone(self.store.last("AAA", "1m", False))
+        self.store.append("AAA", "1m", False, _frame("2024-03-08 09:30", 3), stored_at=100)
+        tail = _frame("2024-03-08 09:32", 2, close0=9.0)
+        self.store.append("AAA", "1m", False, tail, stored_at=200)
+
+        last = self.store.last("AAA", "1m", False)
+        self.assertEqual(last, {"ts": tail.index[-1].value, "value": 10.0, "storedAt": 200})
+
+        gap = _frame("2024-03-08 09:34", 1)
+        gap["Close"] = np.nan
+        self.store.append("AAA", "1m", False, gap)
+        self.assertEqual(self.store.last("AAA", "1m", False)["value"], 10.0)
+        self.assertIsNone(self.store.last("AAA", "1m", False, column="Open"))
+
+    def test_ticker_names_cannot_leave_the_store(self):
+        self.store.append("../../etc", "1m", False, _frame("2024-03-08 09:30", 1))
+        self.store.append("BRK.B", "1m", False, _frame("2024-03-08 09:30", 1))
+
+        self.assertEqual(sorted(t for t, _, _ in self.store.series()), ["BRK.B", "_.._.._etc"])
+        self.assertIsNotNone(self.store.read("../../etc", "1m", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
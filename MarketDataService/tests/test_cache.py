@@ -1,10 +1,59 @@
 import os
+import threading
+import time
 import unittest
 from unittest import mock
 
 import redis
 
-from cache import create_cache_client
+from cache import (
+    LocalCache,
+    SingleFlight,
+    acquire_lease,
+    create_async_cache_client,
+    create_cache_client,
+    mget,
+    release_lease,
+    setex_many,
+)
+
+
+class _RecordingPipeline:
+    def __init__(self, client):
+        self._client = client
+        self._queued = []
+
+    def setex(self, key, ttl, value):
+        self._queued.append((key, ttl, value))
+
+    def execute(self):
+        self._client.calls.append(("pipeline", len(self._queued)))
+        for key, _, value in self._queued:
+            self._client.store[key] = value
+
+
+class _BulkClient:
+    def __init__(self):
+        self.store = {}
+        self.calls = []
+
+    def mget(self, *keys):
+        self.calls.append(("mget", len(keys)))
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return _RecordingPipeline(self)
+
+
+class _PlainClient:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
 
 
 class TestCreateCacheClient(unittest.TestCase):
@@ -38,3 +87,167 @@ class TestCreateCacheClient(unittest.TestCase):
 
         self.assertIsInstance(client, redis.Redis)
 
+    def test_async_client_follows_the_same_configuration(self):
+        from redis import asyncio as redis_asyncio
+        from upstash_redis.asyncio import Redis as AsyncUpstashRedis
+
+        with mock.patch.dict(
+            os.environ,
+            {"UPSTASH_REDIS_REST_URL": "https://example.upstash.io", "UPSTASH_REDIS_REST_TOKEN": "token"},
+            clear=False,
+        ):
+            self.assertIsInstance(create_async_cache_client(), AsyncUpstashRedis)
+        with mock.patch.dict(
+            os.environ,
+            {"UPSTASH_REDIS_REST_URL": "", "UPSTASH_REDIS_REST_TOKEN": "", "REDIS_URL": "redis://localhost:6379/0"},
+            clear=False,
+        ):
+            self.assertIsInstance(create_async_cache_client(), redis_asyncio.Redis)
+
+
+class TestBulkHelpers(unittest.TestCase):
+    def test_mget_batches_round_trips(self):
+        client = _BulkClient()
+        client.store = {"a": "1", "c": "3"}
+        self.assertEqual(mget(client, ["a", "b", "c"], batch_size=2), ["1", None, "3"])
+        self.assertEqual(client.calls, [("mget", 2), ("mget", 1)])
+
+    def test_setex_many_uses_pipeline(self):
+        client = _BulkClient()
+        setex_many(client, [("a", 10, "1"), ("b", 0, "2"), ("c", 10, "3")], batch_size=2)
+        self.assertEqual(client.store, {"a": "1", "b": "2", "c": "3"})
+        self.assertEqual(client.calls, [("pipeline", 2), ("pipeline", 1)])
+
+    def test_helpers_fall_back_to_single_key_commands(self):
+        client = _PlainClient()
+        setex_many(client, [("a", 10, "1")])
+        self.assertEqual(mget(client, ["a", "b"]), ["1", None])
+
+    def test_mget_treats_errors_as_misses(self):
+        client = _BulkClient()
+        client.mget = mock.Mock(side_effect=ConnectionError("down"))
+        self.assertEqual(mget(client, ["a", "b"]), [None, None])
+
+
+class TestLocalCache(unittest.TestCase):
+    def test_evicts_least_recently_used_by_entry_count(self):
+        local = LocalCache(max_entries=2, max_bytes=1000)
+        local.set("a", 1, 60, 1)
+        local.set("b", 2, 60, 1)
+        local.get("a")
+        local.set("c", 3, 60, 1)
+        self.assertEqual(local.get("a"), 1)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.stats()["evictions"], 1)
+
+    def test_evicts_by_byte_budget_and_skips_oversized_values(self):
+        local = LocalCache(max_entries=10, max_bytes=10)
+        local.set("a", "x", 60, 6)
+        local.set("b", "y", 60, 6)
+        self.assertIsNone(local.get("a"))
+        local.set("huge", "z", 60, 11)
+        self.assertIsNone(local.get("huge"))
+        self.assertEqual(local.stats()["bytes"], 6)
+
+    def test_expired_entries_are_misses(self):
+        local = LocalCache(max_entries=10, max_bytes=100)
+        with mock.patch("cache.time.monotonic", return_value=100.0):
+            local.set("a", 1, 5, 1)
+        with mock.patch("cache.time.monotonic", return_value=104.0):
+            self.assertEqual(local.get("a"), 1)
+        with mock.patch("cache.time.monotonic", return_value=106.0):
+            self.assertIsNone(local.get("a"))
+        stats = local.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 1, 1))
+
+    def test_disabled_cache_stores_nothing(self):
+        local = LocalCache(max_entries=0, max_bytes=100)
+        local.set("a", 1, 60, 1)
+        self.assertIsNone(local.get("a"))
+        self.assertFalse(local.stats()["enabled"])
+
+
+class _LeaseClient:
+    def __init__(self):
+        self.store = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return {"value": 1}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("k", compute))) for _ in range(5)]
+        threads[0].start()
+        started.wait(1)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertFalse(flights.inflight("k"))
+
+    def test_errors_propagate_and_do_not_stick(self):
+        flights = SingleFlight()
+        with self.assertRaises(ValueError):
+            flights.do("k", mock.Mock(side_effect=ValueError("boom")))
+        self.assertEqual(flights.do("k", lambda: 2), 2)
+
+
+class TestLeases(unittest.TestCase):
+    def test_lease_is_exclusive_until_released_by_owner(self):
+        client = _LeaseClient()
+        token = acquire_lease(client, "lease", 30)
+        self.assertIsNotNone(token)
+        self.assertIsNone(acquire_lease(client, "lease", 30))
+
+        release_lease(client, "lease", "someone-else")
+        self.assertIsNone(acquire_lease(client, "lease", 30))
+
+        release_lease(client, "lease", token)
+        self.assertIsNotNone(acquire_lease(client, "lease", 30))
+
+    def test_release_is_a_single_compare_and_delete_script(self):
+        client = mock.Mock()
+        release_lease(client, "lease", "token")
+        client.eval.assert_called_once()
+        script, numkeys, key, token = client.eval.call_args.args
+        self.assertIn("DEL", script)
+        self.assertEqual((numkeys, key, token), (1, "lease", "token"))
+        client.get.assert_not_called()
+        client.delete.assert_not_called()
+
+        from upstash_redis import Redis as UpstashRedis
+
+        upstash = UpstashRedis(url="https://example.invalid", token="t")
+        with mock.patch.object(upstash, "eval") as upstash_eval:
+            release_lease(upstash, "lease", "token")
+        self.assertEqual(upstash_eval.call_args.kwargs, {"keys": ["lease"], "args": ["token"]})
+
+    def test_unreachable_cache_grants_the_lease(self):
+        client = mock.Mock()
+        client.set.side_effect = ConnectionError("down")
+        self.assertIsNotNone(acquire_lease(client, "lease", 30))
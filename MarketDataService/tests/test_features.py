@@ -0,0 +1,143 @@
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+import features  # noqa: E402
+
+
+def _synthetic_frame(seed: int, days: int = 3, tz: str = "America/New_York", with_gaps: bool = True) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    stamps = []
+    for day in pd.bdate_range("2024-03-06", periods=days):
+        start = pd.Timestamp(day.date()).tz_localize("America/New_York") + pd.Timedelta(hours=4)
+        stamps.append(pd.date_range(start, periods=16 * 60, freq="1min"))
+    index = stamps[0].append(stamps[1:]) if len(stamps) > 1 else stamps[0]
+    if with_gaps:
+        index = index[rng.random(len(index)) > 0.2]
+    index = index.tz_convert(tz) if tz else index.tz_convert("UTC").tz_localize(None)
+
+    close = 10 + np.cumsum(rng.normal(0, 0.05, len(index)))
+    high = close + rng.random(len(index)) * 0.1
+    low = close - rng.random(len(index)) * 0.1
+    volume = rng.integers(0, 50_000, len(index)).astype(float)
+    for col in (close, high, low, volume):
+        col[rng.random(len(index)) < 0.03] = np.nan
+    return pd.DataFrame(
+        {"Open": close, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b and type(a) is type(b)
+
+
+class TestVectorizedFeatures(unittest.TestCase):
+    def setUp(self):
+        self.tickers = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+        self.frames = {
+            "AAA": _synthetic_frame(1),
+            "BBB": _synthetic_frame(2, days=1),
+            "CCC": _synthetic_frame(3, tz=None),
+            "DDD": _synthetic_frame(4, tz="UTC"),
+            "EEE": _synthetic_frame(5).between_time("04:00", "09:00"),
+            "FFF": pd.DataFrame(),
+        }
+
+    def assertSameDict(self, expected: dict, actual: dict):
+        self.assertEqual(set(expected), set(actual))
+        for key, value in expected.items():
+            self.assertTrue(_same(value, actual[key]), f"{key}: {value!r} != {actual[key]!r}")
+
+    def test_session_stats_match_per_frame_helpers(self):
+        for slope_n in (6, 2):
+            stack = features.stack_frames(self.frames, self.tickers, app.ET_TZ)
+            stats = features.session_stats(stack, slope_n)
+            for ticker in self.tickers:
+                expected = app._session_stats_from_frame(self.frames.get(ticker), slope_n)
+                if expected is None:
+                    self.assertNotIn(ticker, stats)
+                    continue
+                self.assertSameDict(expected, stats[ticker])
+
+    def test_rvol_matches_per_frame_computation(self):
+        stack = features.stack_frames(self.frames, self.tickers, app.ET_TZ)
+        for include_today in (True, False):
+            for exclude_last_k in (True, False):
+                for baseline_days in (1, 2, 5):
+                    results = features.rvol_recent_k_1m(stack, baseline_days, 5, include_today, exclude_last_k)
+                    for ticker in stack.tickers:
+                        expected = app._compute_rvol_recent_k_1m(
+                            self.frames[ticker],
+                            baseline_days=baseline_days,
+                            k_bars=5,
+                            include_today=include_today,
+                            exclude_last_k_from_today=exclude_last_k,
+                        )
+                        self.assertSameDict(expected, results[ticker])
+
+    def test_rvol_from_baselines_matches_full_history(self):
+        history = features.stack_frames(self.frames, self.tickers, app.ET_TZ)
+        today_frames = {t: app._df_to_et_latest_session(df) for t, df in self.frames.items() if not df.empty}
+        today = features.stack_frames(today_frames, self.tickers, app.ET_TZ)
+        for include_today in (True, False):
+            for exclude_last_k in (True, False):
+                for baseline_days in (1, 2, 5):
+                    baselines = features.rvol_baselines(history, baseline_days)
+                    expected = features.rvol_recent_k_1m(history, baseline_days, 5, include_today, exclude_last_k)
+                    results = features.rvol_from_baselines(today, baselines, 5, include_today, exclude_last_k)
+                    # EEE has no regular bars, so there is nothing to build a baseline for.
+                    self.assertEqual(sorted(results), ["AAA", "BBB", "CCC", "DDD"])
+                    for ticker, fields in results.items():
+                        for key, value in expected[ticker].items():
+                            if isinstance(value, float):
+                                self.assertAlmostEqual(value, fields[key], delta=1e-9 * max(1.0, abs(value)))
+                            else:
+                                self.assertEqual(value, fields[key])
+
+    def test_session_index_segments_match_between_time(self):
+        bounds = (
+            ("04:00", "09:29", features.PRE_START_NS, features.PRE_END_NS),
+            ("09:30", "16:00", features.REG_START_NS, features.REG_END_NS),
+            ("16:00", "20:00", features.POST_START_NS, features.POST_END_NS),
+        )
+        for ticker in ("AAA", "CCC", "DDD", "EEE"):
+            df = self.frames[ticker]
+            sessions = features.session_index(df, app.ET_TZ)
+            self.assertIs(features.session_index(df, app.ET_TZ), sessions)
+            et = app._df_to_et(df)
+            days = sorted(set(et.index.date))
+            self.assertEqual(sessions.days, len(days))
+            for i, day in enumerate(days):
+                start, end = sessions.day(i)
+                self.assertTrue((et.index[start:end].date == day).all())
+                for first, last, start_ns, end_ns in bounds:
+                    expected = et.loc[et.index.date == day].between_time(first, last, inclusive="both")
+                    start, end = sessions.segment(i, start_ns, end_ns)
+                    self.assertTrue(expected.index.equals(et.index[start:end]), f"{ticker} {day} {first}")
+
+    def test_baselines_for_another_session_are_not_used(self):
+        history = features.stack_frames(self.frames, ["AAA"], app.ET_TZ)
+        baselines = features.rvol_baselines(history, 1)
+        baselines["AAA"]["day"] -= 1
+        self.assertEqual(features.rvol_from_baselines(history, baselines, 5, True, True), {})
+
+    def test_universe_bar_stats_falls_back_for_unstackable_frames(self):
+        stats, rel_vol = app._universe_bar_stats(self.tickers + ["ZZZ"], self.frames, self.frames, 6)
+        self.assertIsNone(stats["FFF"])
+        self.assertIsNone(stats["ZZZ"])
+        self.assertIsNone(rel_vol["ZZZ"]["relVol"])
+        self.assertIsNotNone(stats["AAA"])
+
+
+if __name__ == "__main__":
+    unittest.main()
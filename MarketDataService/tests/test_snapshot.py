@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+from snapshot import FeatureSnapshot, or_default, py_max, py_min, sort_indices  # noqa: E402
+
+
+def _value(rng: random.Random, choices):
+    roll = rng.random()
+    if roll < 0.08:
+        return None
+    if roll < 0.11:
+        return math.nan
+    if roll < 0.15:
+        return 0
+    if roll < 0.17:
+        return "bad"
+    return rng.choice(choices)
+
+
+def _random_features(seed: int, rows: int = 400, nan: bool = True) -> dict:
+    """Random features with missing, zero, bad and (optionally) NaN values and many ties."""
+    rng = random.Random(seed)
+    features = []
+    for i in range(rows):
+        draw = (lambda choices: _value(rng, choices)) if nan else (
+            lambda choices: None if rng.random() < 0.08 else rng.choice(choices)
+        )
+        price = draw([1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 80.0])
+        features.append(
+            {
+                "ticker": None if rng.random() < 0.02 else f"T{i}",
+                "exchange": "NMS",
+                "price": price,
+                "prevClose": draw([1.0, 2.0, 4.5, 9.0, 19.0, 40.0]),
+                "hod": draw([2.5, 5.0, 10.0, 10.05, 20.0, 46.0]),
+                "lod": draw([0.5, 1.0, 4.0]),
+                "rangePct": draw([0.02, 0.08, 0.12, 0.3]),
+                "posInRange": draw([0.3, 0.6, 0.9, 0.99, 1.0]),
+                "distToHod": draw([0.0, 0.002, 0.005, 0.01, 0.03]),
+                "vwap": draw([2.0, 4.9, 10.0, 19.5, 44.0]),
+                "absVwapDistance": draw([0.001, 0.004, 0.01, 0.05]),
+                "lastRegHigh": draw([2.5, 5.0, 10.0, 20.0, 46.0]),
+                "relVol": draw([0.5, 1.2, 1.5, 2.0, 3.0, 8.0]),
+                "relVolTod": draw([1.0, 2.0]),
+                "closeSlopeN": draw([-0.1, 0.0, 0.05, 0.2]),
+                "atr": draw([0.01, 0.1, 0.5]),
+                "todayVolume": rng.choice([None, 0, 100_000, 250_000, 1_000_000, "7"]),
+                "avgVolume20d": draw([1e6, 2e6]),
+                "barIndex": rng.choice([None, 3, 12]),
+                "barTime": "2026-01-02T15:00:00Z",
+            }
+        )
+    return {"asOf": "2026-01-02T15:00:00Z", "features": features}
+
+
+def _dump(rows) -> str:
+    return json.dumps(rows, sort_keys=True)
+
+
+class TestSnapshotHelpers(unittest.TestCase):
+    def test_columns_track_missing_values(self):
+        snap = FeatureSnapshot(
+            {"features": [{"ticker": "A", "x": 1.5}, {"ticker": "B", "x": None}, {"ticker": "", "x": 2}, {"ticker": "C", "x": "bad"}]}
+        )
+        self.assertEqual(len(snap), 3)
+        np.testing.assert_array_equal(snap.nulls("x"), [False, True, True])
+        self.assertEqual(snap.floats("x")[0], 1.5)
+        np.testing.assert_array_equal(snap.ints("x"), [1, 0, 0])
+
+    def test_or_default_and_python_min_max(self):
+        values = np.array([0.0, np.nan, 2.0, 5.0])
+        nulls = np.array([False, False, False, True])
+        np.testing.assert_array_equal(or_default(values, nulls, 1.0), [1.0, np.nan, 2.0, 1.0])
+        self.assertEqual(py_max(0.01, py_min(np.array([np.nan]), 0.05))[0], max(0.01, min(math.nan, 0.05)))
+
+    def test_sort_indices_is_stable_and_defers_on_nan(self):
+        indices = np.arange(4)
+        keys = (np.array([1.0, 2.0, 1.0, 2.0]), np.array([0, 0, 0, 1]))
+        expected = sorted(range(4), key=lambda i: (keys[0][i], keys[1][i]), reverse=True)
+        self.assertEqual(sort_indices(indices, keys, descending=True).tolist(), expected)
+        self.assertIsNone(sort_indices(indices, (np.array([1.0, np.nan, 0.0, 0.0]),), descending=False))
+
+
+class TestVectorizedScanners(unittest.TestCase):
+    """The vectorized scanners must return exactly the rows, in exactly the order, of the row-by-row path."""
+
+    def _assert_equal_paths(self, legacy, vectorized, requests):
+        for seed in range(6):
+            payload = _random_features(seed, nan=seed % 2 == 0)
+            snap = FeatureSnapshot(payload)
+            for request in requests:
+                for limit in (5, 1000):
+                    with self.subTest(seed=seed, request=request, limit=limit), mock.patch.object(
+                        app, "SCANNER_RESULTS_LIMIT", limit
+                    ):
+                        expected = legacy(request, payload)
+                        self.assertEqual(_dump(vectorized(request, snap)), _dump(expected))
+
+    def test_day_gainers(self):
+        requests = [
+            app.DayGainersRequest(minChangePct=0.0),
+            app.DayGainersRequest(minChangePct=3.0, minTodayVolume=200_000, minPrice=2.0, maxPrice=20.0),
+        ]
+        self._assert_equal_paths(app._day_gainers_results, app._day_gainers_results_vectorized, requests)
+
+    def test_hod_vwap_momentum(self):
+        requests = [
+            app.HodVwapMomentumRequest(minRelVol=0.0, minTodayVolume=0),
+            app.HodVwapMomentumRequest(requireHodBreak=True, maxDistToHod=1.0),
+            app.HodVwapMomentumRequest(requireVwapBreak=True, minRelVol=1.4),
+            app.HodVwapMomentumRequest(requireHodBreak=True, requireVwapBreak=True, minTodayVolume=0),
+        ]
+        self._assert_equal_paths(app._momentum_results, app._momentum_results_vectorized, requests)
+
+    def test_volume_spikes(self):
+        requests = [
+            app.VolumeSpikesRequest(minChangePct=0.0, minTodayVolume=0),
+            app.VolumeSpikesRequest(),
+        ]
+        self._assert_equal_paths(app._volume_spikes_results, app._volume_spikes_results_vectorized, requests)
+
+    def test_hod_vwap_approach(self):
+        requests = [
+            app.HodVwapApproachRequest(minTodayVolume=0, minRangePct=0.0, minRelVol=0.0),
+            app.HodVwapApproachRequest(adaptiveThresholds=False),
+            app.HodVwapApproachRequest(maxAbsVwapDistance=0.0, minTodayVolume=0),
+            app.HodVwapApproachRequest(maxDistToHod=0.0, minTodayVolume=0, minPosInRange=0.0),
+        ]
+        self._assert_equal_paths(app._approach_results, app._approach_results_vectorized, requests)
+
+    def test_snapshot_is_memoized_per_features_payload(self):
+        payload = _random_features(1)
+        request = app.ScannerUniverseRequest()
+        with mock.patch.object(app, "local_cache", app.LocalCache(max_entries=16, max_bytes=10_000_000)), mock.patch.object(
+            app, "_get_features_cached", return_value=payload
+        ):
+            _, first = app._get_features_snapshot(request)
+            _, second = app._get_features_snapshot(request)
+            self.assertIs(first, second)
+            with mock.patch.object(app, "_get_features_cached", return_value=dict(payload)):
+                _, third = app._get_features_snapshot(request)
+            self.assertIsNot(third, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@ import json
 import unittest
 from typing import Optional
 
+from cache import LocalCache
+
 
 class _FakeCacheClient:
     def __init__(self):
@@ -24,12 +26,18 @@ class TestStaleWhileRevalidateCache(unittest.TestCase):
         self.market_app = market_app
         self.fake_cache = _FakeCacheClient()
         self.market_app.cache_client = self.fake_cache
+        # These tests rewrite the shared (L2) envelope directly, so bypass the in-process tier.
+        self._local_cache = self.market_app.local_cache
+        self.market_app.local_cache = LocalCache(max_entries=0, max_bytes=0)
 
         self.market_app.CACHE_TTL_SECONDS = 60
         self.market_app.CACHE_STALE_TTL_SECONDS = 3600
         self.market_app.SERVE_STALE_WHILE_REVALIDATE = True
         self.market_app.STALE_RETRY_AFTER_MS = 1234
 
+    def tearDown(self):
+        self.market_app.local_cache = self._local_cache
+
     def test_write_then_read_fresh(self):
         key = "md:test:scan"
         payload = {"scanner": "day_gainers", "sorted_by": "x", "results": []}
@@ -84,3 +92,67 @@ class TestStaleWhileRevalidateCache(unittest.TestCase):
         self.assertEqual(cached, payload)
         self.assertIsNotNone(cache_info)
         self.assertFalse(cache_info["isStale"])
+
+
+class TestLocalCacheTier(unittest.TestCase):
+    def setUp(self):
+        import app as market_app
+
+        self.market_app = market_app
+        self.fake_cache = _FakeCacheClient()
+        self._cache_client = market_app.cache_client
+        self._local_cache = market_app.local_cache
+        market_app.cache_client = self.fake_cache
+        market_app.local_cache = LocalCache(max_entries=16, max_bytes=1_000_000)
+        market_app.CACHE_TTL_SECONDS = 60
+        market_app.CACHE_STALE_TTL_SECONDS = 3600
+        market_app.SERVE_STALE_WHILE_REVALIDATE = True
+
+    def tearDown(self):
+        self.market_app.cache_client = self._cache_client
+        self.market_app.local_cache = self._local_cache
+
+    def test_fresh_scan_entry_is_served_without_touching_l2(self):
+        key = "md:test:scan"
+        payload = {"scanner": "day_gainers", "sorted_by": "x", "results": []}
+        self.market_app._write_scan_cache_entry(key, payload)
+        self.fake_cache._store.clear()
+
+        cached, cache_info = self.market_app._read_scan_cache_entry(key)
+        self.assertEqual(cached, payload)
+        self.assertFalse(cache_info["isStale"])
+        self.assertEqual(self.market_app.local_cache.stats()["hits"], 1)
+
+    def test_l2_hit_populates_l1(self):
+        key = "md:test:scan"
+        payload = {"scanner": "day_gainers", "sorted_by": "x", "results": []}
+        self.market_app._write_scan_cache_entry(key, payload)
+        self.market_app.local_cache.clear()
+
+        self.market_app._read_scan_cache_entry(key)
+        self.fake_cache._store.clear()
+        cached, _ = self.market_app._read_scan_cache_entry(key)
+        self.assertEqual(cached, payload)
+
+    def test_stale_l2_entries_are_not_kept_in_l1(self):
+        key = "md:test:scan"
+        envelope = {
+            "__cache": {
+                "v": 1,
+                "storedAt": "2000-01-01T00:00:00Z",
+                "freshUntil": "2000-01-01T00:00:01Z",
+                "staleUntil": "2999-01-01T00:00:00Z",
+            },
+            "data": {"scanner": "day_gainers", "sorted_by": "x", "results": []},
+        }
+        self.fake_cache.setex(key, 3600, json.dumps(envelope))
+
+        _, cache_info = self.market_app._read_scan_cache_entry(key)
+        self.assertTrue(cache_info["isStale"])
+        self.assertEqual(self.market_app.local_cache.stats()["entries"], 0)
+
+    def test_read_cache_uses_l1_after_first_decode(self):
+        self.fake_cache.setex("md:test:features", 60, json.dumps({"features": [1]}))
+        self.assertEqual(self.market_app.read_cache("md:test:features"), {"features": [1]})
+        self.fake_cache._store.clear()
+        self.assertEqual(self.market_app.read_cache("md:test:features"), {"features": [1]})
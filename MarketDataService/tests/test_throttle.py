@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from throttle import AdaptiveBatchSize, TokenBucket  # noqa: E402
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_bursts_then_paces_at_rate(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+        for _ in range(3):
+            self.assertTrue(bucket.acquire())
+        self.assertEqual(clock.now, 0.0)
+
+        self.assertTrue(bucket.acquire())
+        self.assertAlmostEqual(clock.now, 0.5)
+        self.assertFalse(bucket.acquire(timeout=0.1))
+
+    def test_non_positive_rate_disables_limiting(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=0, capacity=1, clock=clock, sleep=clock.sleep)
+        for _ in range(10):
+            self.assertTrue(bucket.acquire())
+        self.assertEqual(clock.now, 0.0)
+
+
+class TestAdaptiveBatchSize(unittest.TestCase):
+    def test_halves_on_failure_and_grows_on_success(self):
+        size = AdaptiveBatchSize(initial=50, minimum=10, maximum=50, step=5)
+        size.record_failure()
+        self.assertEqual(size.current(), 25)
+        size.record_failure()
+        size.record_failure()
+        self.assertEqual(size.current(), 10)
+        size.record_success()
+        self.assertEqual(size.current(), 15)
+        for _ in range(20):
+            size.record_success()
+        self.assertEqual(size.current(), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`.
+    `acquire` blocks until a token is available; a non-positive rate disables limiting.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._rate = float(rate)
+        self._capacity = max(float(capacity), 1.0)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._rate > 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Waits for `tokens`; returns False if that would take longer than `timeout` seconds."""
+        if not self.enabled:
+            return True
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                delay = (tokens - self._tokens) / self._rate
+            if timeout is not None and waited + delay > timeout:
+                return False
+            self._sleep(delay)
+            waited += delay
+
+
+class AdaptiveBatchSize:
+    """
+    Additive-increase / multiplicative-decrease batch sizing shared across requests:
+    a failed batch halves the size, each successful batch grows it by `step`.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, step: int = 5):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.step = max(1, int(step))
+        self._size = min(max(int(initial), self.minimum), self.maximum)
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        with self._lock:
+            return self._size
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._size = min(self.maximum, self._size + self.step)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._size = max(self.minimum, self._size // 2)